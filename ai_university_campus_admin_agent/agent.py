@@ -1,5 +1,6 @@
 from google.genai import types
 from google.adk.agents.llm_agent import LlmAgent
+from google.adk.tools import FunctionTool
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.adk.memory import InMemoryMemoryService  # NEW: Memory service
@@ -15,6 +16,8 @@ import asyncio  # NEW: For async operations
 
 # Import all agents
 from ai_university_campus_admin_agent.agents import *
+from ai_university_campus_admin_agent.tools import get_student_overview
+from ai_university_campus_admin_agent.config.models import get_model
 
 import logging
 
@@ -25,9 +28,13 @@ logging.basicConfig(
 
 load_dotenv()
 
-from google.adk.sessions import DatabaseSessionService
-# Example using a local SQLite file:
-session_service = DatabaseSessionService(db_url=os.getenv("DATABASE_URL"))
+from ai_university_campus_admin_agent.config.session_store import create_session_service
+# Conversation history on its own engine (SESSION_DATABASE_URL, falling back to DATABASE_URL), compacted as it grows
+session_service = create_session_service()
+
+from ai_university_campus_admin_agent.config.tracing import setup_tracing
+# One trace per turn (agents, model calls, tools and SQL) written to TRACE_FILE when it is set
+setup_tracing()
 
 instruction = """
     You are the Central Orchestration Hub of the AI University Campus Administration System. 
@@ -70,7 +77,15 @@ instruction = """
     - "What are the fees for Data Science courses?" → Fee Agent  
     - "Show me analytics for spring enrollment" → Analyst Agent
     - "Tell me about the AI department" → University Information Agent
-    - "I need to pay fees and check course schedule" → Coordinate between Fee & Course Agents
+    - "I need to pay fees and check course schedule" → Coordinate between Fee & Course Agents (see Multi-part requests)
+    - "What am I enrolled in and what do I owe?" → Answer directly with get_student_overview (no transfer needed):
+      it returns the profile, current courses with schedule and fee balances, recent payments and unread notifications
+
+    **Multi-part requests:**
+    When a request has independent parts for different agents, do not transfer from one agent to the next.
+    Split it into one self-contained request per agent (include the student ID, course codes and any other
+    details each part needs) and call all the matching ask_* tools in the same turn; they run in parallel.
+    Then merge their answers into one reply. Transfer to a single agent when the conversation stays in one domain.
 
     **Communication Style:**
     - Be warm, professional, and helpful
@@ -83,7 +98,8 @@ instruction = """
 
 root_agent = LlmAgent(
     name="orchestration_agent",
-    model="gemini-2.0-flash",
+    model=get_model("gemini-2.0-flash"),
     instruction=instruction,
     sub_agents=[registration_agent, course_agent, fee_agent, analyst_agent, uni_information_agent],
+    tools=[FunctionTool(func=get_student_overview), *consult_tools],
 )
\ No newline at end of file
@@ -5,11 +5,13 @@ from .course_agent import course_agent
 from .fee_agent import fee_agent
 from .analyst_agent import analyst_agent
 from .uni_information_agent import uni_information_agent
+from .parallel_consult import consult_tools
 
 __all__ = [
     'registration_agent',
     'course_agent', 
     'fee_agent',
     'analyst_agent',
-    'uni_information_agent'
+    'uni_information_agent',
+    'consult_tools'
 ]
\ No newline at end of file
@@ -13,6 +13,7 @@ from sqlalchemy import func, desc, case
 import datetime
 from zoneinfo import ZoneInfo
 from ai_university_campus_admin_agent.config.database import get_db,FeeStructure, Student, Course, Registration, Payment, Department, ActivityLog
+from ai_university_campus_admin_agent.config.models import get_model
 from ai_university_campus_admin_agent.tools import *
 
 load_dotenv()
@@ -23,6 +24,12 @@ get_student_demographics_tool = FunctionTool(func=get_student_demographics)
 get_financial_reports_tool = FunctionTool(func=get_financial_reports)
 get_activity_report_tool = FunctionTool(func=get_activity_report)
 get_course_performance_tool = FunctionTool(func=get_course_performance)
+get_analytics_dashboard_tool = FunctionTool(func=get_analytics_dashboard)
+get_cohort_retention_tool = FunctionTool(func=get_cohort_retention)
+get_course_drop_rates_tool = FunctionTool(func=get_course_drop_rates)
+get_cohort_revenue_tool = FunctionTool(func=get_cohort_revenue)
+get_capacity_forecast_tool = FunctionTool(func=get_capacity_forecast)
+get_academic_record_tool = FunctionTool(func=get_academic_record)
 
 # ===============================================================================
 
@@ -38,8 +45,13 @@ instruction = """
     **Key Responsibilities:**
     ✅ Enrollment trends and forecasting
     ✅ Financial performance and revenue analytics
-    ✅ Student success and course performance metrics
+    ✅ Student success and course performance metrics (GPA and standing come from precomputed academic records)
     ✅ Operational efficiency and resource utilization
+    ✅ Cohort retention, drop and withdraw rates per course and term, and revenue per enrollment cohort
+    ✅ Capacity planning: which courses are projected to exceed capacity (forecasts are precomputed by the nightly forecast job; mention when they are stale)
+
+    **Overviews:** For broad questions ("give me an overview of this semester") call get_analytics_dashboard once
+    instead of the individual reports; it runs them in parallel. Use the individual report tools for a single topic.
 
     **Communication Style:**
     "Here's what the enrollment data shows us for this semester..."
@@ -51,13 +63,19 @@ instruction = """
 
 analyst_agent = LlmAgent(
     name="AnalystAgent",
-    model="gemini-2.0-flash",
+    model=get_model("gemini-2.0-flash"),
     instruction=instruction,
     tools=[
         get_enrollment_statistics_tool,
         get_student_demographics_tool,
         get_financial_reports_tool,
         get_activity_report_tool,
-        get_course_performance_tool
+        get_course_performance_tool,
+        get_analytics_dashboard_tool,
+        get_cohort_retention_tool,
+        get_course_drop_rates_tool,
+        get_cohort_revenue_tool,
+        get_capacity_forecast_tool,
+        get_academic_record_tool
     ],
 )
\ No newline at end of file
@@ -13,6 +13,7 @@ import datetime
 from zoneinfo import ZoneInfo
 
 from ai_university_campus_admin_agent.config.database import get_db, Course, Registration, Student, RegistrationStatus
+from ai_university_campus_admin_agent.config.models import get_model
 from ai_university_campus_admin_agent.tools import *
 load_dotenv()
 
@@ -24,9 +25,22 @@ load_dotenv()
 create_course_tool = FunctionTool(func=create_course)
 get_course_tool = FunctionTool(func=get_course)
 get_all_courses_tool = FunctionTool(func=get_all_courses)
+search_courses_tool = FunctionTool(func=search_courses)
 update_course_tool = FunctionTool(func=update_course)
 get_course_enrollments_tool = FunctionTool(func=get_course_enrollments)
 drop_course_tool = FunctionTool(func=drop_course)
+notify_course_students_tool = FunctionTool(func=notify_course_students)
+notify_department_students_tool = FunctionTool(func=notify_department_students)
+notify_all_students_tool = FunctionTool(func=notify_all_students)
+check_schedule_conflicts_tool = FunctionTool(func=check_schedule_conflicts)
+get_student_timetable_tool = FunctionTool(func=get_student_timetable)
+check_course_eligibility_tool = FunctionTool(func=check_course_eligibility)
+get_eligible_courses_tool = FunctionTool(func=get_eligible_courses)
+join_waitlist_tool = FunctionTool(func=join_waitlist)
+leave_waitlist_tool = FunctionTool(func=leave_waitlist)
+get_waitlist_position_tool = FunctionTool(func=get_waitlist_position)
+detect_prerequisite_cycles_tool = FunctionTool(func=detect_prerequisite_cycles)
+post_course_grades_tool = FunctionTool(func=post_course_grades)
 
 # ===============================================================================
 
@@ -40,10 +54,13 @@ instruction = """
     - Support faculty with course management
 
     **Key Responsibilities:**
-    ✅ Course information with engaging descriptions
-    ✅ Enrollment management with capacity awareness  
+    ✅ Course information with engaging descriptions (use search_courses for topic or keyword requests instead of listing the catalog)
+    ✅ Enrollment management with capacity awareness and waitlists (drops promote the next waitlisted student)
     ✅ Schedule coordination and conflict checking
-    ✅ Academic guidance and prerequisite verification
+    ✅ Academic guidance and prerequisite verification (one call lists every course a student is eligible for)
+    ✅ End-of-term grade posting for a whole section from a CSV roster (student_id,grade) in one call
+    ✅ Announcements to a course roster, a department or all students (one call reaches everyone)
+    ✅ Safe retries: give each course change or drop a fresh idempotency_key, and reuse that key if you must repeat the call
 
     **Communication Style:**
     "That's an excellent course choice! Machine Learning Fundamentals is one of our most popular courses."
@@ -54,14 +71,27 @@ instruction = """
 """
 course_agent = LlmAgent(
     name="CourseAgent",
-    model="gemini-2.0-flash",
+    model=get_model("gemini-2.0-flash"),
     instruction=instruction,
     tools=[
         create_course_tool,
         get_course_tool,
         get_all_courses_tool,
+        search_courses_tool,
         update_course_tool,
         get_course_enrollments_tool,
-        drop_course_tool
+        drop_course_tool,
+        notify_course_students_tool,
+        notify_department_students_tool,
+        notify_all_students_tool,
+        check_schedule_conflicts_tool,
+        get_student_timetable_tool,
+        check_course_eligibility_tool,
+        get_eligible_courses_tool,
+        join_waitlist_tool,
+        leave_waitlist_tool,
+        get_waitlist_position_tool,
+        detect_prerequisite_cycles_tool,
+        post_course_grades_tool
     ],
 )
\ No newline at end of file
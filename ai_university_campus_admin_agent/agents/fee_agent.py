@@ -13,6 +13,7 @@ import datetime
 from zoneinfo import ZoneInfo
 
 from ai_university_campus_admin_agent.config.database import get_db, Student, Course, FeeStructure, Payment, FeeType, PaymentStatus
+from ai_university_campus_admin_agent.config.models import get_model
 from ai_university_campus_admin_agent.tools import *
 load_dotenv()
 
@@ -20,9 +21,11 @@ load_dotenv()
 create_fee_structure_tool = FunctionTool(func=create_fee_structure)
 get_course_fees_tool = FunctionTool(func=get_course_fees)
 calculate_student_fees_tool = FunctionTool(func=calculate_student_fees)
+get_student_overview_tool = FunctionTool(func=get_student_overview)
 record_payment_tool = FunctionTool(func=record_payment)
 get_payment_history_tool = FunctionTool(func=get_payment_history)
 get_fee_types_tool = FunctionTool(func=get_fee_types)
+import_bank_reconciliation_tool = FunctionTool(func=import_bank_reconciliation)
 
 # ===============================================================================
 
@@ -37,9 +40,12 @@ instruction = """
 
     **Key Responsibilities:**
     ✅ Transparent fee calculations and explanations
+    ✅ A student's balance across all their courses in one get_student_overview call (not calculate_student_fees per course)
     ✅ Multiple payment method support
     ✅ Payment history and receipt management
     ✅ Financial guidance and deadline reminders
+    ✅ Bank settlement file reconciliation (use import_bank_reconciliation for bulk files, never record_payment row by row)
+    ✅ Safe retries: give each payment a fresh idempotency_key, and reuse that key if you must repeat the call, so a student is never charged twice
 
     **Communication Style:**
     "Let me provide a clear breakdown of all fees associated with your courses."
@@ -51,14 +57,16 @@ instruction = """
 
 fee_agent = LlmAgent(
     name="FeeAgent",
-    model="gemini-2.0-flash",
+    model=get_model("gemini-2.0-flash"),
     instruction=instruction,
     tools=[
         create_fee_structure_tool,
         get_course_fees_tool,
         calculate_student_fees_tool,
+        get_student_overview_tool,
         record_payment_tool,
         get_payment_history_tool,
-        get_fee_types_tool
+        get_fee_types_tool,
+        import_bank_reconciliation_tool
     ],
 )
\ No newline at end of file
@@ -0,0 +1,40 @@
+# parallel_consult.py
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.tools.agent_tool import AgentTool
+from dotenv import load_dotenv
+from typing import List
+
+from .registration_agent import registration_agent
+from .course_agent import course_agent
+from .fee_agent import fee_agent
+from .analyst_agent import analyst_agent
+from .uni_information_agent import uni_information_agent
+
+load_dotenv()
+
+# Each specialist is also offered to the orchestrator as a tool. ADK runs every function call in one
+# model response concurrently, so calling several of these in the same turn fans a multi-part request
+# out to the specialists in parallel instead of transferring from one agent to the next.
+# (agent, tool name, description the orchestrator chooses by)
+CONSULTANTS = [
+    (registration_agent, "ask_registration_agent", "Ask the Registration Agent: student profiles, enrollment, registrations, timetables, waitlists, notifications, grades."),
+    (course_agent, "ask_course_agent", "Ask the Course Agent: course catalog, schedules, capacity and course enrollments."),
+    (fee_agent, "ask_fee_agent", "Ask the Fee Agent: fee structures, balances, payments and payment history."),
+    (analyst_agent, "ask_analyst_agent", "Ask the Analyst Agent: enrollment, financial, cohort and capacity reports."),
+    (uni_information_agent, "ask_campus_information_agent", "Ask the Campus Information Agent: facilities, departments, policies and contacts."),
+]
+
+def consult_tool(agent: LlmAgent, name: str, description: str) -> AgentTool:
+    """An AgentTool running a copy of the agent that answers one self-contained request and never transfers"""
+    consultant = agent.clone(update={
+        "name": name,
+        "description": description,
+        "disallow_transfer_to_parent": True,
+        "disallow_transfer_to_peers": True,
+    })
+    return AgentTool(agent=consultant)
+
+def build_consult_tools() -> List[AgentTool]:
+    return [consult_tool(agent, name, description) for agent, name, description in CONSULTANTS]
+
+consult_tools = build_consult_tools()
@@ -14,6 +14,7 @@ import datetime
 from zoneinfo import ZoneInfo
 
 from ai_university_campus_admin_agent.config.database import get_db, Student, Registration, Course, ActivityLog, ActivityType, RegistrationStatus
+from ai_university_campus_admin_agent.config.models import get_model
 from ai_university_campus_admin_agent.tools import *
 load_dotenv()
 
@@ -24,10 +25,24 @@ load_dotenv()
 # Create tool instances
 create_student_tool = FunctionTool(func=create_student)
 get_student_tool = FunctionTool(func=get_student)
+search_students_tool = FunctionTool(func=search_students)
 update_student_tool = FunctionTool(func=update_student)
 delete_student_tool = FunctionTool(func=delete_student)
 enroll_course_tool = FunctionTool(func=enroll_course)
+search_courses_tool = FunctionTool(func=search_courses)
 get_student_registrations_tool = FunctionTool(func=get_student_registrations)
+get_student_overview_tool = FunctionTool(func=get_student_overview)
+get_student_notifications_tool = FunctionTool(func=get_student_notifications)
+get_unread_notification_count_tool = FunctionTool(func=get_unread_notification_count)
+mark_notifications_read_tool = FunctionTool(func=mark_notifications_read)
+get_student_timetable_tool = FunctionTool(func=get_student_timetable)
+check_course_eligibility_tool = FunctionTool(func=check_course_eligibility)
+get_eligible_courses_tool = FunctionTool(func=get_eligible_courses)
+join_waitlist_tool = FunctionTool(func=join_waitlist)
+leave_waitlist_tool = FunctionTool(func=leave_waitlist)
+get_waitlist_position_tool = FunctionTool(func=get_waitlist_position)
+get_academic_record_tool = FunctionTool(func=get_academic_record)
+post_grade_tool = FunctionTool(func=post_grade)
 
 # ===============================================================================
 instruction = """
@@ -43,7 +58,13 @@ instruction = """
     ✅ Student onboarding with personalized welcome messages
     ✅ Course enrollment with prerequisite checking
     ✅ Profile updates with confirmation
+    ✅ Finding a student's record from a partial or misspelled name or email (search_students)
     ✅ Registration management with clear status updates
+    ✅ Whole-picture questions ("what am I enrolled in and what do I owe?"): one get_student_overview call covers profile, courses, schedule, balances, payments and notifications
+    ✅ Student notifications and announcements (paginated, unread first)
+    ✅ Waitlists for full courses (students are enrolled automatically when a seat opens)
+    ✅ Grade posting and academic records (GPA, earned credits, class standing)
+    ✅ Safe retries: give each enrollment or profile change a fresh idempotency_key, and reuse that key if you must repeat the call
 
     **Communication Style:**
     "Hello! I'd be happy to help you register for that course. Let me check availability and ensure you meet the prerequisites."
@@ -55,14 +76,28 @@ instruction = """
 
 registration_agent = LlmAgent(
     name="RegistrationAgent",
-    model="gemini-2.0-flash",
+    model=get_model("gemini-2.0-flash"),
     instruction=instruction,
     tools=[
         create_student_tool, 
         get_student_tool, 
+        search_students_tool,
         update_student_tool, 
         delete_student_tool, 
         enroll_course_tool,
-        get_student_registrations_tool
+        search_courses_tool,
+        get_student_registrations_tool,
+        get_student_overview_tool,
+        get_student_notifications_tool,
+        get_unread_notification_count_tool,
+        mark_notifications_read_tool,
+        get_student_timetable_tool,
+        check_course_eligibility_tool,
+        get_eligible_courses_tool,
+        join_waitlist_tool,
+        leave_waitlist_tool,
+        get_waitlist_position_tool,
+        get_academic_record_tool,
+        post_grade_tool
     ],
 )
\ No newline at end of file
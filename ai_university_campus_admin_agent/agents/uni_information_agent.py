@@ -2,9 +2,15 @@
 import os
 import json
 from google.adk.agents import Agent
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.tools import FunctionTool
 from dotenv import load_dotenv
 
+from ai_university_campus_admin_agent.config.answer_cache import (
+    CAMPUS_INFORMATION_PATH, dataset_version, before_model_answer_cache, after_model_answer_cache
+)
+from ai_university_campus_admin_agent.config.models import get_model
+
 load_dotenv()
 
 # =====================================
@@ -13,16 +19,15 @@ load_dotenv()
 def read_campus_information():
     """Read campus information from JSON file"""
     try:
-        with open('ai_university_campus_admin_agent/data/university_information.json', 'r', encoding='utf-8') as file:
+        with open(CAMPUS_INFORMATION_PATH, 'r', encoding='utf-8') as file:
             return json.load(file)
     except FileNotFoundError:
         return {"error": "Campus information file not found."}
     except json.JSONDecodeError:
         return {"error": "Invalid campus information file format."}
 
-campus_info_data = read_campus_information()
-
-campus_info_instructions = f"""
+def build_instructions(campus_info_data) -> str:
+    return f"""
 You are the Campus Information Agent of the AI University Campus Administration System.
 Your primary responsibility is to provide accurate, detailed information about the university campus, 
 including departments, facilities, policies, and contacts.
@@ -35,8 +40,21 @@ and general university information. If you cannot find specific information in t
 be honest about the limitations.
 """
 
+# The prompt is rebuilt when university_information.json changes, the same version the answer cache is keyed on
+_instructions = {}
+
+def campus_info_instructions(context: ReadonlyContext) -> str:
+    version = dataset_version.get()
+    if version not in _instructions:
+        _instructions.clear()
+        _instructions[version] = build_instructions(read_campus_information())
+    return _instructions[version]
+
 uni_information_agent = Agent(
-    model='gemini-2.0-flash-001',
+    model=get_model('gemini-2.0-flash-001'),
     name='campus_information_agent',
     instruction=campus_info_instructions,
+    # Repeat questions ("library hours?") are answered from the cache without a model call
+    before_model_callback=before_model_answer_cache,
+    after_model_callback=after_model_answer_cache,
 )
\ No newline at end of file
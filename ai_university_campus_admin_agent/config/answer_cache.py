@@ -0,0 +1,327 @@
+# answer_cache.py
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from sqlalchemy import func, delete, select, update
+import datetime
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import SessionLocal, AnswerCacheEntry, dialect_insert
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CAMPUS_INFORMATION_PATH = os.getenv(
+    "CAMPUS_INFORMATION_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "university_information.json")
+)
+ANSWER_CACHE_TTL_HOURS = float(os.getenv("ANSWER_CACHE_TTL_HOURS", "168"))
+# Rows kept in the answer_cache table; the least recently used go first
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+# Answers also held in process memory, so a repeat question needs no query at all
+ANSWER_CACHE_MEMORY_ENTRIES = int(os.getenv("ANSWER_CACHE_MEMORY_ENTRIES", "512"))
+ANSWER_CACHE_MAX_QUESTION_CHARS = 300
+
+# Memory hits only write last_used_at back this often, which is all the LRU eviction needs
+_TOUCH_INTERVAL = datetime.timedelta(minutes=30)
+# Evict every this many stores instead of on each one
+_EVICT_EVERY = 100
+
+_FILLER = re.compile(r"\b(please|pls|hi|hello|hey|thanks|thank you|kindly)\b")
+# Questions that lean on earlier turns ("and on weekends?", "what is their email?") depend on context the key does not capture
+_FOLLOW_UP = re.compile(r"^(and|also|what about|how about|then|so|same)\b|\b(it|its|that|those|these|they|them|their|he|she|his|her)\b")
+# Answers about the asker ("what do I owe?") or a particular student or course are not the same for everyone
+_PERSONAL = re.compile(r"\b(i|me|my|mine|myself|we|us|our|ours)\b")
+# Student and course IDs (S0000001, CS101) and long numbers (student numbers); years stay cacheable
+_IDENTIFIER = re.compile(r"\b(?=[a-z]*\d)(?=\d*[a-z])[a-z\d]+\b|\b\d{5,}\b")
+_STOP_WORDS = frozenset(
+    "a an and any are at be can could do does for from get give how in is of on or please the there this "
+    "to what whats when where which who whom whose why will with would you your".split()
+)
+
+def _stem(word: str) -> str:
+    # Enough to match "library" with "libraries" and "lab" with "labs"
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss") and len(word) > 3:
+        return word[:-1]
+    return word
+
+def dataset_words(text: str) -> frozenset:
+    """Stemmed words in the campus information, keys included"""
+    return frozenset(_stem(word) for word in re.findall(r"[a-z]+", text.lower().replace("_", " ")))
+
+def is_campus_question(question: str, vocabulary: frozenset) -> bool:
+    """Whether a normalized question is a general campus question the dataset covers.
+
+    It must say nothing about the asker or a particular student or course, and at least half of its
+    content words must appear in the campus information.
+    """
+    if _PERSONAL.search(question) or _IDENTIFIER.search(question):
+        return False
+    words = [_stem(word) for word in re.findall(r"[a-z]+", question) if word not in _STOP_WORDS and len(word) > 2]
+    return bool(words) and 2 * sum(word in vocabulary for word in words) >= len(words)
+
+def normalize_question(text: Optional[str]) -> Optional[str]:
+    """Lowercased question without accents, punctuation or pleasantries, or None if it should not be cached"""
+    if not text or len(text) > ANSWER_CACHE_MAX_QUESTION_CHARS:
+        return None
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    text = _FILLER.sub(" ", re.sub(r"[^\w\s@.-]|(?<!\w)[.-]|[.-](?!\w)", " ", text))
+    text = " ".join(text.split())
+    if not text or _FOLLOW_UP.search(text):
+        return None
+    return text
+
+class DatasetVersion:
+    """Short hash of the campus information file, recomputed only when its size or mtime changes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._version = ""
+
+    def get(self) -> str:
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._stat:
+                with open(self.path, "rb") as file:
+                    self._version = hashlib.sha256(file.read()).hexdigest()[:16]
+                self._stat = signature
+            return self._version
+
+dataset_version = DatasetVersion(CAMPUS_INFORMATION_PATH)
+
+# Words of the current campus information, rebuilt when its version changes
+_vocabulary: Dict[str, frozenset] = {}
+
+def dataset_vocabulary(version: str) -> frozenset:
+    if version not in _vocabulary:
+        with open(CAMPUS_INFORMATION_PATH, encoding="utf-8") as file:
+            words = dataset_words(file.read())
+        _vocabulary.clear()
+        _vocabulary[version] = words
+    return _vocabulary[version]
+
+class AnswerCache:
+    """Answers keyed on dataset version and normalized question: an in-memory LRU over the answer_cache table"""
+
+    def __init__(self, memory_entries: int = ANSWER_CACHE_MEMORY_ENTRIES):
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        # key -> (answer, created_at, last written to the table)
+        self._memory: "OrderedDict[str, Tuple[str, datetime.datetime, datetime.datetime]]" = OrderedDict()
+        self._stores_since_evict = 0
+        self.lookups = 0
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.stores = 0
+        self.skipped = 0
+
+    @staticmethod
+    def key(version: str, question: str) -> str:
+        return hashlib.sha256(f"{version}\n{question}".encode()).hexdigest()
+
+    def _remember(self, key: str, entry: Tuple[str, datetime.datetime, datetime.datetime]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, version: str, question: str) -> Optional[str]:
+        key = self.key(version, question)
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        expired_before = now - datetime.timedelta(hours=ANSWER_CACHE_TTL_HOURS)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] <= expired_before:
+                del self._memory[key]
+                entry = None
+            if entry:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+            self.lookups += 1
+        if entry:
+            answer, created_at, touched_at = entry
+            if now - touched_at > _TOUCH_INTERVAL:
+                self._touch(key, now)
+                self._remember(key, (answer, created_at, now))
+            return answer
+
+        with SessionLocal() as db:
+            row = db.execute(
+                select(AnswerCacheEntry.answer, AnswerCacheEntry.created_at).where(
+                    AnswerCacheEntry.cache_key == key,
+                    AnswerCacheEntry.created_at > expired_before
+                )
+            ).first()
+        if row is None:
+            return None
+        with self._lock:
+            self.store_hits += 1
+        self._touch(key, now)
+        created_at = row.created_at if row.created_at.tzinfo else row.created_at.replace(tzinfo=ZoneInfo("UTC"))
+        self._remember(key, (row.answer, created_at, now))
+        return row.answer
+
+    def _touch(self, key: str, now: datetime.datetime) -> None:
+        with SessionLocal() as db:
+            db.execute(update(AnswerCacheEntry).where(AnswerCacheEntry.cache_key == key).values(
+                hits=AnswerCacheEntry.hits + 1, last_used_at=now
+            ))
+            db.commit()
+
+    def put(self, version: str, question: str, answer: str) -> None:
+        key = self.key(version, question)
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        stmt = dialect_insert(AnswerCacheEntry).values(
+            cache_key=key, dataset_version=version, question=question, answer=answer,
+            hits=0, created_at=now, last_used_at=now
+        )
+        with SessionLocal() as db:
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=["cache_key"],
+                set_={"answer": stmt.excluded.answer, "created_at": now, "last_used_at": now}
+            ))
+            db.commit()
+        self._remember(key, (answer, now, now))
+        with self._lock:
+            self.stores += 1
+            self._stores_since_evict += 1
+            evict = self._stores_since_evict >= _EVICT_EVERY
+            if evict:
+                self._stores_since_evict = 0
+        if evict:
+            self.evict()
+
+    def skip(self) -> None:
+        with self._lock:
+            self.skipped += 1
+
+    def evict(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES) -> Dict[str, Any]:
+        """Delete expired answers, answers for older dataset versions, then the least recently used beyond max_entries"""
+        expired_before = datetime.datetime.now(ZoneInfo("UTC")) - datetime.timedelta(hours=ANSWER_CACHE_TTL_HOURS)
+        with SessionLocal() as db:
+            expired = db.execute(delete(AnswerCacheEntry).where(
+                (AnswerCacheEntry.created_at <= expired_before) | (AnswerCacheEntry.dataset_version != dataset_version.get())
+            )).rowcount
+            cutoff = db.execute(
+                select(AnswerCacheEntry.last_used_at).order_by(AnswerCacheEntry.last_used_at.desc()).offset(max_entries).limit(1)
+            ).scalar()
+            evicted = 0
+            if cutoff is not None:
+                evicted = db.execute(delete(AnswerCacheEntry).where(AnswerCacheEntry.last_used_at <= cutoff)).rowcount
+            db.commit()
+        with self._lock:
+            self._memory.clear()
+        return {"expired": expired, "evicted": evicted}
+
+    def clear(self) -> None:
+        with SessionLocal() as db:
+            db.execute(delete(AnswerCacheEntry))
+            db.commit()
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit rates for this process, and the size and lifetime hits of the shared table"""
+        with SessionLocal() as db:
+            entries, hits = db.execute(select(func.count(AnswerCacheEntry.id), func.coalesce(func.sum(AnswerCacheEntry.hits), 0))).one()
+        with self._lock:
+            hits_here = self.memory_hits + self.store_hits
+            return {
+                "dataset_version": dataset_version.get(),
+                "lookups": self.lookups,
+                "hits": hits_here,
+                "memory_hits": self.memory_hits,
+                "store_hits": self.store_hits,
+                "misses": self.lookups - hits_here,
+                "hit_rate": round(hits_here / self.lookups, 4) if self.lookups else None,
+                "stored_answers": self.stores,
+                "uncacheable_questions": self.skipped,
+                "memory_entries": len(self._memory),
+                "table_entries": entries,
+                "table_hits": hits
+            }
+
+answer_cache = AnswerCache()
+
+def _question(callback_context: CallbackContext) -> Optional[Tuple[str, str]]:
+    """(dataset version, normalized question) if the user's message is a cacheable campus question"""
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return None
+    question = normalize_question(" ".join(part.text for part in content.parts if part.text))
+    if question is None:
+        return None
+    version = dataset_version.get()
+    if not is_campus_question(question, dataset_vocabulary(version)):
+        return None
+    return version, question
+
+def _final_text(llm_response: LlmResponse) -> Optional[str]:
+    if llm_response.partial or llm_response.error_code or not llm_response.content or not llm_response.content.parts:
+        return None
+    parts = llm_response.content.parts
+    if any(part.function_call or part.function_response for part in parts):
+        return None
+    text = "".join(part.text or "" for part in parts if not part.thought).strip()
+    return text or None
+
+def before_model_answer_cache(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """Answer a repeat question from the cache without calling the model"""
+    # Only the first model call of a turn answers the user's question directly
+    if llm_request.contents and any(part.function_response for part in llm_request.contents[-1].parts or []):
+        return None
+    question = _question(callback_context)
+    if question is None:
+        answer_cache.skip()
+        return None
+    try:
+        answer = answer_cache.get(*question)
+    except Exception:
+        logger.exception("Answer cache lookup failed")
+        return None
+    if answer is None:
+        return None
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part.from_text(text=answer)]))
+
+def after_model_answer_cache(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Store a final text answer to a cacheable campus question"""
+    question = _question(callback_context)
+    answer = _final_text(llm_response)
+    if question and answer:
+        try:
+            answer_cache.put(*question, answer)
+        except Exception:
+            logger.exception("Answer cache store failed")
+    return None
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the campus information answer cache")
+    parser.add_argument("action", choices=["stats", "evict", "clear"])
+    args = parser.parse_args()
+    if args.action == "stats":
+        print(json.dumps(answer_cache.stats(), indent=2))
+    elif args.action == "evict":
+        print(json.dumps(answer_cache.evict(), indent=2))
+    else:
+        answer_cache.clear()
+        print(json.dumps({"status": "success", "message": "Answer cache cleared"}))
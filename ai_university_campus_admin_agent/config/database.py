@@ -1,10 +1,14 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, CheckConstraint, Enum
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, ForeignKey, Float, CheckConstraint, Enum, Index, UniqueConstraint, DDL, event, inspect, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
 import os
 from datetime import datetime
+from pathlib import Path
 import enum
 
 load_dotenv()
@@ -13,16 +17,67 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# Read-only tools (reports, search) use their own engine and pool: a replica via DATABASE_READ_URL,
+# or a read-only connection to the same SQLite file, so they never hold connections or locks writers need
+# Connections the primary engine keeps open; write admission control (utils/admission.py) sizes its limit from it
+DATABASE_POOL_SIZE = int(os.getenv("DATABASE_POOL_SIZE", "5"))
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")
+DATABASE_READ_POOL_SIZE = int(os.getenv("DATABASE_READ_POOL_SIZE", "5"))
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers and the single writer proceed concurrently; busy_timeout waits out short write locks
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.close()
+
+def _set_sqlite_read_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def _sqlite_read_only_url(url: str):
+    """The same SQLite file opened with mode=ro, or None for in-memory databases"""
+    database = make_url(url).database
+    if not database or database == ":memory:" or database.startswith("file:"):
+        return None
+    return f"sqlite:///{Path(database).resolve().as_uri()}?mode=ro&uri=true"
+
 # For SQLite, add connection args
 if DATABASE_URL.startswith('sqlite'):
     engine = create_engine(
         DATABASE_URL, 
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        pool_size=DATABASE_POOL_SIZE
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+else:
+    engine = create_engine(DATABASE_URL, pool_size=DATABASE_POOL_SIZE)
+
+_read_url = DATABASE_READ_URL or (_sqlite_read_only_url(DATABASE_URL) if DATABASE_URL.startswith('sqlite') else DATABASE_URL)
+if not _read_url:
+    read_engine = engine
+elif _read_url.startswith('sqlite'):
+    read_engine = create_engine(
+        _read_url,
+        connect_args={"check_same_thread": False},
+        pool_size=DATABASE_READ_POOL_SIZE
     )
+    event.listen(read_engine, "connect", _set_sqlite_read_pragmas)
+elif DATABASE_READ_URL or make_url(_read_url).get_backend_name() != "postgresql":
+    read_engine = create_engine(_read_url, pool_size=DATABASE_READ_POOL_SIZE)
 else:
-    engine = create_engine(DATABASE_URL)
+    # No replica configured: a separate pool on the primary whose transactions are read-only
+    read_engine = create_engine(
+        _read_url,
+        pool_size=DATABASE_READ_POOL_SIZE,
+        connect_args={"options": "-c default_transaction_read_only=on"}
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 Base = declarative_base()
 
 # Enums for better data integrity
@@ -83,6 +138,8 @@ class Student(Base):
     
     __table_args__ = (
         CheckConstraint('email LIKE "%@%"', name='valid_email'),
+        Index('ix_students_department', 'department'),
+        Index('ix_students_updated_at', 'updated_at'),
     )
 
 class ActivityLog(Base):
@@ -171,6 +228,10 @@ class Registration(Base):
     
     __table_args__ = (
         CheckConstraint('grade_points >= 0 AND grade_points <= 4.0', name='valid_grade_points'),
+        Index('ix_registrations_course_status', 'course_id', 'status'),
+        Index('ix_registrations_student_status', 'student_id', 'status'),
+        Index('ix_registrations_updated_at', 'updated_at'),
+        Index('ix_registrations_course_date', 'course_id', 'registration_date'),
     )
 
 class Payment(Base):
@@ -196,6 +257,8 @@ class Payment(Base):
     
     __table_args__ = (
         CheckConstraint('amount_paid > 0', name='positive_payment'),
+        Index('ix_payments_student_fee', 'student_id', 'fee_structure_id'),
+        Index('ix_payments_updated_at', 'updated_at'),
     )
 
 # Additional tables for enhanced functionality
@@ -232,6 +295,7 @@ class AcademicRecord(Base):
     __table_args__ = (
         CheckConstraint('gpa >= 0 AND gpa <= 4.0', name='valid_gpa_range'),
         CheckConstraint('total_credits >= 0', name='non_negative_credits'),
+        Index('uq_academic_records_student_term', 'student_id', 'semester', 'year', unique=True),
     )
 
 class Notification(Base):
@@ -250,6 +314,209 @@ class Notification(Base):
     
     # Relationships
     student = relationship("Student")
+    
+    __table_args__ = (
+        Index('ix_notifications_student_unread', 'student_id', 'is_read', 'sent_at'),
+        Index('ix_notifications_expires_at', 'expires_at'),
+    )
+
+class FeeAssessment(Base):
+    __tablename__ = "fee_assessments"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    student_id = Column(String(50), ForeignKey('students.student_id'), nullable=False)
+    fee_structure_id = Column(Integer, ForeignKey('fee_structures.id'), nullable=False)
+    registration_id = Column(Integer, ForeignKey('registrations.id'))
+    amount_due = Column(Float, nullable=False)
+    amount_paid = Column(Float, default=0.0)
+    status = Column(Enum(PaymentStatus), default=PaymentStatus.PENDING)
+    due_date = Column(DateTime)
+    assessed_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    student = relationship("Student")
+    fee_structure = relationship("FeeStructure")
+    
+    __table_args__ = (
+        UniqueConstraint('student_id', 'fee_structure_id', name='uq_fee_assessment_student_fee'),
+        Index('ix_fee_assessments_status', 'status'),
+        Index('ix_fee_assessments_registration', 'registration_id'),
+    )
+
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+    
+    job_name = Column(String(100), primary_key=True)
+    last_id = Column(Integer, default=0)  # keyset position of the last committed chunk
+    status = Column(String(20), default="idle")  # idle, running, completed
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class WaitlistEntry(Base):
+    __tablename__ = "waitlist_entries"
+    
+    id = Column(Integer, primary_key=True, index=True)  # FIFO order within a course
+    course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
+    student_id = Column(String(50), ForeignKey('students.student_id'), nullable=False)
+    joined_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    student = relationship("Student")
+    course = relationship("Course")
+    
+    __table_args__ = (
+        UniqueConstraint('course_id', 'student_id', name='uq_waitlist_course_student'),
+        Index('ix_waitlist_course_order', 'course_id', 'id'),
+        Index('ix_waitlist_student', 'student_id'),
+    )
+
+class EnrollmentForecast(Base):
+    __tablename__ = "enrollment_forecasts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    course_id = Column(Integer, ForeignKey('courses.id'), nullable=False)
+    model = Column(String(30), nullable=False)  # weighted_linear_trend, insufficient_data
+    weeks_observed = Column(Integer, nullable=False)
+    weekly_registrations = Column(Float, default=0.0)  # fitted rate for the coming week
+    weekly_trend = Column(Float, default=0.0)  # change in the weekly rate per week
+    drop_rate = Column(Float, default=0.0)
+    current_enrollment = Column(Integer, default=0)
+    waitlisted = Column(Integer, default=0)
+    max_capacity = Column(Integer)
+    horizon_weeks = Column(Integer, nullable=False)
+    projected_enrollment = Column(Float, nullable=False)
+    projected_upper = Column(Float, nullable=False)  # upper end of a 90% interval
+    projected_utilization = Column(Float)
+    weeks_until_full = Column(Integer)  # None if not projected to fill within the horizon
+    over_capacity = Column(Boolean, default=False)
+    at_risk = Column(Boolean, default=False)  # the upper bound exceeds capacity
+    generated_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    course = relationship("Course")
+    
+    __table_args__ = (
+        UniqueConstraint('course_id', name='uq_enrollment_forecast_course'),
+        Index('ix_enrollment_forecasts_utilization', 'projected_utilization'),
+    )
+
+class AnswerCacheEntry(Base):
+    __tablename__ = "answer_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), nullable=False)  # hash of dataset version + normalized question
+    dataset_version = Column(String(16), nullable=False)
+    question = Column(Text, nullable=False)  # normalized
+    answer = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('cache_key', name='uq_answer_cache_key'),
+        Index('ix_answer_cache_last_used', 'last_used_at'),
+    )
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tool_name = Column(String(64), nullable=False)
+    key_hash = Column(String(64), nullable=False)  # sha256 of the caller's key
+    request_hash = Column(String(64), nullable=False)  # sha256 of the other arguments
+    state = Column(String(16), nullable=False)  # pending, completed, unknown (outcome not recorded)
+    response = Column(Text)  # JSON result of the completed call
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('tool_name', 'key_hash', name='uq_idempotency_keys_tool_key'),
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
+
+# Full-text search over the course catalog. SQLite keeps an FTS5 index in sync with triggers;
+# PostgreSQL uses a GIN index on a weighted tsvector expression, which search queries repeat verbatim.
+COURSE_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(course_code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(course_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(instructor, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'C')"
+)
+
+_SEARCH_DDL = {
+    "courses": {
+        "sqlite": [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS courses_fts USING fts5("
+            "course_code, course_name, description, instructor, "
+            "content='courses', content_rowid='id', tokenize='porter unicode61')",
+            "CREATE TRIGGER IF NOT EXISTS courses_fts_insert AFTER INSERT ON courses BEGIN "
+            "INSERT INTO courses_fts(rowid, course_code, course_name, description, instructor) "
+            "VALUES (new.id, new.course_code, new.course_name, new.description, new.instructor); END",
+            "CREATE TRIGGER IF NOT EXISTS courses_fts_delete AFTER DELETE ON courses BEGIN "
+            "INSERT INTO courses_fts(courses_fts, rowid, course_code, course_name, description, instructor) "
+            "VALUES ('delete', old.id, old.course_code, old.course_name, old.description, old.instructor); END",
+            # Only edits to searchable columns touch the index, not enrollment counter updates
+            "CREATE TRIGGER IF NOT EXISTS courses_fts_update AFTER UPDATE OF course_code, course_name, description, instructor ON courses BEGIN "
+            "INSERT INTO courses_fts(courses_fts, rowid, course_code, course_name, description, instructor) "
+            "VALUES ('delete', old.id, old.course_code, old.course_name, old.description, old.instructor); "
+            "INSERT INTO courses_fts(rowid, course_code, course_name, description, instructor) "
+            "VALUES (new.id, new.course_code, new.course_name, new.description, new.instructor); END",
+        ],
+        "postgresql": [
+            f"CREATE INDEX IF NOT EXISTS ix_courses_search ON courses USING GIN (({COURSE_SEARCH_VECTOR}))",
+        ],
+    },
+    # Student lookup by name. SQLite indexes name words (with prefix indexes for partial names) and exposes
+    # the word list through fts5vocab for typo correction; PostgreSQL uses pg_trgm trigram similarity.
+    # Both index lower(email) for case-insensitive email prefix lookups.
+    "students": {
+        "sqlite": [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS students_fts USING fts5("
+            "name, content='students', content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            "CREATE VIRTUAL TABLE IF NOT EXISTS students_fts_vocab USING fts5vocab(students_fts, 'row')",
+            "CREATE TRIGGER IF NOT EXISTS students_fts_insert AFTER INSERT ON students BEGIN "
+            "INSERT INTO students_fts(rowid, name) VALUES (new.id, new.name); END",
+            "CREATE TRIGGER IF NOT EXISTS students_fts_delete AFTER DELETE ON students BEGIN "
+            "INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+            "CREATE TRIGGER IF NOT EXISTS students_fts_update AFTER UPDATE OF name ON students BEGIN "
+            "INSERT INTO students_fts(students_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+            "INSERT INTO students_fts(rowid, name) VALUES (new.id, new.name); END",
+            "CREATE INDEX IF NOT EXISTS ix_students_email_lower ON students (lower(email))",
+        ],
+        "postgresql": [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            "CREATE INDEX IF NOT EXISTS ix_students_name_trgm ON students USING GIN (lower(name) gin_trgm_ops)",
+            "CREATE INDEX IF NOT EXISTS ix_students_email_lower ON students (lower(email))",
+        ],
+    },
+}
+# SQLite search tables per source table; the first one is the FTS index rebuilt from existing rows
+_SEARCH_TABLES = {"courses": ["courses_fts"], "students": ["students_fts", "students_fts_vocab"]}
+
+for _table_name, _by_dialect in _SEARCH_DDL.items():
+    _table = Base.metadata.tables[_table_name]
+    for _dialect, _statements in _by_dialect.items():
+        for _statement in _statements:
+            event.listen(_table, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+    for _search_table in reversed(_SEARCH_TABLES[_table_name]):
+        event.listen(_table, "before_drop", DDL(f"DROP TABLE IF EXISTS {_search_table}").execute_if(dialect="sqlite"))
+
+def ensure_search_indexes():
+    """Create the search indexes on databases whose tables predate them"""
+    dialect = engine.dialect.name
+    with engine.begin() as connection:
+        for table_name, by_dialect in _SEARCH_DDL.items():
+            statements = by_dialect.get(dialect, [])
+            search_table = _SEARCH_TABLES[table_name][0]
+            needs_rebuild = dialect == "sqlite" and not inspect(connection).has_table(search_table)
+            for statement in statements:
+                connection.execute(text(statement))
+            if statements and needs_rebuild:
+                # Index the rows that already exist; the triggers cover everything after this
+                connection.execute(text(f"INSERT INTO {search_table}({search_table}) VALUES ('rebuild')"))
 
 def get_db():
     db = SessionLocal()
@@ -258,6 +525,37 @@ def get_db():
     finally:
         db.close()
 
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+@contextmanager
+def read_your_writes():
+    """Route get_read_db() to the primary inside this block, e.g. for a report right after a write"""
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+def get_read_db(read_your_writes: bool = False):
+    """Yield a session for read-only work on the read engine.
+
+    A replica may lag the primary; pass read_your_writes=True (or wrap the call in
+    read_your_writes()) when the caller must see data it has just committed.
+    """
+    db = SessionLocal() if read_your_writes or _primary_reads.get() else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def dialect_insert(model):
+    """Return an INSERT construct for the active dialect so callers can use on_conflict_* clauses"""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
 def init_db():
     """Initialize the database and create all tables"""
     try:
@@ -265,6 +563,13 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         print("✅ Tables created successfully!")
         
+        # create_all skips tables that already exist, so add any indexes declared since they were created
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        ensure_search_indexes()
+        print("✅ Indexes verified!")
+        
         # Test connection
         with engine.connect() as connection:
             print("✅ Database connection successful.")
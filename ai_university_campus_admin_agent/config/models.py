@@ -0,0 +1,213 @@
+# models.py
+from dotenv import load_dotenv
+from typing import AsyncGenerator, Dict, List, Optional, Union
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from pydantic import Field
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+load_dotenv()
+
+# gemini: call the named model as usual; record: call it and append every request and response to
+# MODEL_RECORDING; replay: answer from MODEL_RECORDING without the network; stub: answer "Done." after
+# STUB_MODEL_LATENCY_MS
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "gemini")
+MODEL_RECORDING = os.getenv("MODEL_RECORDING", "recordings/conversation.jsonl")
+# Empty replays each response after the latency it was recorded with; a number replays after that many ms
+MODEL_REPLAY_LATENCY_MS = os.getenv("MODEL_REPLAY_LATENCY_MS", "")
+STUB_MODEL_LATENCY_MS = float(os.getenv("STUB_MODEL_LATENCY_MS", "500"))
+
+class ModelStats:
+    """Calls and seconds spent in the model, shared by every backend built here unless given its own"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count = 0
+            self.seconds = 0.0
+
+model_stats = ModelStats()
+
+def _request_json(llm_request: LlmRequest) -> List[dict]:
+    contents = [content.model_dump(mode="json", exclude_none=True) for content in llm_request.contents]
+    # ADK gives function calls random ids, so they are left out of the fingerprints
+    for content in contents:
+        for part in content.get("parts", []):
+            for field in ("function_call", "function_response"):
+                if field in part:
+                    part[field].pop("id", None)
+            part.pop("thought_signature", None)
+    return contents
+
+def _hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:24]
+
+def request_fingerprints(llm_request: LlmRequest) -> Dict[str, str]:
+    """key: the exact request; shape: the agent, its tools and the turn structure, without any values.
+
+    Replays match on key first and fall back to shape, so tool results that differ between runs
+    (timestamps, generated ids) still find their recorded response.
+    """
+    config = llm_request.config
+    system = config.system_instruction if config else None
+    tools = sorted(llm_request.tools_dict)
+    contents = _request_json(llm_request)
+    shape = [
+        [content.get("role")] + [
+            f"call:{part['function_call'].get('name')}" if "function_call" in part
+            else f"response:{part['function_response'].get('name')}" if "function_response" in part
+            else "text"
+            for part in content.get("parts", [])
+        ]
+        for content in contents
+    ]
+    return {
+        "key": _hash([llm_request.model, system, tools, contents]),
+        "shape": _hash([llm_request.model, system, tools, shape])
+    }
+
+class StubLlm(BaseLlm):
+    """Answers after a fixed latency from a script keyed by the function response it was just given ("" for a fresh request)"""
+
+    script: Dict[str, List[types.Part]] = Field(default_factory=dict)
+    latency: float = STUB_MODEL_LATENCY_MS / 1000
+    stats: ModelStats = Field(default_factory=lambda: model_stats)
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        started = time.perf_counter()
+        await asyncio.sleep(self.latency)
+        responses = [part.function_response.name for part in llm_request.contents[-1].parts or [] if part.function_response]
+        parts = self.script.get(responses[0] if responses else "", [types.Part.from_text(text="Done.")])
+        self.stats.add(time.perf_counter() - started)
+        yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+class RecordingLlm(BaseLlm):
+    """Calls the real model (or `inner`) and appends each request and its responses to a JSONL recording"""
+
+    recording: str = MODEL_RECORDING
+    inner: Optional[BaseLlm] = None
+    stats: ModelStats = Field(default_factory=lambda: model_stats)
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        if self.inner is None:
+            self.inner = LLMRegistry.new_llm(self.model)
+        # Only time spent waiting on the model; the caller runs tools and sub-agents between responses
+        elapsed = 0.0
+        waiting_since = time.perf_counter()
+        responses = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            elapsed += time.perf_counter() - waiting_since
+            responses.append(response)
+            yield response
+            waiting_since = time.perf_counter()
+        # A stub recorded through this wrapper already counted the call
+        if getattr(self.inner, "stats", None) is not self.stats:
+            self.stats.add(elapsed)
+        record = {
+            **request_fingerprints(llm_request),
+            "model": self.model,
+            "latency_ms": round(elapsed * 1000, 1),
+            "request": _request_json(llm_request),
+            "responses": [response.model_dump(mode="json", exclude_none=True) for response in responses]
+        }
+        _append_record(self.recording, record)
+
+_recording_lock = threading.Lock()
+
+def _append_record(path: str, record: dict) -> None:
+    with _recording_lock:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record) + "\n")
+
+class Recording:
+    """Recorded responses from a JSONL file, each served once, in recorded order"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.records: List[dict] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_shape: Dict[str, List[int]] = {}
+        self._used: List[bool] = []
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    self.records.append(json.loads(line))
+        self.rewind()
+
+    def rewind(self) -> None:
+        """Make every recorded response available again, e.g. before replaying the conversation once more"""
+        with self._lock:
+            self._by_key, self._by_shape = {}, {}
+            for index, record in enumerate(self.records):
+                self._by_key.setdefault(record["key"], []).append(index)
+                self._by_shape.setdefault(record["shape"], []).append(index)
+            self._used = [False] * len(self.records)
+
+    def take(self, fingerprints: Dict[str, str]) -> Optional[dict]:
+        with self._lock:
+            for candidates in (self._by_key.get(fingerprints["key"], []), self._by_shape.get(fingerprints["shape"], [])):
+                for index in candidates:
+                    if not self._used[index]:
+                        self._used[index] = True
+                        return self.records[index]
+            return None
+
+_recordings: Dict[str, Recording] = {}
+
+def load_recording(path: str) -> Recording:
+    if path not in _recordings:
+        _recordings[path] = Recording(path)
+    return _recordings[path]
+
+class ReplayLlm(BaseLlm):
+    """Answers from a recording, after the recorded latency or `latency_ms`, without calling the model"""
+
+    recording: str = MODEL_RECORDING
+    latency_ms: Optional[float] = float(MODEL_REPLAY_LATENCY_MS) if MODEL_REPLAY_LATENCY_MS else None
+    stats: ModelStats = Field(default_factory=lambda: model_stats)
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        started = time.perf_counter()
+        record = load_recording(self.recording).take(request_fingerprints(llm_request))
+        if record is None:
+            raise LookupError(
+                f"No recorded response in {self.recording} for this {self.model} request; "
+                "record the conversation again with MODEL_BACKEND=record"
+            )
+        latency_ms = record["latency_ms"] if self.latency_ms is None else self.latency_ms
+        await asyncio.sleep(latency_ms / 1000)
+        self.stats.add(time.perf_counter() - started)
+        for response in record["responses"]:
+            yield LlmResponse.model_validate(response)
+
+def get_model(name: str) -> Union[str, BaseLlm]:
+    """The model for an agent under MODEL_BACKEND; the plain name (the real model) unless offline backends are chosen"""
+    if MODEL_BACKEND == "record":
+        return RecordingLlm(model=name)
+    if MODEL_BACKEND == "replay":
+        return ReplayLlm(model=name)
+    if MODEL_BACKEND == "stub":
+        return StubLlm(model=name)
+    if MODEL_BACKEND != "gemini":
+        raise ValueError(f"Unknown MODEL_BACKEND: {MODEL_BACKEND}. Use gemini, record, replay or stub")
+    return name
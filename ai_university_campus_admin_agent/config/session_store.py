@@ -0,0 +1,260 @@
+# session_store.py
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional
+from collections import deque
+from google.adk.events.event import Event
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.database_session_service import StorageEvent, StorageSession
+from google.adk.sessions.session import Session
+from google.genai import types
+from sqlalchemy import Index, func, delete, tuple_
+import datetime
+import logging
+import os
+import statistics
+import threading
+import time
+import uuid
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Conversation sessions live apart from student and payment data: their own URL and connection pool
+SESSION_DATABASE_URL = os.getenv("SESSION_DATABASE_URL") or os.getenv("DATABASE_URL")
+SESSION_DB_POOL_SIZE = int(os.getenv("SESSION_DB_POOL_SIZE", "5"))
+
+# Once a session holds more than SESSION_MAX_EVENTS events, older turns are folded into one summary
+# event and only the most recent SESSION_KEEP_EVENTS (rounded to a whole user turn) are kept
+SESSION_MAX_EVENTS = int(os.getenv("SESSION_MAX_EVENTS", "120"))
+SESSION_KEEP_EVENTS = int(os.getenv("SESSION_KEEP_EVENTS", "40"))
+SESSION_SUMMARY_CHARS = int(os.getenv("SESSION_SUMMARY_CHARS", "2000"))
+
+# Sessions idle for longer than this are removed by expire_idle_sessions
+SESSION_IDLE_TTL_HOURS = float(os.getenv("SESSION_IDLE_TTL_HOURS", "72"))
+SESSION_SLOW_LOAD_MS = float(os.getenv("SESSION_SLOW_LOAD_MS", "250"))
+
+SUMMARY_PREFIX = "[Summary of the earlier conversation]"
+
+# The events primary key starts with the event id, so without this every session load scans all events
+session_events_index = Index(
+    "ix_events_session_timestamp",
+    StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id, StorageEvent.timestamp
+)
+session_update_index = Index("ix_sessions_update_time", StorageSession.update_time)
+
+class SessionStoreMetrics:
+    """Load times and compaction counters for the session store"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._load_ms = deque(maxlen=window)
+        self.loads = 0
+        self.events_loaded = 0
+        self.compactions = 0
+        self.events_compacted = 0
+        self.sessions_expired = 0
+
+    def record_load(self, elapsed_ms: float, events: int) -> None:
+        with self._lock:
+            self._load_ms.append(elapsed_ms)
+            self.loads += 1
+            self.events_loaded += events
+
+    def record_compaction(self, removed: int) -> None:
+        with self._lock:
+            self.compactions += 1
+            self.events_compacted += removed
+
+    def record_expiry(self, sessions: int) -> None:
+        with self._lock:
+            self.sessions_expired += sessions
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = sorted(self._load_ms)
+            return {
+                "loads": self.loads,
+                "load_ms_p50": round(statistics.median(recent), 2) if recent else None,
+                "load_ms_p95": round(recent[int(len(recent) * 0.95)], 2) if recent else None,
+                "load_ms_max": round(recent[-1], 2) if recent else None,
+                "avg_events_per_load": round(self.events_loaded / self.loads, 1) if self.loads else None,
+                "compactions": self.compactions,
+                "events_compacted": self.events_compacted,
+                "sessions_expired": self.sessions_expired
+            }
+
+session_metrics = SessionStoreMetrics()
+
+def _event_text(content: Optional[Dict[str, Any]]) -> str:
+    """The plain text of a stored event's content, ignoring function calls and responses"""
+    parts = (content or {}).get("parts") or []
+    return " ".join(part["text"].strip() for part in parts if part.get("text")).strip()
+
+class CompactingSessionService(DatabaseSessionService):
+    """DatabaseSessionService with an indexed, bounded event history.
+
+    Loads read at most max_events recent events through an index on the session, and once a
+    session grows past max_events the older turns are replaced by a single summary event, so a
+    long-running chat costs the same to load on turn 500 as on turn 50.
+    """
+
+    def __init__(self, db_url: str, max_events: int = SESSION_MAX_EVENTS, keep_events: int = SESSION_KEEP_EVENTS,
+                 metrics: SessionStoreMetrics = session_metrics, **kwargs: Any):
+        if keep_events >= max_events:
+            raise ValueError("keep_events must be smaller than max_events")
+        super().__init__(db_url, **kwargs)
+        self.max_events = max_events
+        self.keep_events = keep_events
+        self.metrics = metrics
+        # Tables created before these indexes existed get them here
+        session_events_index.create(self.db_engine, checkfirst=True)
+        session_update_index.create(self.db_engine, checkfirst=True)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        started = time.perf_counter()
+        if config is None or not config.num_recent_events:
+            config = GetSessionConfig(
+                num_recent_events=self.max_events,
+                after_timestamp=config.after_timestamp if config else None
+            )
+        session = await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+        if session is not None:
+            # A window can start mid-turn (e.g. at a function response whose call fell outside it)
+            first_turn = next((index for index, event in enumerate(session.events) if event.author == "user"), 0)
+            del session.events[:first_turn]
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.metrics.record_load(elapsed_ms, len(session.events))
+            if elapsed_ms > SESSION_SLOW_LOAD_MS:
+                logger.warning("Slow session load: %s had %d events and took %.1f ms", session_id, len(session.events), elapsed_ms)
+        return session
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await super().append_event(session=session, event=event)
+        if not event.partial and event.author == "user":
+            # Compact between turns, never in the middle of an agent's tool calls
+            self.compact_session(session.app_name, session.user_id, session.id)
+        return event
+
+    def compact_session(self, app_name: str, user_id: str, session_id: str) -> int:
+        """Fold a session's older turns into one summary event; returns the number of events removed"""
+        session_filter = (
+            StorageEvent.app_name == app_name,
+            StorageEvent.user_id == user_id,
+            StorageEvent.session_id == session_id
+        )
+        with self.database_session_factory() as sql_session:
+            count = sql_session.query(func.count()).select_from(StorageEvent).filter(*session_filter).scalar()
+            if count <= self.max_events:
+                return 0
+
+            events = sql_session.query(
+                StorageEvent.id, StorageEvent.author, StorageEvent.timestamp, StorageEvent.content
+            ).filter(*session_filter).order_by(StorageEvent.timestamp).all()
+
+            # Keep whole turns: the kept history starts at a user message
+            cut = len(events) - self.keep_events
+            while cut < len(events) and events[cut].author != "user":
+                cut += 1
+            if cut >= len(events):
+                return 0
+            dropped, first_kept = events[:cut], events[cut]
+
+            lines = []
+            for row in dropped:
+                text = _event_text(row.content)
+                if text.startswith(SUMMARY_PREFIX):
+                    lines.append(text[len(SUMMARY_PREFIX):].strip())
+                elif text:
+                    lines.append(f"{row.author}: {text[:300]}")
+            summary = "\n".join(lines)[-SESSION_SUMMARY_CHARS:]
+
+            sql_session.execute(
+                delete(StorageEvent).where(*session_filter, StorageEvent.id.in_([row.id for row in dropped]))
+            )
+            if summary:
+                summary_event = StorageEvent.from_event(
+                    Session(app_name=app_name, user_id=user_id, id=session_id),
+                    Event(
+                        invocation_id=f"compaction-{uuid.uuid4().hex}",
+                        author="user",
+                        content=types.Content(role="user", parts=[types.Part(text=f"{SUMMARY_PREFIX}\n{summary}")])
+                    )
+                )
+                # Sort just before the oldest kept event so the summary opens the history
+                summary_event.timestamp = first_kept.timestamp - datetime.timedelta(microseconds=1)
+                sql_session.add(summary_event)
+            sql_session.commit()
+
+        self.metrics.record_compaction(len(dropped))
+        logger.info("Compacted session %s: %d events folded into a summary", session_id, len(dropped))
+        return len(dropped)
+
+    def expire_idle_sessions(self, idle_hours: float = SESSION_IDLE_TTL_HOURS, chunk_size: int = 500) -> Dict[str, Any]:
+        """Delete sessions (and their events) idle for longer than idle_hours, chunk_size sessions per transaction"""
+        if chunk_size <= 0:
+            return {"status": "error", "message": "chunk_size must be positive"}
+
+        started = time.perf_counter()
+        sessions_deleted = 0
+        events_deleted = 0
+        chunks = 0
+        try:
+            # update_time is written by the database's now(), so measure idleness on the same clock
+            with self.database_session_factory() as sql_session:
+                cutoff = sql_session.query(func.now()).scalar() - datetime.timedelta(hours=idle_hours)
+            while True:
+                with self.database_session_factory() as sql_session:
+                    keys = sql_session.query(
+                        StorageSession.app_name, StorageSession.user_id, StorageSession.id
+                    ).filter(StorageSession.update_time < cutoff).limit(chunk_size).all()
+                    if not keys:
+                        break
+                    keys = [tuple(key) for key in keys]
+                    # Delete events explicitly rather than relying on ON DELETE CASCADE being enforced
+                    events_deleted += sql_session.execute(
+                        delete(StorageEvent).where(
+                            tuple_(StorageEvent.app_name, StorageEvent.user_id, StorageEvent.session_id).in_(keys)
+                        )
+                    ).rowcount
+                    sessions_deleted += sql_session.execute(
+                        delete(StorageSession).where(
+                            tuple_(StorageSession.app_name, StorageSession.user_id, StorageSession.id).in_(keys)
+                        )
+                    ).rowcount
+                    sql_session.commit()
+                chunks += 1
+
+            self.metrics.record_expiry(sessions_deleted)
+            return {
+                "status": "success",
+                "message": f"Expired {sessions_deleted} sessions idle for more than {idle_hours:g} hours",
+                "sessions_deleted": sessions_deleted,
+                "events_deleted": events_deleted,
+                "chunks": chunks,
+                "duration_seconds": round(time.perf_counter() - started, 3)
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e), "sessions_deleted": sessions_deleted, "chunks": chunks}
+
+def create_session_service(db_url: Optional[str] = None, **kwargs: Any) -> CompactingSessionService:
+    """Build the conversation session service on its own engine and connection pool"""
+    db_url = db_url or SESSION_DATABASE_URL
+    if not db_url:
+        raise ValueError("SESSION_DATABASE_URL or DATABASE_URL environment variable must be set")
+    if not db_url.startswith("sqlite"):
+        kwargs.setdefault("pool_size", SESSION_DB_POOL_SIZE)
+        kwargs.setdefault("pool_pre_ping", True)
+    return CompactingSessionService(db_url, **kwargs)
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Delete conversation sessions that have been idle longer than the TTL")
+    parser.add_argument("--idle-hours", type=float, default=SESSION_IDLE_TTL_HOURS)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(create_session_service().expire_idle_sessions(args.idle_hours, args.chunk_size), indent=2))
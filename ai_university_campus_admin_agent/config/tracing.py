@@ -0,0 +1,320 @@
+# tracing.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Sequence
+from collections import OrderedDict
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor, TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import base64
+import json
+import logging
+import os
+import queue
+import threading
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tracing is on when TRACE_FILE is set: each kept trace is appended to it as one line of OTLP JSON
+# (an ExportTraceServiceRequest, as the OpenTelemetry Collector file exporter writes them)
+TRACE_FILE = os.getenv("TRACE_FILE")
+# Fraction of traces kept, decided per trace id, plus every trace at least TRACE_SLOW_MS long (0 keeps none by duration)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "0"))
+# Traces still open are held in memory until their root span ends; past this many the oldest are dropped
+TRACE_MAX_PENDING = int(os.getenv("TRACE_MAX_PENDING", "1000"))
+TRACE_SQL_STATEMENT_CHARS = 1000
+# ADK puts whole model requests, responses and tool payloads on its spans. They hold student data and
+# most of the bytes, so they are left out of the file unless TRACE_CAPTURE_CONTENT=1
+TRACE_CAPTURE_CONTENT = os.getenv("TRACE_CAPTURE_CONTENT", "0") == "1"
+CONTENT_ATTRIBUTES = {
+    "gcp.vertex.agent.llm_request", "gcp.vertex.agent.llm_response", "gcp.vertex.agent.tool_call_args",
+    "gcp.vertex.agent.tool_response", "gcp.vertex.agent.data"
+}
+
+tracer = trace.get_tracer("ai_university_campus_admin_agent")
+
+class OtlpJsonFileExporter(SpanExporter):
+    """Appends each export as one line of OTLP/JSON (hex ids, as the OTLP JSON encoding specifies)"""
+
+    def __init__(self, path: str, capture_content: bool = TRACE_CAPTURE_CONTENT):
+        self.path = path
+        self.capture_content = capture_content
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        try:
+            from google.protobuf.json_format import MessageToDict
+            from opentelemetry.exporter.otlp.proto.common.trace_encoder import encode_spans
+        except ImportError:
+            logger.error("opentelemetry-exporter-otlp-proto-common is required for trace files: pip install opentelemetry-exporter-otlp-proto-common")
+            return SpanExportResult.FAILURE
+        request = MessageToDict(encode_spans(spans), use_integers_for_enums=True)
+        for resource_spans in request.get("resourceSpans", []):
+            for scope_spans in resource_spans.get("scopeSpans", []):
+                for span in scope_spans.get("spans", []):
+                    for field in ("traceId", "spanId", "parentSpanId"):
+                        if span.get(field):
+                            span[field] = base64.b64decode(span[field]).hex()
+                    if not self.capture_content:
+                        span["attributes"] = [
+                            attribute for attribute in span.get("attributes", []) if attribute["key"] not in CONTENT_ATTRIBUTES
+                        ]
+        try:
+            with self._lock:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(request, separators=(",", ":")) + "\n")
+        except OSError:
+            logger.exception("Could not write traces to %s", self.path)
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+class TailSamplingProcessor(SpanProcessor):
+    """Holds each trace's spans until its root span ends, then exports the whole trace or drops it.
+
+    Deciding at the end lets every slow trace be kept however low the sample rate is, which is
+    what "the agent took 14 seconds" needs. Kept traces are encoded and written on a background
+    thread, off the request path.
+    """
+
+    def __init__(self, exporter: SpanExporter, sample_rate: float = TRACE_SAMPLE_RATE,
+                 slow_ms: float = TRACE_SLOW_MS, max_pending: int = TRACE_MAX_PENDING):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending: "OrderedDict[int, List[ReadableSpan]]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[List[ReadableSpan]]]" = queue.Queue(maxsize=max_pending)
+        self._worker = threading.Thread(target=self._export_loop, name="trace-export", daemon=True)
+        self._worker.start()
+        self.kept = 0
+        self.dropped = 0
+
+    def _export_loop(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is None:
+                    return
+                self.exporter.export(spans)
+            except Exception:
+                logger.exception("Trace export failed")
+            finally:
+                self._queue.task_done()
+
+    def on_start(self, span, parent_context=None) -> None:
+        pass
+
+    def _sampled(self, trace_id: int) -> bool:
+        # The low 64 bits of a trace id are random, so the same trace id always gets the same answer
+        return (trace_id & 0xFFFFFFFFFFFFFFFF) < self.sample_rate * 2 ** 64
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        with self._lock:
+            spans = self._pending.setdefault(trace_id, [])
+            spans.append(span)
+            if span.parent is not None:
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                    self.dropped += 1
+                return
+            del self._pending[trace_id]
+        duration_ms = (span.end_time - span.start_time) / 1e6
+        if self._sampled(trace_id) or (self.slow_ms and duration_ms >= self.slow_ms):
+            try:
+                self._queue.put_nowait(spans)
+                self.kept += 1
+                return
+            except queue.Full:
+                logger.warning("Trace export is behind; dropping trace %032x", trace_id)
+        self.dropped += 1
+
+    def shutdown(self) -> None:
+        self.force_flush()
+        self._queue.put(None)
+        self._worker.join()
+        self.exporter.shutdown()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        """Wait until every kept trace has been written"""
+        self._queue.join()
+        return True
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    # Only statements run inside a trace get spans; batch jobs and startup queries are left alone
+    if not trace.get_current_span().get_span_context().is_valid:
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    span = tracer.start_span(f"sql {operation}", kind=trace.SpanKind.CLIENT, attributes={
+        "db.system": conn.engine.dialect.name,
+        "db.operation": operation,
+        "db.statement": statement[:TRACE_SQL_STATEMENT_CHARS],
+        "db.executemany": executemany
+    })
+    conn.info.setdefault("trace_spans", []).append(span)
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        span = spans.pop()
+        if cursor is not None and cursor.rowcount is not None and cursor.rowcount >= 0:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+        span.end()
+
+def _handle_error(exception_context):
+    spans = exception_context.connection.info.get("trace_spans") if exception_context.connection is not None else None
+    if spans:
+        span = spans.pop()
+        span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+        span.end()
+
+_setup_lock = threading.Lock()
+_processor: Optional[TailSamplingProcessor] = None
+
+def setup_tracing(path: Optional[str] = TRACE_FILE, sample_rate: float = TRACE_SAMPLE_RATE,
+                  slow_ms: float = TRACE_SLOW_MS) -> Optional[TailSamplingProcessor]:
+    """Write the spans ADK opens (invocation, agent_run, call_llm, execute_tool) and a span per SQL
+    statement to `path`, one trace per line. Does nothing without a path; safe to call twice."""
+    global _processor
+    if not path:
+        return None
+    with _setup_lock:
+        if _processor is not None:
+            return _processor
+        processor = TailSamplingProcessor(OtlpJsonFileExporter(path), sample_rate=sample_rate, slow_ms=slow_ms)
+        provider = trace.get_tracer_provider()
+        if not isinstance(provider, TracerProvider):
+            # adk web / api_server may already have installed a provider (e.g. --trace_to_cloud); add to it if so
+            provider = TracerProvider(resource=Resource.create({"service.name": "ai_university_campus_admin_agent"}))
+            trace.set_tracer_provider(provider)
+        provider.add_span_processor(processor)
+        event.listen(Engine, "before_cursor_execute", _before_execute)
+        event.listen(Engine, "after_cursor_execute", _after_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _processor = processor
+        logger.info("Tracing to %s (sample rate %s, slow traces from %s ms)", path, sample_rate, slow_ms or "off")
+        return processor
+
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """trace id -> its spans, each with name, ids, start and end in ns and attributes"""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            for resource_spans in json.loads(line).get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for span in scope_spans.get("spans", []):
+                        traces.setdefault(span["traceId"], []).append({
+                            "name": span["name"],
+                            "span_id": span["spanId"],
+                            "parent_id": span.get("parentSpanId") or None,
+                            "start": int(span["startTimeUnixNano"]),
+                            "end": int(span["endTimeUnixNano"]),
+                            "error": span.get("status", {}).get("code") == StatusCode.ERROR.value,
+                            "attributes": {
+                                attribute["key"]: next(iter(attribute.get("value", {}).values()), None)
+                                for attribute in span.get("attributes", [])
+                            }
+                        })
+    return traces
+
+def _category(name: str) -> str:
+    if name.startswith("sql "):
+        return "sql"
+    if name.startswith("call_llm"):
+        return "model"
+    if name.startswith("execute_tool"):
+        return "tool"
+    return "agent"
+
+def trace_breakdown(spans: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Self time in ms by model, tool (code only), sql and agent (routing, sessions, callbacks)"""
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+    totals = {"model": 0.0, "tool": 0.0, "sql": 0.0, "agent": 0.0}
+    for span in spans:
+        # Children may overlap (parallel tool calls); never count a span's self time below zero
+        child_ns = sum(child["end"] - child["start"] for child in children.get(span["span_id"], []))
+        totals[_category(span["name"])] += max(span["end"] - span["start"] - child_ns, 0) / 1e6
+    return totals
+
+def format_flame(spans: List[Dict[str, Any]], width: int = 40, min_ms: float = 0.0) -> List[str]:
+    """Span tree, one row per span, with a bar placed and sized by its share of the trace.
+
+    Consecutive siblings with the same name (the SQL statements of one tool) are merged into one row.
+    """
+    ids = {span["span_id"] for span in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+    roots = sorted(children.get(None, []), key=lambda span: span["start"])
+    start = min(span["start"] for span in roots)
+    total = max(max(span["end"] for span in roots) - start, 1)
+    lines: List[str] = []
+
+    def walk(group: List[Dict[str, Any]], depth: int):
+        group = sorted(group, key=lambda span: span["start"])
+        merged: List[List[Dict[str, Any]]] = []
+        for span in group:
+            leaf = not children.get(span["span_id"])
+            if merged and leaf and merged[-1][0]["name"] == span["name"] and not children.get(merged[-1][0]["span_id"]):
+                merged[-1].append(span)
+            else:
+                merged.append([span])
+        for run in merged:
+            first, last_end = run[0], max(span["end"] for span in run)
+            duration_ms = sum(span["end"] - span["start"] for span in run) / 1e6
+            if duration_ms < min_ms and depth > 0:
+                continue
+            label = "  " * depth + first["name"] + (f" x{len(run)}" if len(run) > 1 else "") + (" !" if any(span["error"] for span in run) else "")
+            offset = int((first["start"] - start) / total * width)
+            bar = " " * offset + "#" * max(1, int((last_end - first["start"]) / total * width))
+            lines.append(f"{label[:60]:60} {duration_ms:10.1f} ms  |{bar[:width]:{width}}|")
+            if len(run) == 1:
+                walk(children.get(first["span_id"], []), depth + 1)
+
+    walk(roots, 0)
+    return lines
+
+def slowest_traces_report(path: str, top: int = 5, min_ms: float = 0.0) -> str:
+    traces = load_traces(path)
+    ranked = sorted(
+        traces.items(),
+        key=lambda item: max(span["end"] for span in item[1]) - min(span["start"] for span in item[1]),
+        reverse=True
+    )
+    output = [f"{len(traces)} traces in {path}; slowest {min(top, len(traces))}:"]
+    for trace_id, spans in ranked[:top]:
+        duration_ms = (max(span["end"] for span in spans) - min(span["start"] for span in spans)) / 1e6
+        breakdown = trace_breakdown(spans)
+        output.append("")
+        output.append(f"trace {trace_id}  {duration_ms:.1f} ms  " + "  ".join(
+            f"{name} {ms:.1f} ms ({ms / duration_ms:.0%})" for name, ms in breakdown.items() if duration_ms
+        ))
+        output.extend(format_flame(spans, min_ms=min_ms))
+    return "\n".join(output)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Print a flame-style breakdown of the slowest traces in a trace file")
+    parser.add_argument("--file", default=TRACE_FILE or "traces/traces.jsonl")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--min-ms", type=float, default=0.0, help="hide spans shorter than this (the root is always shown)")
+    args = parser.parse_args()
+    print(slowest_traces_report(args.file, top=args.top, min_ms=args.min_ms))
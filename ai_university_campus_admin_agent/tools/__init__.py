@@ -6,6 +6,21 @@ from ai_university_campus_admin_agent.tools.analyst_tools import (
     get_course_performance
     )
 
+from ai_university_campus_admin_agent.tools.cohort_tools import (
+    get_cohort_retention,
+    get_course_drop_rates,
+    get_cohort_revenue
+)
+
+from ai_university_campus_admin_agent.tools.dashboard_tools import (
+    get_analytics_dashboard
+)
+
+from ai_university_campus_admin_agent.tools.forecast_tools import (
+    run_enrollment_forecast,
+    get_capacity_forecast
+)
+
 from ai_university_campus_admin_agent.tools.course_tools import (
     create_course,
     get_course,
@@ -31,4 +46,61 @@ from ai_university_campus_admin_agent.tools.registration_tools import (
     delete_student,
     enroll_course,
     get_student_registrations
+)
+
+from ai_university_campus_admin_agent.tools.overview_tools import (
+    get_student_overview
+)
+
+from ai_university_campus_admin_agent.tools.reconciliation_tools import (
+    import_bank_reconciliation
+)
+
+from ai_university_campus_admin_agent.tools.overdue_tools import (
+    run_overdue_fee_sweep
+)
+
+from ai_university_campus_admin_agent.tools.export_tools import (
+    export_snapshot
+)
+
+from ai_university_campus_admin_agent.tools.notification_tools import (
+    notify_course_students,
+    notify_department_students,
+    notify_all_students,
+    get_unread_notification_count,
+    get_student_notifications,
+    mark_notifications_read
+)
+
+from ai_university_campus_admin_agent.tools.schedule_tools import (
+    check_schedule_conflicts,
+    get_student_timetable
+)
+
+from ai_university_campus_admin_agent.tools.prerequisite_tools import (
+    check_course_eligibility,
+    get_eligible_courses,
+    detect_prerequisite_cycles
+)
+
+from ai_university_campus_admin_agent.tools.waitlist_tools import (
+    join_waitlist,
+    leave_waitlist,
+    get_waitlist_position
+)
+
+from ai_university_campus_admin_agent.tools.academic_tools import (
+    compute_academic_records,
+    post_grade,
+    get_academic_record
+)
+
+from ai_university_campus_admin_agent.tools.grade_tools import (
+    post_course_grades
+)
+
+from ai_university_campus_admin_agent.tools.search_tools import (
+    search_courses,
+    search_students
 )
\ No newline at end of file
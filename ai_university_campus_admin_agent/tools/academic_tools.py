@@ -0,0 +1,284 @@
+# academic_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Iterable
+from sqlalchemy.orm import Session
+from sqlalchemy import func, case, delete
+import datetime
+import time
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import (
+    get_db, dialect_insert, Student, Course, Registration, AcademicRecord, ActivityLog,
+    ActivityType, RegistrationStatus
+)
+
+load_dotenv()
+
+GRADE_POINTS = {
+    "A+": 4.0, "A": 4.0, "A-": 3.7,
+    "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7,
+    "D+": 1.3, "D": 1.0, "D-": 0.7,
+    "F": 0.0
+}
+
+# Terms within a calendar year, in the order they run
+SEMESTER_ORDER = {"winter": 0, "spring": 1, "summer": 2, "fall": 3, "autumn": 3}
+
+# Minimum cumulative earned credits for each class standing
+STANDING_THRESHOLDS = [(90, "Senior"), (60, "Junior"), (30, "Sophomore"), (0, "Freshman")]
+
+REFRESH_BATCH_SIZE = 500
+
+def standing_for(credits: int) -> str:
+    for minimum, standing in STANDING_THRESHOLDS:
+        if credits >= minimum:
+            return standing
+    return STANDING_THRESHOLDS[-1][1]
+
+def _term_key(semester: str, year: int):
+    return (year, SEMESTER_ORDER.get(semester.lower(), len(SEMESTER_ORDER)), semester)
+
+def _scope(column, student_ids: Optional[List[str]], after: Optional[str], upto: Optional[str]) -> list:
+    """Conditions restricting a student_id column to an explicit list or a keyset range"""
+    if student_ids is not None:
+        return [column.in_(student_ids)]
+    conditions = []
+    if after is not None:
+        conditions.append(column > after)
+    if upto is not None:
+        conditions.append(column <= upto)
+    return conditions
+
+def _write_records(db: Session, now: datetime.datetime, student_ids: Optional[List[str]] = None,
+                   after: Optional[str] = None, upto: Optional[str] = None) -> Dict[str, int]:
+    """Recompute and upsert the academic records of the students in scope, without committing.
+
+    Each record holds cumulative figures as of the end of its term: gpa is the credit-weighted
+    GPA over every graded course so far, total_credits the credits earned so far (an F attempts
+    credits but earns none) and standing follows from those credits.
+    """
+    # Quality points, attempted and earned credits per student and term in one GROUP BY
+    term_totals = db.query(
+        Registration.student_id,
+        Course.semester,
+        Course.year,
+        func.sum(Registration.grade_points * Course.credits),
+        func.sum(Course.credits),
+        func.sum(case((Registration.grade_points > 0, Course.credits), else_=0))
+    ).join(
+        Course, Course.id == Registration.course_id
+    ).filter(
+        *_scope(Registration.student_id, student_ids, after, upto),
+        Registration.status == RegistrationStatus.COMPLETED,
+        Registration.grade_points != None,
+        Course.semester != None,
+        Course.year != None
+    ).group_by(
+        Registration.student_id, Course.semester, Course.year
+    ).all()
+
+    by_student: Dict[str, list] = {}
+    for student_id, semester, year, quality_points, attempted, earned in term_totals:
+        by_student.setdefault(student_id, []).append((semester, year, quality_points or 0.0, attempted or 0, earned or 0))
+
+    rows = []
+    for student_id, terms in by_student.items():
+        terms.sort(key=lambda term: _term_key(term[0], term[1]))
+        cumulative_points = 0.0
+        cumulative_attempted = 0
+        cumulative_earned = 0
+        for semester, year, quality_points, attempted, earned in terms:
+            cumulative_points += quality_points
+            cumulative_attempted += attempted
+            cumulative_earned += earned
+            rows.append({
+                "student_id": student_id,
+                "semester": semester,
+                "year": year,
+                "total_credits": cumulative_earned,
+                "gpa": min(round(cumulative_points / cumulative_attempted, 2), 4.0) if cumulative_attempted else 0.0,
+                "standing": standing_for(cumulative_earned),
+                "created_at": now,
+                "updated_at": now
+            })
+
+    if rows:
+        stmt = dialect_insert(AcademicRecord.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["student_id", "semester", "year"],
+            set_={
+                "total_credits": stmt.excluded.total_credits,
+                "gpa": stmt.excluded.gpa,
+                "standing": stmt.excluded.standing,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        db.execute(stmt, rows)
+
+    # Records this run did not touch belong to terms that no longer have a graded course
+    removed = db.execute(
+        delete(AcademicRecord).where(
+            *_scope(AcademicRecord.student_id, student_ids, after, upto),
+            AcademicRecord.updated_at < now
+        )
+    ).rowcount
+
+    return {"students": len(by_student), "records": len(rows), "removed": removed}
+
+def refresh_academic_records(db: Session, student_ids: Iterable[str]) -> Dict[str, int]:
+    """Recompute the academic records of just these students inside the caller's transaction.
+
+    Called after grades are posted so only the affected students are re-aggregated.
+    """
+    student_ids = sorted(set(student_ids))
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    totals = {"students": 0, "records": 0, "removed": 0}
+    # Keep each IN list well below the database's bound-parameter limit
+    for start in range(0, len(student_ids), REFRESH_BATCH_SIZE):
+        counts = _write_records(db, now, student_ids=student_ids[start:start + REFRESH_BATCH_SIZE])
+        for key, value in counts.items():
+            totals[key] += value
+    return totals
+
+def compute_academic_records(chunk_size: int = 5000) -> Dict[str, Any]:
+    """Recompute GPA, earned credits and standing per term for every student.
+
+    Students are processed in student_id order in chunks, each covered by a single aggregate
+    query and committed on its own. The job is idempotent and can simply be rerun.
+    """
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+
+    db: Session = next(get_db())
+    started = time.perf_counter()
+    summary = {"students": 0, "records": 0, "removed": 0}
+    chunks = 0
+    try:
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        last_student_id = None
+        while True:
+            query = db.query(Student.student_id)
+            if last_student_id is not None:
+                query = query.filter(Student.student_id > last_student_id)
+            chunk_ids = query.order_by(Student.student_id).limit(chunk_size).subquery()
+            upper_id, scanned = db.query(func.max(chunk_ids.c.student_id), func.count()).select_from(chunk_ids).one()
+            if not scanned:
+                break
+
+            counts = _write_records(db, now, after=last_student_id, upto=upper_id)
+            db.commit()
+            for key, value in counts.items():
+                summary[key] += value
+            last_student_id = upper_id
+            chunks += 1
+
+        return {
+            "status": "success",
+            "message": "Academic records recomputed",
+            "chunks": chunks,
+            "summary": summary,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e), "chunks_committed": chunks, "summary": summary}
+    finally:
+        db.close()
+
+def post_grade(student_id: str, course_code: str, grade: str) -> Dict[str, Any]:
+    """Post a final letter grade for a student's course and update their academic record"""
+    db: Session = next(get_db())
+    try:
+        grade = grade.strip().upper()
+        if grade not in GRADE_POINTS:
+            return {"status": "error", "message": f"Invalid grade. Valid grades: {', '.join(GRADE_POINTS)}"}
+
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        registration = db.query(Registration).filter(
+            Registration.student_id == student_id,
+            Registration.course_id == course.id,
+            Registration.status.in_([RegistrationStatus.ACTIVE, RegistrationStatus.COMPLETED])
+        ).first()
+        if not registration:
+            return {"status": "error", "message": "Student has no active or completed registration for this course"}
+
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        registration.grade = grade
+        registration.grade_points = GRADE_POINTS[grade]
+        registration.status = RegistrationStatus.COMPLETED
+        registration.completion_date = registration.completion_date or now
+        registration.updated_at = now
+        db.add(ActivityLog(
+            student_id=student_id,
+            activity_type=ActivityType.SYSTEM_ACTION,
+            description=f"Grade {grade} posted for {course.course_code} - {course.course_name}",
+            timestamp=now
+        ))
+        db.flush()
+        refresh_academic_records(db, [student_id])
+        db.commit()
+
+        return {
+            "status": "success",
+            "message": f"Grade {grade} posted for {student_id} in {course_code}",
+            "academic_record": _latest_record(db, student_id)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def _record_dict(record: AcademicRecord) -> Dict[str, Any]:
+    return {
+        "semester": record.semester,
+        "year": record.year,
+        "gpa": record.gpa,
+        "total_credits": record.total_credits,
+        "standing": record.standing
+    }
+
+def _latest_record(db: Session, student_id: str) -> Optional[Dict[str, Any]]:
+    records = db.query(AcademicRecord).filter(AcademicRecord.student_id == student_id).all()
+    if not records:
+        return None
+    return _record_dict(max(records, key=lambda record: _term_key(record.semester, record.year)))
+
+def get_academic_record(student_id: str) -> Dict[str, Any]:
+    """Get a student's cumulative GPA, earned credits, class standing and term-by-term history"""
+    try:
+        db: Session = next(get_db())
+
+        records = db.query(AcademicRecord).filter(AcademicRecord.student_id == student_id).all()
+        if not records:
+            if not db.query(Student.id).filter(Student.student_id == student_id).first():
+                return {"status": "error", "message": "Student not found"}
+            return {
+                "status": "success",
+                "student_id": student_id,
+                "current": {"gpa": 0.0, "total_credits": 0, "standing": standing_for(0)},
+                "history": []
+            }
+
+        records.sort(key=lambda record: _term_key(record.semester, record.year))
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "current": _record_dict(records[-1]),
+            "history": [_record_dict(record) for record in records]
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Recompute GPA, credits and standing for every student (run after each term)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(compute_academic_records(args.chunk_size), indent=2))
@@ -12,13 +12,13 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func, desc, case
 import datetime
 from zoneinfo import ZoneInfo
-from ai_university_campus_admin_agent.config.database import get_db,FeeStructure, Student, Course, Registration, Payment, Department, ActivityLog
+from ai_university_campus_admin_agent.config.database import get_read_db, FeeStructure, Student, Course, Registration, Payment, Department, ActivityLog
 
 load_dotenv()
 def get_enrollment_statistics(department: Optional[str] = None, semester: Optional[str] = None) -> Dict[str, Any]:
     """Get comprehensive enrollment statistics"""
+    db: Session = next(get_read_db())
     try:
-        db: Session = next(get_db())
         
         # Base query for courses
         course_query = db.query(Course)
@@ -87,11 +87,13 @@ def get_enrollment_statistics(department: Optional[str] = None, semester: Option
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 def get_student_demographics() -> Dict[str, Any]:
     """Get student demographic statistics"""
+    db: Session = next(get_read_db())
     try:
-        db: Session = next(get_db())
         
         # Total students
         total_students = db.query(Student).count()
@@ -141,11 +143,13 @@ def get_student_demographics() -> Dict[str, Any]:
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 def get_financial_reports(timeframe: str = "current_semester") -> Dict[str, Any]:
     """Get financial reports and revenue statistics"""
+    db: Session = next(get_read_db())
     try:
-        db: Session = next(get_db())
         
         # Define time filters
         now = datetime.datetime.now(ZoneInfo("UTC"))
@@ -235,11 +239,13 @@ def get_financial_reports(timeframe: str = "current_semester") -> Dict[str, Any]
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 def get_activity_report(days: int = 30) -> Dict[str, Any]:
     """Get system activity report"""
+    db: Session = next(get_read_db())
     try:
-        db: Session = next(get_db())
         
         start_date = datetime.datetime.now(ZoneInfo("UTC")) - datetime.timedelta(days=days)
         
@@ -311,11 +317,13 @@ def get_activity_report(days: int = 30) -> Dict[str, Any]:
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 def get_course_performance() -> Dict[str, Any]:
     """Get course performance and completion statistics"""
+    db: Session = next(get_read_db())
     try:
-        db: Session = next(get_db())
         
         # Course completion rates
         completion_stats = db.query(
@@ -369,4 +377,6 @@ def get_course_performance() -> Dict[str, Any]:
             "department_performance": department_stats
         }
     except Exception as e:
-        return {"status": "error", "message": str(e)}
\ No newline at end of file
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
\ No newline at end of file
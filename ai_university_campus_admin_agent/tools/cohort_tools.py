@@ -0,0 +1,376 @@
+# cohort_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple
+from functools import cached_property
+from sqlalchemy.orm import Session
+from sqlalchemy import func, extract, type_coerce, or_, String
+import datetime
+import logging
+import os
+import threading
+import time
+import numpy as np
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import get_read_db, Student, Course, Registration, Payment, RegistrationStatus, PaymentStatus
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Changes are applied incrementally; a full reload also picks up deleted rows, in the background
+COHORT_FULL_RELOAD_SECONDS = int(os.getenv("COHORT_FULL_RELOAD_SECONDS", "3600"))
+
+SEMESTER_ORDER = {"Spring": 0, "Summer": 1, "Fall": 2}
+STATUS_CODES = {status.name: code for code, status in enumerate(RegistrationStatus)}
+DROPPED = STATUS_CODES[RegistrationStatus.DROPPED.name]
+WITHDRAWN = STATUS_CODES[RegistrationStatus.WITHDRAWN.name]
+
+Columns = Dict[str, np.ndarray]
+
+def _month_number(column):
+    """Months since year 0 (year * 12 + month - 1), computed in the database"""
+    return extract("year", column) * 12 + extract("month", column) - 1
+
+def _month_label(month: int) -> str:
+    return f"{month // 12:04d}-{month % 12 + 1:02d}"
+
+def _parse_month(value: str) -> int:
+    year, month = value.split("-")
+    return int(year) * 12 + int(month) - 1
+
+def _changed_since(model, marks: Optional[Tuple[Any, Any]]):
+    """Rows inserted or updated after a snapshot's (highest id, latest updated_at); both are indexed"""
+    if marks is None:
+        return None
+    max_id, max_updated_at = marks
+    if max_updated_at is None:
+        return model.id > (max_id or 0)
+    return or_(model.id > (max_id or 0), model.updated_at > max_updated_at)
+
+def _fetch(query, changed, model, names: List[str], dtypes: List[Any]) -> Columns:
+    """Columns sorted by id: the whole table, or only the rows matching changed"""
+    # A full load reads in rowid order anyway; for changed rows ORDER BY id would make SQLite
+    # walk the whole table instead of the two indexes, so those are sorted here
+    rows = query.filter(changed).all() if changed is not None else query.order_by(model.id).all()
+    values = list(zip(*rows)) or [()] * len(names)
+    columns = {name: np.array(column, dtype=dtype) for name, column, dtype in zip(names, values, dtypes)}
+    if changed is not None:
+        order = np.argsort(columns["id"], kind="stable")
+        columns = {name: column[order] for name, column in columns.items()}
+    return columns
+
+def _merge(current: Columns, changed: Columns) -> Optional[Columns]:
+    """Apply changed rows to id-sorted columns: update rows that exist, append new ones.
+
+    Returns None if a new row would not sort after the existing ones, which needs a full reload.
+    """
+    if not len(changed["id"]):
+        return current
+    positions = np.searchsorted(current["id"], changed["id"])
+    found = positions < len(current["id"])
+    found[found] = current["id"][positions[found]] == changed["id"][found]
+    new = ~found
+    if new.any() and len(current["id"]) and changed["id"][new][0] <= current["id"][-1]:
+        return None
+    merged = {}
+    for name, column in current.items():
+        column = column.copy()
+        column[positions[found]] = changed[name][found]
+        merged[name] = np.concatenate([column, changed[name][new]])
+    return merged
+
+class CohortData:
+    """Students, courses, registrations and payments as id-sorted NumPy columns.
+
+    A snapshot is keyed by each source table's highest id and latest updated_at. It is never
+    modified: refreshing builds a new snapshot from the changed rows alone, so a report that is
+    already running keeps reading consistent arrays.
+    """
+
+    def __init__(self, marks: tuple, students: Columns, courses: Columns, term_labels: List[str],
+                 registrations: Columns, payments: Columns, full_loaded_at: float):
+        self.marks = marks
+        self.students = students
+        self.courses = courses
+        self.term_labels = term_labels
+        self.registrations = registrations
+        self.payments = payments
+        self.full_loaded_at = full_loaded_at
+        self.reg_course = np.searchsorted(courses["id"], registrations["course_id"])
+
+    @cached_property
+    def last_active_month(self) -> np.ndarray:
+        """Each student's last month with a registration they did not drop or withdraw from, -1 if none"""
+        status = self.registrations["status"]
+        kept = (status != DROPPED) & (status != WITHDRAWN) & (self.registrations["student"] >= 0)
+        last_month = np.full(len(self.students["id"]), -1, dtype=np.int64)
+        np.maximum.at(last_month, self.registrations["student"][kept], self.registrations["month"][kept])
+        return last_month
+
+    @staticmethod
+    def data_version(db: Session) -> tuple:
+        """Highest id and latest update per source table: one index lookup each"""
+        marks = []
+        for model in (Student, Course, Registration, Payment):
+            # Separate queries: SQLite only answers a lone min() or max() from the index
+            marks.append((db.query(func.max(model.id)).scalar(), db.query(func.max(model.updated_at)).scalar()))
+        return tuple(marks)
+
+    @classmethod
+    def build(cls, db: Session, previous: Optional["CohortData"] = None) -> "CohortData":
+        """Load a snapshot, from scratch or by applying the rows changed since previous"""
+        marks = cls.data_version(db)
+        if previous is not None and marks == previous.marks:
+            return previous
+        started = time.perf_counter()
+        since = previous.marks if previous is not None else (None,) * 4
+
+        course_rows = db.query(
+            Course.id, Course.course_code, Course.course_name, Course.department, Course.semester, Course.year
+        ).order_by(Course.id).all()
+        term_keys = [((row.year or 0) * 3 + SEMESTER_ORDER.get(row.semester, 0), f"{row.semester} {row.year}") for row in course_rows]
+        distinct_terms = sorted(set(term_keys))
+        term_index = {key: index for index, key in enumerate(distinct_terms)}
+        courses = {
+            "id": np.array([row.id for row in course_rows], dtype=np.int64),
+            "course_code": np.array([row.course_code for row in course_rows], dtype=object),
+            "course_name": np.array([row.course_name for row in course_rows], dtype=object),
+            "department": np.array([row.department for row in course_rows], dtype=object),
+            "term": np.array([term_index[key] for key in term_keys], dtype=np.int32)
+        }
+
+        students = _fetch(
+            db.query(Student.id, Student.student_id, Student.department,
+                     _month_number(func.coalesce(Student.enrollment_date, Student.created_at))),
+            _changed_since(Student, since[0]), Student,
+            ["id", "student_id", "department", "cohort"], [np.int64, object, object, np.int32]
+        )
+        registrations = _fetch(
+            db.query(Registration.id, Registration.student_id, Registration.course_id, type_coerce(Registration.status, String),
+                     _month_number(func.coalesce(Registration.registration_date, Registration.created_at))),
+            _changed_since(Registration, since[2]), Registration,
+            ["id", "student_id", "course_id", "status", "month"], [np.int64, object, np.int64, object, np.int32]
+        )
+        status_names, status_index = np.unique(registrations["status"].astype(str), return_inverse=True)
+        registrations["status"] = np.array([STATUS_CODES[name] for name in status_names], dtype=np.int8)[status_index] \
+            if len(status_index) else np.zeros(0, dtype=np.int8)
+        payments = _fetch(
+            db.query(Payment.id, Payment.student_id, Payment.amount_paid, Payment.status == PaymentStatus.PAID,
+                     _month_number(func.coalesce(Payment.payment_date, Payment.created_at))),
+            _changed_since(Payment, since[3]), Payment,
+            ["id", "student_id", "amount", "paid", "month"], [np.int64, object, np.float64, bool, np.int32]
+        )
+        term_labels = [label for _, label in distinct_terms]
+
+        changed_rows = len(students["id"]) + len(registrations["id"]) + len(payments["id"])
+        if previous is not None:
+            students = _merge(previous.students, students)
+        # Registrations and payments refer to students by position, resolved once when a row is loaded
+        if len(registrations["id"]) or len(payments["id"]):
+            position_of = dict(zip(students["student_id"].tolist(), range(len(students["id"]))))
+            for rows in (registrations, payments):
+                rows["student"] = np.array([position_of.get(student_id, -1) for student_id in rows.pop("student_id").tolist()], dtype=np.int64)
+        else:
+            registrations["student"] = np.zeros(0, dtype=np.int64)
+            payments["student"] = np.zeros(0, dtype=np.int64)
+            del registrations["student_id"], payments["student_id"]
+
+        if previous is not None:
+            registrations = _merge(previous.registrations, registrations)
+            payments = _merge(previous.payments, payments)
+            if students is None or registrations is None or payments is None:
+                return cls.build(db)
+            snapshot = cls(marks, students, courses, term_labels, registrations, payments, previous.full_loaded_at)
+            logger.info("Refreshed cohort data with %d changed rows in %.3fs", changed_rows, time.perf_counter() - started)
+            return snapshot
+
+        snapshot = cls(marks, students, courses, term_labels, registrations, payments, time.monotonic())
+        logger.info("Loaded cohort data: %d students, %d registrations, %d payments in %.2fs",
+                    len(students["id"]), len(registrations["id"]), len(payments["id"]), time.perf_counter() - started)
+        return snapshot
+
+cohort_data: Optional[CohortData] = None
+_refresh_lock = threading.Lock()
+_reloading = threading.Event()
+
+def _reload_in_background() -> None:
+    global cohort_data
+    db: Session = next(get_read_db())
+    try:
+        fresh = CohortData.build(db)
+        with _refresh_lock:
+            cohort_data = fresh
+    except Exception:
+        logger.exception("Cohort data reload failed")
+    finally:
+        db.close()
+        _reloading.clear()
+
+def get_cohort_data(db: Session) -> CohortData:
+    """The cached cohort arrays, brought up to date with any rows changed since they were built"""
+    global cohort_data
+    with _refresh_lock:
+        cohort_data = CohortData.build(db, cohort_data)
+        snapshot = cohort_data
+    if time.monotonic() - snapshot.full_loaded_at > COHORT_FULL_RELOAD_SECONDS and not _reloading.is_set():
+        _reloading.set()
+        threading.Thread(target=_reload_in_background, name="cohort-reload", daemon=True).start()
+    return snapshot
+
+def _current_month() -> int:
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    return now.year * 12 + now.month - 1
+
+def _select_cohorts(data: CohortData, department: Optional[str], since: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Students in scope, the distinct cohort months among them, and each student's cohort index.
+
+    The index array has one extra trailing -1, which is where rows for unknown students (position -1) land.
+    """
+    mask = np.ones(len(data.students["id"]), dtype=bool)
+    if department:
+        mask &= data.students["department"] == department
+    if since:
+        mask &= data.students["cohort"] >= _parse_month(since)
+    cohorts, index = np.unique(data.students["cohort"][mask], return_inverse=True)
+    student_cohort_index = np.full(len(mask) + 1, -1, dtype=np.int64)
+    student_cohort_index[:-1][mask] = index
+    return mask, cohorts, student_cohort_index
+
+def get_cohort_retention(months: int = 12, department: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+    """Retention of each enrollment-month cohort: the share of students still registering for courses
+    (not dropped or withdrawn) N months after enrolling, for N = 0..months. since is "YYYY-MM"."""
+    if months < 0 or months > 120:
+        return {"status": "error", "message": "months must be between 0 and 120"}
+    db: Session = next(get_read_db())
+    try:
+        data = get_cohort_data(db)
+        mask, cohorts, student_cohort_index = _select_cohorts(data, department, since)
+        last_month = data.last_active_month
+        in_scope = mask & (last_month >= 0)
+        tenure = np.clip(last_month[in_scope] - data.students["cohort"][in_scope], -1, months)
+
+        # still[c, n] = students of cohort c whose last registration is at least n months after enrolling
+        width = months + 2
+        counts = np.bincount(student_cohort_index[:-1][in_scope] * width + tenure + 1, minlength=len(cohorts) * width)
+        still = np.cumsum(counts.reshape(len(cohorts), width)[:, ::-1], axis=1)[:, ::-1][:, 1:]
+        sizes = np.bincount(student_cohort_index[:-1][mask], minlength=len(cohorts))
+
+        current = _current_month()
+        result = []
+        for index, cohort in enumerate(cohorts):
+            observable = min(months, current - int(cohort))
+            result.append({
+                "cohort": _month_label(int(cohort)),
+                "students": int(sizes[index]),
+                # Months that have not happened yet for this cohort are left out rather than reported as 0
+                "retention": [round(float(value), 4) for value in still[index, :max(observable + 1, 0)] / max(sizes[index], 1)]
+            })
+        return {
+            "status": "success",
+            "cohorts": result,
+            "months": months,
+            "filters": {"department": department, "since": since}
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def get_course_drop_rates(term: Optional[str] = None, department: Optional[str] = None,
+                          min_registrations: int = 10, limit: int = 20) -> Dict[str, Any]:
+    """Drop and withdraw rates per course and per term (e.g. term="Fall 2025"), highest first"""
+    db: Session = next(get_read_db())
+    try:
+        data = get_cohort_data(db)
+        statuses = len(RegistrationStatus)
+        course_count = len(data.courses["id"])
+        per_course = np.bincount(
+            data.reg_course * statuses + data.registrations["status"], minlength=course_count * statuses
+        )[:course_count * statuses].reshape(course_count, statuses)
+        per_term = np.zeros((len(data.term_labels), statuses), dtype=np.int64)
+        np.add.at(per_term, data.courses["term"], per_course)
+
+        totals = per_course.sum(axis=1)
+        left_rate = (per_course[:, DROPPED] + per_course[:, WITHDRAWN]) / np.maximum(totals, 1)
+
+        mask = totals >= min_registrations
+        if term:
+            mask &= np.array(data.term_labels, dtype=object)[data.courses["term"]] == term
+        if department:
+            mask &= data.courses["department"] == department
+        selected = np.flatnonzero(mask)
+        selected = selected[np.argsort(-left_rate[selected], kind="stable")][:limit]
+
+        courses = [{
+            "course_code": data.courses["course_code"][index],
+            "course_name": data.courses["course_name"][index],
+            "term": data.term_labels[data.courses["term"][index]],
+            "registrations": int(totals[index]),
+            "drop_rate": round(float(per_course[index, DROPPED] / max(totals[index], 1)), 4),
+            "withdraw_rate": round(float(per_course[index, WITHDRAWN] / max(totals[index], 1)), 4)
+        } for index in selected]
+        terms = [{
+            "term": label,
+            "registrations": int(per_term[index].sum()),
+            "drop_rate": round(float(per_term[index, DROPPED] / max(per_term[index].sum(), 1)), 4),
+            "withdraw_rate": round(float(per_term[index, WITHDRAWN] / max(per_term[index].sum(), 1)), 4)
+        } for index, label in enumerate(data.term_labels) if (not term or label == term) and per_term[index].sum()]
+
+        return {
+            "status": "success",
+            "courses": courses,
+            "terms": terms,
+            "filters": {"term": term, "department": department, "min_registrations": min_registrations}
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def get_cohort_revenue(months: int = 12, department: Optional[str] = None, since: Optional[str] = None) -> Dict[str, Any]:
+    """Paid revenue per enrollment-month cohort: total, per student, and cumulative per student
+    N months after enrolling, for N = 0..months. since is "YYYY-MM"."""
+    if months < 0 or months > 120:
+        return {"status": "error", "message": "months must be between 0 and 120"}
+    db: Session = next(get_read_db())
+    try:
+        data = get_cohort_data(db)
+        mask, cohorts, student_cohort_index = _select_cohorts(data, department, since)
+
+        payer_cohort = student_cohort_index[data.payments["student"]]
+        in_scope = (payer_cohort >= 0) & data.payments["paid"]
+        payer_cohort = payer_cohort[in_scope]
+        amounts = data.payments["amount"][in_scope]
+        # Payments made before enrolling count towards month 0
+        offsets = np.clip(data.payments["month"][in_scope] - data.students["cohort"][data.payments["student"][in_scope]], 0, months + 1)
+
+        totals = np.bincount(payer_cohort, weights=amounts, minlength=len(cohorts))
+        width = months + 2
+        by_offset = np.bincount(payer_cohort * width + offsets, weights=amounts, minlength=len(cohorts) * width)
+        cumulative = np.cumsum(by_offset.reshape(len(cohorts), width)[:, :months + 1], axis=1)
+        sizes = np.bincount(student_cohort_index[:-1][mask], minlength=len(cohorts))
+
+        current = _current_month()
+        result = []
+        for index, cohort in enumerate(cohorts):
+            students = max(int(sizes[index]), 1)
+            observable = min(months, current - int(cohort))
+            result.append({
+                "cohort": _month_label(int(cohort)),
+                "students": int(sizes[index]),
+                "revenue": round(float(totals[index]), 2),
+                "revenue_per_student": round(float(totals[index]) / students, 2),
+                "cumulative_revenue_per_student": [round(float(value) / students, 2) for value in cumulative[index, :max(observable + 1, 0)]]
+            })
+        return {
+            "status": "success",
+            "cohorts": result,
+            "total_revenue": round(float(totals.sum()), 2),
+            "currency": "USD",
+            "filters": {"department": department, "since": since}
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
@@ -9,13 +9,21 @@ from dotenv import load_dotenv
 import os
 from typing import List, Dict, Any, Optional    
 from sqlalchemy.orm import Session
+from sqlalchemy import update
 import datetime
 from zoneinfo import ZoneInfo
 
 from ai_university_campus_admin_agent.config.database import get_db, Course, Registration, Student, RegistrationStatus
+from ai_university_campus_admin_agent.tools.notification_tools import notify_course_students
+from ai_university_campus_admin_agent.tools.prerequisite_tools import get_prerequisite_graph, parse_prerequisites
+from ai_university_campus_admin_agent.tools.waitlist_tools import release_seat, promote_from_waitlist
+from ai_university_campus_admin_agent.utils.compact import compact_rows, check_format
+from ai_university_campus_admin_agent.utils.admission import admission_controlled
+from ai_university_campus_admin_agent.utils.idempotency import idempotent
 
 load_dotenv()
 
+@idempotent
 def create_course(course_code: str, course_name: str, credits: int, department: str, 
                  description: Optional[str] = None, semester: Optional[str] = None,
                  year: Optional[int] = None, max_capacity: int = 30, instructor: Optional[str] = None,
@@ -29,6 +37,13 @@ def create_course(course_code: str, course_name: str, credits: int, department:
         if existing_course:
             return {"status": "error", "message": "Course code already exists"}
         
+        # Reject prerequisites that would make the prerequisite graph circular
+        graph = get_prerequisite_graph(db)
+        prerequisite_codes = parse_prerequisites(prerequisites)
+        cycle = graph.find_cycle(course_code, prerequisite_codes)
+        if cycle:
+            return {"status": "error", "message": f"Circular prerequisites: {' -> '.join(cycle)}"}
+        
         new_course = Course(
             course_code=course_code,
             course_name=course_name,
@@ -51,6 +66,7 @@ def create_course(course_code: str, course_name: str, credits: int, department:
         db.add(new_course)
         db.commit()
         db.refresh(new_course)
+        graph.set_prerequisites(new_course.course_code, prerequisite_codes)
         
         return {
             "status": "success",
@@ -101,8 +117,12 @@ def get_course(course_code: str) -> Dict[str, Any]:
         return {"status": "error", "message": str(e)}
 
 def get_all_courses(department: Optional[str] = None, semester: Optional[str] = None, 
-                   active_only: bool = True) -> Dict[str, Any]:
-    """Get all courses with optional filters"""
+                   active_only: bool = True, format: str = "full") -> Dict[str, Any]:
+    """Get all courses with optional filters. Use format="compact" for long listings: courses come
+    back as a columns header plus row arrays, with values shared by every course under "same"."""
+    format_error = check_format(format)
+    if format_error:
+        return {"status": "error", "message": format_error}
     try:
         db: Session = next(get_db())
         
@@ -136,7 +156,7 @@ def get_all_courses(department: Optional[str] = None, semester: Optional[str] =
         
         return {
             "status": "success",
-            "courses": result,
+            "courses": compact_rows(result) if format == "compact" else result,
             "total_courses": len(result),
             "filters": {
                 "department": department,
@@ -147,11 +167,12 @@ def get_all_courses(department: Optional[str] = None, semester: Optional[str] =
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
 def update_course(course_code: str, course_name: Optional[str] = None, credits: Optional[int] = None,
                  department: Optional[str] = None, description: Optional[str] = None,
                  max_capacity: Optional[int] = None, instructor: Optional[str] = None,
                  schedule: Optional[str] = None, location: Optional[str] = None,
-                 is_active: Optional[bool] = None) -> Dict[str, Any]:
+                 is_active: Optional[bool] = None, prerequisites: Optional[str] = None) -> Dict[str, Any]:
     """Update course information"""
     try:
         db: Session = next(get_db())
@@ -179,7 +200,7 @@ def update_course(course_code: str, course_name: Optional[str] = None, credits:
             if instructor is not None:
                 course.instructor = instructor
                 updates.append("instructor")
-            if schedule is not None:
+            if schedule is not None and schedule != course.schedule:
                 course.schedule = schedule
                 updates.append("schedule")
             if location is not None:
@@ -188,14 +209,51 @@ def update_course(course_code: str, course_name: Optional[str] = None, credits:
             if is_active is not None and is_active != course.is_active:
                 course.is_active = is_active
                 updates.append("is_active")
+            if prerequisites is not None and prerequisites != course.prerequisites:
+                graph = get_prerequisite_graph(db)
+                prerequisite_codes = parse_prerequisites(prerequisites)
+                cycle = graph.find_cycle(course.course_code, prerequisite_codes)
+                if cycle:
+                    db.rollback()
+                    return {"status": "error", "message": f"Circular prerequisites: {' -> '.join(cycle)}"}
+                course.prerequisites = prerequisites
+                updates.append("prerequisites")
             
             course.updated_at = datetime.datetime.now(ZoneInfo("UTC"))
+            
+            # Extra seats go to waitlisted students first
+            promoted = []
+            if "max_capacity" in updates and course.is_active:
+                db.flush()
+                promoted = promote_from_waitlist(db, course)
+            
             db.commit()
             db.refresh(course)
+            if "prerequisites" in updates:
+                graph.set_prerequisites(course.course_code, prerequisite_codes)
+            
+            # Let enrolled students know when their course is cancelled or rescheduled
+            notified_students = 0
+            if "is_active" in updates and not course.is_active:
+                notified_students = notify_course_students(
+                    course.course_code,
+                    f"{course.course_code} has been cancelled",
+                    f"{course.course_code} - {course.course_name} has been cancelled. Please contact the registrar about alternatives.",
+                    priority="urgent"
+                ).get("recipients", 0)
+            elif "schedule" in updates:
+                notified_students = notify_course_students(
+                    course.course_code,
+                    f"{course.course_code} has been rescheduled",
+                    f"{course.course_code} - {course.course_name} now meets {course.schedule}.",
+                    priority="high"
+                ).get("recipients", 0)
             
             return {
                 "status": "success",
                 "message": f"Course updated successfully. Updated fields: {', '.join(updates)}" if updates else "No changes made",
+                "notified_students": notified_students,
+                "promoted_from_waitlist": promoted,
                 "course": {
                     "course_code": course.course_code,
                     "course_name": course.course_name,
@@ -211,8 +269,12 @@ def update_course(course_code: str, course_name: Optional[str] = None, credits:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-def get_course_enrollments(course_code: str) -> Dict[str, Any]:
-    """Get all students enrolled in a course"""
+def get_course_enrollments(course_code: str, format: str = "full") -> Dict[str, Any]:
+    """Get all students enrolled in a course. Use format="compact" for large classes: enrollments
+    come back as a columns header plus row arrays."""
+    format_error = check_format(format)
+    if format_error:
+        return {"status": "error", "message": format_error}
     try:
         db: Session = next(get_db())
         
@@ -241,18 +303,19 @@ def get_course_enrollments(course_code: str) -> Dict[str, Any]:
             "status": "success",
             "course_code": course_code,
             "course_name": course.course_name,
-            "enrollments": result,
+            "enrollments": compact_rows(result) if format == "compact" else result,
             "total_students": len(result),
             "capacity": f"{len(result)}/{course.max_capacity}"
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
+@admission_controlled
 def drop_course(student_id: str, course_code: str) -> Dict[str, Any]:
     """Drop a student from a course"""
+    db: Session = next(get_db())
     try:
-        db: Session = next(get_db())
-        
         # Check if student exists
         student = db.query(Student).filter(Student.student_id == student_id).first()
         if not student:
@@ -275,13 +338,23 @@ def drop_course(student_id: str, course_code: str) -> Dict[str, Any]:
         if registration.status != RegistrationStatus.ACTIVE:
             return {"status": "error", "message": f"Student registration status is {registration.status.value}, cannot drop"}
         
-        # Update registration status and course enrollment
-        registration.status = RegistrationStatus.DROPPED
-        registration.updated_at = datetime.datetime.now(ZoneInfo("UTC"))
+        # Update registration status only if no concurrent drop got there first
+        dropped = db.execute(
+            update(Registration)
+            .where(Registration.id == registration.id, Registration.status == RegistrationStatus.ACTIVE)
+            .values(status=RegistrationStatus.DROPPED, updated_at=datetime.datetime.now(ZoneInfo("UTC")))
+            .execution_options(synchronize_session=False)
+        )
+        if not dropped.rowcount:
+            db.rollback()
+            return {"status": "error", "message": "Student registration status changed, cannot drop"}
         
-        course.current_enrollment -= 1
+        # Free the seat and hand it to the head of the waitlist in the same transaction
+        release_seat(db, course.id)
+        promoted = promote_from_waitlist(db, course)
         
         db.commit()
+        db.refresh(course)
         
         return {
             "status": "success",
@@ -289,8 +362,11 @@ def drop_course(student_id: str, course_code: str) -> Dict[str, Any]:
             "details": {
                 "student_name": student.name,
                 "course_name": course.course_name,
-                "remaining_seats": course.max_capacity - course.current_enrollment
+                "remaining_seats": course.max_capacity - course.current_enrollment,
+                "promoted_from_waitlist": promoted
             }
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
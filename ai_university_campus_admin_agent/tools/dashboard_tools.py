@@ -0,0 +1,130 @@
+# dashboard_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import contextvars
+import os
+import threading
+import time
+
+from ai_university_campus_admin_agent.config.database import DATABASE_READ_POOL_SIZE
+from ai_university_campus_admin_agent.tools.analyst_tools import (
+    get_enrollment_statistics,
+    get_student_demographics,
+    get_financial_reports,
+    get_activity_report,
+    get_course_performance
+)
+
+load_dotenv()
+
+# Sections run in parallel, each on its own read session; more workers than read connections would only queue on the pool
+DASHBOARD_WORKERS = int(os.getenv("DASHBOARD_WORKERS", str(DATABASE_READ_POOL_SIZE)))
+DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "120"))
+DASHBOARD_SECTION_TIMEOUT = float(os.getenv("DASHBOARD_SECTION_TIMEOUT", "30"))
+
+# section -> (report function, the dashboard arguments it takes)
+DASHBOARD_SECTIONS: Dict[str, Tuple[Callable[..., Dict[str, Any]], Tuple[str, ...]]] = {
+    "enrollment": (get_enrollment_statistics, ("department", "semester")),
+    "demographics": (get_student_demographics, ()),
+    "financial": (get_financial_reports, ("timeframe",)),
+    "activity": (get_activity_report, ("days",)),
+    "course_performance": (get_course_performance, ()),
+}
+
+_executor = ThreadPoolExecutor(max_workers=DASHBOARD_WORKERS, thread_name_prefix="dashboard")
+
+class SectionCache:
+    """Successful section results keyed by section and arguments, each served while younger than the caller's max age"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, key: Tuple, max_age_seconds: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] <= max_age_seconds:
+            return entry
+        return None
+
+    def put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        with self._lock:
+            now = time.monotonic()
+            # Drop anything past the default TTL so argument variations do not accumulate
+            self._entries = {k: v for k, v in self._entries.items() if now - v[0] <= DASHBOARD_CACHE_TTL}
+            self._entries[key] = (now, result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+section_cache = SectionCache()
+
+def _run_section(function: Callable[..., Dict[str, Any]], kwargs: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    started = time.perf_counter()
+    result = function(**kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+def get_analytics_dashboard(sections: Optional[List[str]] = None, department: Optional[str] = None,
+                            semester: Optional[str] = None, timeframe: str = "current_semester", days: int = 30,
+                            max_age_seconds: int = DASHBOARD_CACHE_TTL) -> Dict[str, Any]:
+    """Overview of several analytics reports in one call: enrollment, demographics, financial, activity, course_performance.
+
+    Sections run concurrently, each on its own database session, and the results are merged with
+    per-section timings. A section computed less than max_age_seconds ago is served from cache;
+    pass max_age_seconds=0 for fresh numbers. department and semester apply to enrollment,
+    timeframe to financial and days to activity.
+    """
+    sections = sections or list(DASHBOARD_SECTIONS)
+    unknown = [name for name in sections if name not in DASHBOARD_SECTIONS]
+    if unknown:
+        return {"status": "error", "message": f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(DASHBOARD_SECTIONS)}"}
+    arguments = {"department": department, "semester": semester, "timeframe": timeframe, "days": days}
+
+    started = time.perf_counter()
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    cached: Dict[str, float] = {}
+    errors: Dict[str, str] = {}
+    pending = {}
+    for name in dict.fromkeys(sections):
+        function, parameters = DASHBOARD_SECTIONS[name]
+        kwargs = {parameter: arguments[parameter] for parameter in parameters}
+        key = (name, tuple(sorted(kwargs.items())))
+        hit = section_cache.get(key, max_age_seconds) if max_age_seconds > 0 else None
+        if hit:
+            results[name] = hit[1]
+            cached[name] = round(time.monotonic() - hit[0], 1)
+            continue
+        # Copy the caller's context so request-scoped context variables carry into the worker thread
+        pending[name] = (key, _executor.submit(contextvars.copy_context().run, _run_section, function, kwargs))
+
+    deadline = time.monotonic() + DASHBOARD_SECTION_TIMEOUT
+    for name, (key, future) in pending.items():
+        try:
+            result, elapsed_ms = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            errors[name] = f"Timed out after {DASHBOARD_SECTION_TIMEOUT:g}s"
+            continue
+        except Exception as e:
+            errors[name] = str(e)
+            continue
+        timings[name] = round(elapsed_ms, 1)
+        if result.get("status") == "success":
+            section_cache.put(key, result)
+            results[name] = result
+        else:
+            errors[name] = result.get("message", "Section failed")
+
+    if not results:
+        return {"status": "error", "message": "All dashboard sections failed", "errors": errors}
+    return {
+        "status": "success",
+        "sections": {name: {key: value for key, value in result.items() if key != "status"} for name, result in results.items()},
+        "errors": errors,
+        "timings_ms": timings,
+        "cached_sections": {name: {"age_seconds": age} for name, age in cached.items()},
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        "filters": {"department": department, "semester": semester, "timeframe": timeframe, "days": days}
+    }
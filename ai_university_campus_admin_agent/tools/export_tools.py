@@ -0,0 +1,281 @@
+# export_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional, Tuple, Callable
+from collections import OrderedDict
+from sqlalchemy import select, func, or_, and_, Table, Boolean, Integer, Float, DateTime, Enum
+import datetime
+import enum
+import json
+import os
+import shutil
+import time
+import uuid
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import read_engine, Student, Course, Registration, Payment, ActivityLog
+
+load_dotenv()
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "50000"))
+# Partitions written to at once; the least recently used file is closed and a new part started if it comes back
+EXPORT_MAX_OPEN_FILES = int(os.getenv("EXPORT_MAX_OPEN_FILES", "32"))
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+WATERMARKS_FILE = "_watermarks.json"
+
+def _month(value: Optional[datetime.datetime]) -> str:
+    return value.strftime("%Y-%m") if value else "unknown"
+
+# table -> (model, partition column name, partition key of a row)
+# Courses are partitioned by term; everything else by the month the record happened
+EXPORT_TABLES: Dict[str, Tuple[Any, str, Callable[[Dict[str, Any]], str]]] = {
+    "students": (Student, "enrollment_month", lambda row: _month(row["enrollment_date"])),
+    "courses": (Course, "term", lambda row: f"{row['year'] or 'unknown'}-{row['semester'] or 'unknown'}"),
+    "registrations": (Registration, "month", lambda row: _month(row["registration_date"])),
+    "payments": (Payment, "month", lambda row: _month(row["payment_date"])),
+    "activity_logs": (ActivityLog, "month", lambda row: _month(row["timestamp"])),
+}
+
+def _arrow_schema(pa, table: Table):
+    """Arrow schema for a table: enums as their string values, datetimes as microsecond timestamps"""
+    fields = []
+    for column in table.columns:
+        if isinstance(column.type, Enum):
+            arrow_type = pa.string()
+        elif isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type, nullable=column.nullable or column.primary_key))
+    return pa.schema(fields)
+
+def _watermark_filter(table: Table, watermark: Optional[Dict[str, Any]], upper: Dict[str, Any]):
+    """Rows changed after the previous export's watermark, up to the snapshot's upper bound.
+
+    Tables with updated_at are keyed on (updated_at, id) so updates to old rows are picked up;
+    rows never updated (updated_at NULL) count as changed at created_at. activity_logs is append-only
+    and keyed on id alone.
+    """
+    if "updated_at" in table.c:
+        # coalesce(updated_at, created_at) spelled out, so the updated_at index still serves the usual branch
+        never_updated = table.c.updated_at.is_(None)
+        if upper["updated_at"]:
+            clause = or_(table.c.updated_at <= upper["updated_at"], and_(never_updated, table.c.created_at <= upper["updated_at"]))
+        else:
+            clause = table.c.id <= upper["id"]
+        if watermark and watermark.get("updated_at"):
+            since = datetime.datetime.fromisoformat(watermark["updated_at"])
+            clause = and_(clause, or_(
+                table.c.updated_at > since,
+                and_(table.c.updated_at == since, table.c.id > watermark["id"]),
+                and_(never_updated, or_(
+                    table.c.created_at > since,
+                    and_(table.c.created_at == since, table.c.id > watermark["id"])
+                ))
+            ))
+        return clause
+    clause = table.c.id <= upper["id"]
+    if watermark:
+        clause = and_(clause, table.c.id > watermark["id"])
+    return clause
+
+class _PartitionWriter:
+    """Buffers rows per partition and writes them as row groups, keeping a bounded number of files open"""
+
+    def __init__(self, pa, writer_factory, schema, root: str, partition_column: str, extension: str,
+                 run_id: str, chunk_size: int, max_open: int):
+        self.pa = pa
+        self.writer_factory = writer_factory
+        self.schema = schema
+        self.root = root
+        self.partition_column = partition_column
+        self.extension = extension
+        self.run_id = run_id
+        self.chunk_size = chunk_size
+        self.max_open = max_open
+        self.buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self.buffered = 0
+        self.writers: "OrderedDict[str, Any]" = OrderedDict()
+        self.files: List[str] = []
+
+    def add(self, partition: str, row: Dict[str, Any]) -> None:
+        self.buffers.setdefault(partition, []).append(row)
+        self.buffered += 1
+
+    def flush_over_limit(self) -> None:
+        # Memory stays at about one chunk of rows however many partitions a chunk spreads over
+        while self.buffered > self.chunk_size:
+            self._flush(max(self.buffers, key=lambda partition: len(self.buffers[partition])))
+
+    def _flush(self, partition: str) -> None:
+        rows = self.buffers.pop(partition)
+        self.buffered -= len(rows)
+        writer = self.writers.get(partition)
+        if writer is None:
+            if len(self.writers) >= self.max_open:
+                self.writers.popitem(last=False)[1].close()
+            directory = os.path.join(self.root, f"{self.partition_column}={partition}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run_id}-{len(self.files):05d}{self.extension}")
+            writer = self.writer_factory(path, self.schema)
+            self.files.append(path)
+            self.writers[partition] = writer
+        self.writers.move_to_end(partition)
+        writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self) -> None:
+        for partition in list(self.buffers):
+            self._flush(partition)
+        for writer in self.writers.values():
+            writer.close()
+        self.writers.clear()
+
+def _export_table(pa, writer_factory, connection, name: str, watermark: Optional[Dict[str, Any]], root: str,
+                  extension: str, run_id: str, chunk_size: int) -> Dict[str, Any]:
+    model, partition_column, partition_of = EXPORT_TABLES[name]
+    table = model.__table__
+    has_updated_at = "updated_at" in table.c
+
+    upper_columns = [func.max(func.coalesce(table.c.updated_at, table.c.created_at)), func.max(table.c.id)] if has_updated_at else [func.max(table.c.id)]
+    upper_row = connection.execute(select(*upper_columns)).one()
+    upper = {"updated_at": upper_row[0] if has_updated_at else None, "id": upper_row[-1] or 0}
+
+    writer = _PartitionWriter(pa, writer_factory, _arrow_schema(pa, table), root, partition_column, extension,
+                              run_id, chunk_size, EXPORT_MAX_OPEN_FILES)
+    rows = 0
+    high_water = (watermark.get("updated_at") or "", watermark["id"]) if watermark else ("", 0)
+    try:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(
+            select(table).where(_watermark_filter(table, watermark, upper))
+        )
+        for chunk in result.partitions():
+            for record in chunk:
+                row = {key: value.value if isinstance(value, enum.Enum) else value for key, value in record._mapping.items()}
+                writer.add(partition_of(row), row)
+                changed_at = (row["updated_at"] or row["created_at"]) if has_updated_at else None
+                key = (changed_at.isoformat() if changed_at else "", row["id"])
+                if key > high_water:
+                    high_water = key
+            rows += len(chunk)
+            writer.flush_over_limit()
+    finally:
+        writer.close()
+
+    return {
+        "rows": rows,
+        "files": [os.path.relpath(path, root) for path in writer.files],
+        "watermark": {"updated_at": high_water[0] or None, "id": high_water[1]}
+    }
+
+def _publish(staging: str, output_dir: str, name: str, replace: bool) -> None:
+    """Move a table's staged files into the export directory"""
+    source = os.path.join(staging, name)
+    target = os.path.join(output_dir, name)
+    if replace:
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        if os.path.isdir(source):
+            os.replace(source, target)
+        return
+    for directory, _, files in os.walk(source):
+        destination = os.path.join(target, os.path.relpath(directory, source))
+        os.makedirs(destination, exist_ok=True)
+        for file_name in files:
+            os.replace(os.path.join(directory, file_name), os.path.join(destination, file_name))
+
+def export_snapshot(output_dir: str = EXPORT_DIR, tables: Optional[List[str]] = None, incremental: bool = False,
+                    format: str = "parquet", chunk_size: int = EXPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """Export operational tables to Parquet or Arrow IPC files partitioned by term or month.
+
+    Rows are streamed from the read-only engine chunk_size at a time inside one read transaction,
+    so every table comes from the same snapshot and memory does not grow with table size. A full
+    export replaces each table's directory. An incremental export adds files holding only rows
+    changed since the watermarks in _watermarks.json, so readers should keep the row with the
+    latest updated_at for each id. Tables without a watermark are exported in full.
+    """
+    if format not in EXPORT_FORMATS:
+        return {"status": "error", "message": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+    tables = tables or list(EXPORT_TABLES)
+    unknown = [name for name in tables if name not in EXPORT_TABLES]
+    if unknown:
+        return {"status": "error", "message": f"Unknown tables: {', '.join(unknown)}. Exportable: {', '.join(EXPORT_TABLES)}"}
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        return {"status": "error", "message": "pyarrow is required for exports: pip install pyarrow"}
+
+    if format == "parquet":
+        writer_factory = lambda path, schema: pa.parquet.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer_factory = lambda path, schema: pa.ipc.new_file(path, schema)
+
+    started = time.perf_counter()
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    run_id = f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(output_dir, exist_ok=True)
+    staging = os.path.join(output_dir, f".staging-{run_id}")
+    watermarks_path = os.path.join(output_dir, WATERMARKS_FILE)
+    watermarks: Dict[str, Any] = {}
+    if os.path.exists(watermarks_path):
+        with open(watermarks_path) as file:
+            watermarks = json.load(file)
+
+    summary: Dict[str, Any] = {}
+    try:
+        connection = read_engine.connect()
+        if connection.dialect.name == "postgresql":
+            connection = connection.execution_options(isolation_level="REPEATABLE READ")
+        with connection, connection.begin():
+            for name in tables:
+                watermark = watermarks.get(name) if incremental else None
+                summary[name] = _export_table(pa, writer_factory, connection, name, watermark,
+                                              os.path.join(staging, name), EXPORT_FORMATS[format], run_id, chunk_size)
+                summary[name]["mode"] = "incremental" if watermark else "full"
+
+        # Publish only after every table was read, then record the new watermarks
+        for name in tables:
+            _publish(staging, output_dir, name, replace=summary[name]["mode"] == "full")
+            watermarks[name] = {**summary[name]["watermark"], "exported_at": now.isoformat(), "format": format}
+        with open(f"{watermarks_path}.tmp", "w") as file:
+            json.dump(watermarks, file, indent=2)
+        os.replace(f"{watermarks_path}.tmp", watermarks_path)
+
+        return {
+            "status": "success",
+            "message": f"Exported {sum(table['rows'] for table in summary.values())} rows from {len(tables)} tables",
+            "output_dir": output_dir,
+            "format": format,
+            "tables": summary,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export operational tables to partitioned Parquet or Arrow files")
+    parser.add_argument("--output-dir", default=EXPORT_DIR)
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORT_TABLES))
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="parquet")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+    result = export_snapshot(args.output_dir, args.tables, args.incremental, args.format, args.chunk_size)
+    # Per-file listings can be long; the CLI prints counts
+    for table in result.get("tables", {}).values():
+        table["files"] = len(table["files"])
+    print(json.dumps(result, indent=2))
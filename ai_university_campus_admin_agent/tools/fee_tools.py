@@ -9,13 +9,21 @@ from dotenv import load_dotenv
 import os
 from typing import List, Dict, Any, Optional    
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 import datetime
 from zoneinfo import ZoneInfo
 
 from ai_university_campus_admin_agent.config.database import get_db, Student, Course, FeeStructure, Payment, FeeType, PaymentStatus
+from ai_university_campus_admin_agent.utils.ids import new_transaction_id
+from ai_university_campus_admin_agent.utils.compact import compact_rows, check_format
+from ai_university_campus_admin_agent.utils.admission import admission_controlled
+from ai_university_campus_admin_agent.utils.idempotency import idempotent
 
 load_dotenv()
 
+VALID_PAYMENT_METHODS = ["credit_card", "bank_transfer", "cash", "check", "online"]
+
+@idempotent
 def create_fee_structure(course_code: str, fee_type: str, amount: float, 
                         description: Optional[str] = None, due_date: Optional[str] = None) -> Dict[str, Any]:
     """Create a new fee structure for a course"""
@@ -170,22 +178,22 @@ def calculate_student_fees(student_id: str, course_code: str) -> Dict[str, Any]:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
+@admission_controlled
 def record_payment(student_id: str, amount: float, payment_method: str, 
                   course_code: Optional[str] = None, fee_type: Optional[str] = None,
                   transaction_id: Optional[str] = None, notes: Optional[str] = None) -> Dict[str, Any]:
     """Record a payment made by a student"""
+    db: Session = next(get_db())
     try:
-        db: Session = next(get_db())
-        
         # Check if student exists
         student = db.query(Student).filter(Student.student_id == student_id).first()
         if not student:
             return {"status": "error", "message": "Student not found"}
         
         # Validate payment method
-        valid_methods = ["credit_card", "bank_transfer", "cash", "check", "online"]
-        if payment_method not in valid_methods:
-            return {"status": "error", "message": f"Invalid payment method. Valid methods: {', '.join(valid_methods)}"}
+        if payment_method not in VALID_PAYMENT_METHODS:
+            return {"status": "error", "message": f"Invalid payment method. Valid methods: {', '.join(VALID_PAYMENT_METHODS)}"}
         
         # Find fee structure if course and fee type specified
         fee_structure_id = None
@@ -211,14 +219,9 @@ def record_payment(student_id: str, amount: float, payment_method: str,
             
             fee_structure_id = fee_structure.id
         
-        # Generate transaction ID if not provided
+        # Generate transaction ID if not provided; uniqueness is enforced by the payments.transaction_id constraint
         if not transaction_id:
-            transaction_id = f"TXN{datetime.datetime.now().strftime('%Y%m%d%H%M%S')}{student_id[-4:]}"
-        
-        # Check if transaction ID already exists
-        existing_txn = db.query(Payment).filter(Payment.transaction_id == transaction_id).first()
-        if existing_txn:
-            return {"status": "error", "message": "Transaction ID already exists"}
+            transaction_id = new_transaction_id()
         
         new_payment = Payment(
             student_id=student_id,
@@ -234,7 +237,13 @@ def record_payment(student_id: str, amount: float, payment_method: str,
         )
         
         db.add(new_payment)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError as e:
+            db.rollback()
+            if "transaction_id" in str(e.orig):
+                return {"status": "error", "message": "Transaction ID already exists"}
+            raise
         db.refresh(new_payment)
         
         return {
@@ -251,9 +260,16 @@ def record_payment(student_id: str, amount: float, payment_method: str,
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        # Release the pooled connection right away so concurrent payments cannot exhaust the pool
+        db.close()
 
-def get_payment_history(student_id: str, course_code: Optional[str] = None) -> Dict[str, Any]:
-    """Get payment history for a student"""
+def get_payment_history(student_id: str, course_code: Optional[str] = None, format: str = "full") -> Dict[str, Any]:
+    """Get payment history for a student. Use format="compact" for long histories: payments come
+    back as a columns header plus row arrays, with status, method and fee type codes explained in "legend"."""
+    format_error = check_format(format)
+    if format_error:
+        return {"status": "error", "message": format_error}
     try:
         db: Session = next(get_db())
         
@@ -295,7 +311,7 @@ def get_payment_history(student_id: str, course_code: Optional[str] = None) -> D
             "status": "success",
             "student_id": student_id,
             "student_name": student.name,
-            "payments": result,
+            "payments": compact_rows(result, abbreviate=("status", "payment_method", "fee_type")) if format == "compact" else result,
             "total_payments": len(result),
             "total_amount_paid": total_paid,
             "currency": "USD"
@@ -0,0 +1,233 @@
+# forecast_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, delete, type_coerce, String
+import datetime
+import os
+import time
+import numpy as np
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import (
+    get_db, get_read_db, dialect_insert, Course, Registration, WaitlistEntry, EnrollmentForecast, RegistrationStatus
+)
+
+load_dotenv()
+
+FORECAST_LOOKBACK_WEEKS = int(os.getenv("FORECAST_LOOKBACK_WEEKS", "12"))
+FORECAST_HORIZON_WEEKS = int(os.getenv("FORECAST_HORIZON_WEEKS", "8"))
+# Each week back counts this much less in the trend fit, so recent demand dominates
+FORECAST_WEIGHT_DECAY = float(os.getenv("FORECAST_WEIGHT_DECAY", "0.85"))
+# Courses with fewer registrations than this in the lookback window are not extrapolated
+FORECAST_MIN_REGISTRATIONS = int(os.getenv("FORECAST_MIN_REGISTRATIONS", "3"))
+FORECAST_STALE_HOURS = float(os.getenv("FORECAST_STALE_HOURS", "36"))
+
+_Z90 = 1.645
+_LEFT = [RegistrationStatus.DROPPED.name, RegistrationStatus.WITHDRAWN.name]
+
+def fit_weekly_trends(series: np.ndarray, decay: float = FORECAST_WEIGHT_DECAY) -> Dict[str, np.ndarray]:
+    """Weighted least-squares linear trend for every row of a (courses x weeks) count matrix at once.
+
+    Returns each course's intercept, slope and residual standard deviation.
+    """
+    weeks = series.shape[1]
+    t = np.arange(weeks, dtype=np.float64)
+    w = decay ** (weeks - 1 - t)
+    t_mean = (w * t).sum() / w.sum()
+    y_mean = series @ w / w.sum()
+    t_centered = t - t_mean
+    slope = (series - y_mean[:, None]) @ (w * t_centered) / (w * t_centered ** 2).sum()
+    intercept = y_mean - slope * t_mean
+    residuals = series - (intercept[:, None] + slope[:, None] * t)
+    dof = max(weeks - 2, 1)
+    sigma = np.sqrt((residuals ** 2 * w).sum(axis=1) / w.sum() * weeks / dof)
+    return {"intercept": intercept, "slope": slope, "sigma": sigma}
+
+def run_enrollment_forecast(lookback_weeks: int = FORECAST_LOOKBACK_WEEKS, horizon_weeks: int = FORECAST_HORIZON_WEEKS) -> Dict[str, Any]:
+    """Forecast registrations for every active course and store the results in enrollment_forecasts.
+
+    Builds each course's weekly registration counts over the lookback window, fits all courses
+    in one vectorized pass, nets out the course's historical drop rate, and flags courses whose
+    projected enrollment (current + waitlist + expected new registrations) exceeds max_capacity.
+    """
+    if lookback_weeks < 3 or horizon_weeks < 1:
+        return {"status": "error", "message": "lookback_weeks must be at least 3 and horizon_weeks at least 1"}
+
+    db: Session = next(get_db())
+    started = time.perf_counter()
+    try:
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        # Whole weeks ending at the start of today
+        window_end = now.date()
+        window_start = window_end - datetime.timedelta(weeks=lookback_weeks)
+
+        courses = db.query(Course.id, Course.current_enrollment, Course.max_capacity).filter(Course.is_active == True).order_by(Course.id).all()
+        if not courses:
+            return {"status": "success", "message": "No active courses to forecast", "courses_forecast": 0}
+        course_ids = np.array([course.id for course in courses], dtype=np.int64)
+        current = np.array([course.current_enrollment or 0 for course in courses], dtype=np.float64)
+        capacity = np.array([course.max_capacity or 0 for course in courses], dtype=np.float64)
+
+        # Weekly registration counts, aggregated per day in SQL and bucketed into weeks here
+        series = np.zeros((len(courses), lookback_weeks), dtype=np.float64)
+        day = func.date(Registration.registration_date)
+        daily = db.query(Registration.course_id, day, func.count(Registration.id)).filter(
+            Registration.registration_date >= window_start,
+            Registration.registration_date < window_end
+        ).group_by(Registration.course_id, day).all()
+        if daily:
+            daily_course, daily_date, daily_count = zip(*daily)
+            rows = np.searchsorted(course_ids, np.array(daily_course, dtype=np.int64))
+            known = (rows < len(course_ids)) & (course_ids[rows.clip(0, len(course_ids) - 1)] == np.array(daily_course))
+            # func.date() comes back as ISO strings on SQLite and as dates on PostgreSQL; numpy parses both
+            weeks = (np.array(daily_date, dtype="datetime64[D]") - np.datetime64(window_start, "D")).astype(np.int64) // 7
+            np.add.at(series, (rows[known], weeks[known]), np.array(daily_count, dtype=np.float64)[known])
+
+        # Share of each course's registrations that end dropped or withdrawn
+        totals = np.zeros(len(courses))
+        left = np.zeros(len(courses))
+        for course_id, status, count in db.query(
+            Registration.course_id, type_coerce(Registration.status, String), func.count(Registration.id)
+        ).group_by(Registration.course_id, Registration.status).all():
+            row = np.searchsorted(course_ids, course_id)
+            if row < len(course_ids) and course_ids[row] == course_id:
+                totals[row] += count
+                left[row] += count if status in _LEFT else 0
+        drop_rate = np.divide(left, totals, out=np.zeros_like(left), where=totals > 0)
+
+        waitlisted = np.zeros(len(courses))
+        for course_id, count in db.query(WaitlistEntry.course_id, func.count(WaitlistEntry.id)).group_by(WaitlistEntry.course_id).all():
+            row = np.searchsorted(course_ids, course_id)
+            if row < len(course_ids) and course_ids[row] == course_id:
+                waitlisted[row] = count
+
+        fit = fit_weekly_trends(series)
+        enough = series.sum(axis=1) >= FORECAST_MIN_REGISTRATIONS
+        steps = np.arange(lookback_weeks, lookback_weeks + horizon_weeks, dtype=np.float64)
+        weekly = np.clip(fit["intercept"][:, None] + fit["slope"][:, None] * steps, 0, None) * enough[:, None]
+        net_new = np.cumsum(weekly * (1 - drop_rate)[:, None], axis=1)
+        demand_now = current + waitlisted
+        projected = demand_now + net_new[:, -1]
+        upper = projected + _Z90 * fit["sigma"] * np.sqrt(horizon_weeks) * (1 - drop_rate) * enough
+        utilization = np.divide(projected, capacity, out=np.zeros_like(projected), where=capacity > 0)
+
+        # First projected week at or over capacity; 0 if demand already fills the course
+        reaches = (demand_now[:, None] + net_new) >= capacity[:, None]
+        weeks_until_full = np.where(demand_now >= capacity, 0, np.where(reaches.any(axis=1), reaches.argmax(axis=1) + 1, -1))
+
+        rows = [{
+            "course_id": int(course_ids[index]),
+            "model": "weighted_linear_trend" if enough[index] else "insufficient_data",
+            "weeks_observed": lookback_weeks,
+            "weekly_registrations": round(float(weekly[index, 0]), 3),
+            "weekly_trend": round(float(fit["slope"][index]) if enough[index] else 0.0, 3),
+            "drop_rate": round(float(drop_rate[index]), 4),
+            "current_enrollment": int(current[index]),
+            "waitlisted": int(waitlisted[index]),
+            "max_capacity": int(capacity[index]),
+            "horizon_weeks": horizon_weeks,
+            "projected_enrollment": round(float(projected[index]), 1),
+            "projected_upper": round(float(upper[index]), 1),
+            "projected_utilization": round(float(utilization[index]) * 100, 1),
+            "weeks_until_full": int(weeks_until_full[index]) if weeks_until_full[index] >= 0 else None,
+            "over_capacity": bool(projected[index] > capacity[index]),
+            "at_risk": bool(upper[index] > capacity[index]),
+            "generated_at": now
+        } for index in range(len(course_ids))]
+
+        stmt = dialect_insert(EnrollmentForecast.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["course_id"],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != "course_id"}
+        )
+        db.execute(stmt, rows)
+        # Courses that are no longer active drop out of the forecast
+        db.execute(delete(EnrollmentForecast).where(EnrollmentForecast.generated_at < now))
+        db.commit()
+
+        return {
+            "status": "success",
+            "message": "Enrollment forecast completed",
+            "courses_forecast": len(rows),
+            "over_capacity": int(sum(row["over_capacity"] for row in rows)),
+            "at_risk": int(sum(row["at_risk"] for row in rows)),
+            "insufficient_data": int((~enough).sum()),
+            "lookback_weeks": lookback_weeks,
+            "horizon_weeks": horizon_weeks,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def get_capacity_forecast(department: Optional[str] = None, semester: Optional[str] = None,
+                          include_all: bool = False, limit: int = 20) -> Dict[str, Any]:
+    """Projected enrollment against capacity from the latest forecast run, most oversubscribed first.
+
+    By default only courses projected over capacity or at risk of it are listed; pass include_all=True
+    for every course. Forecasts are precomputed by the nightly forecast job, not per question.
+    """
+    db: Session = next(get_read_db())
+    try:
+        query = db.query(EnrollmentForecast, Course).join(Course, Course.id == EnrollmentForecast.course_id)
+        if department:
+            query = query.filter(Course.department == department)
+        if semester:
+            query = query.filter(Course.semester == semester)
+        if not include_all:
+            query = query.filter((EnrollmentForecast.over_capacity == True) | (EnrollmentForecast.at_risk == True))
+        matching = query.count()
+        forecasts = query.order_by(EnrollmentForecast.projected_utilization.desc()).limit(limit).all()
+
+        generated_at = db.query(func.max(EnrollmentForecast.generated_at)).scalar()
+        if generated_at is None:
+            return {"status": "error", "message": "No forecast has been run yet. Run the enrollment forecast job first."}
+
+        result = []
+        for forecast, course in forecasts:
+            result.append({
+                "course_code": course.course_code,
+                "course_name": course.course_name,
+                "department": course.department,
+                "current_enrollment": forecast.current_enrollment,
+                "waitlisted": forecast.waitlisted,
+                "max_capacity": forecast.max_capacity,
+                "projected_enrollment": forecast.projected_enrollment,
+                "projected_upper": forecast.projected_upper,
+                "projected_utilization": forecast.projected_utilization,
+                "weeks_until_full": forecast.weeks_until_full,
+                "weekly_registrations": forecast.weekly_registrations,
+                "weekly_trend": forecast.weekly_trend,
+                "over_capacity": forecast.over_capacity,
+                "at_risk": forecast.at_risk,
+                "model": forecast.model
+            })
+
+        generated_at = generated_at.replace(tzinfo=ZoneInfo("UTC")) if generated_at.tzinfo is None else generated_at
+        age_hours = (datetime.datetime.now(ZoneInfo("UTC")) - generated_at).total_seconds() / 3600
+        return {
+            "status": "success",
+            "generated_at": generated_at.isoformat(),
+            "stale": age_hours > FORECAST_STALE_HOURS,
+            "horizon_weeks": forecasts[0][0].horizon_weeks if forecasts else None,
+            "courses": result,
+            "total_matching": matching,
+            "filters": {"department": department, "semester": semester, "include_all": include_all}
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Forecast course demand and flag courses projected to exceed capacity")
+    parser.add_argument("--lookback-weeks", type=int, default=FORECAST_LOOKBACK_WEEKS)
+    parser.add_argument("--horizon-weeks", type=int, default=FORECAST_HORIZON_WEEKS)
+    args = parser.parse_args()
+    print(json.dumps(run_enrollment_forecast(args.lookback_weeks, args.horizon_weeks), indent=2))
@@ -0,0 +1,176 @@
+# grade_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, insert, case, func
+import csv
+import datetime
+import io
+import time
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import get_db, Course, Registration, ActivityLog, ActivityType, RegistrationStatus
+from ai_university_campus_admin_agent.tools.academic_tools import GRADE_POINTS, refresh_academic_records
+from ai_university_campus_admin_agent.utils.paths import IMPORT_DIR, confined_path
+
+load_dotenv()
+
+# Rosters are CSV with a header row containing student_id and grade columns
+MAX_REPORTED_ERRORS = 50
+
+def _parse_roster(handle) -> tuple:
+    """Read (line, student_id, grade) entries from a roster CSV, collecting per-line errors"""
+    reader = csv.DictReader(handle)
+    fields = {name.strip().lower() for name in (reader.fieldnames or [])}
+    if not {"student_id", "grade"} <= fields:
+        raise ValueError("Roster must have a header row with student_id and grade columns")
+
+    entries = []
+    errors = []
+    seen = {}
+    for row in reader:
+        row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        student_id = row.get("student_id", "")
+        grade = row.get("grade", "").upper()
+        if not student_id and not grade:
+            continue  # blank line
+        if not student_id:
+            errors.append({"line": reader.line_num, "student_id": None, "reason": "missing student_id"})
+        elif grade not in GRADE_POINTS:
+            errors.append({"line": reader.line_num, "student_id": student_id, "reason": f"invalid grade {grade or '(empty)'}"})
+        elif student_id in seen:
+            errors.append({"line": reader.line_num, "student_id": student_id, "reason": f"duplicate of line {seen[student_id]}"})
+        else:
+            seen[student_id] = reader.line_num
+            entries.append((reader.line_num, student_id, grade))
+    return entries, errors
+
+def post_course_grades(course_code: str, roster_csv: Optional[str] = None, file_path: Optional[str] = None,
+                       allow_partial: bool = False, chunk_size: int = 1000) -> Dict[str, Any]:
+    """Post final grades for a whole course section from a CSV roster (student_id,grade).
+
+    The roster is given inline as CSV text or as a file path inside the import directory. Every row is validated against
+    the course's registrations before anything is written; by default any invalid row rejects
+    the whole roster. Grades are applied with one UPDATE per chunk, activity logs are inserted
+    in bulk and academic records are refreshed once for the whole batch.
+    """
+    if bool(roster_csv) == bool(file_path):
+        return {"status": "error", "message": "Provide exactly one of roster_csv or file_path"}
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+    if file_path:
+        try:
+            file_path = confined_path(IMPORT_DIR, file_path)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+    db: Session = next(get_db())
+    started = time.perf_counter()
+    try:
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        if file_path:
+            with open(file_path, newline="", encoding="utf-8-sig") as handle:
+                entries, errors = _parse_roster(handle)
+        else:
+            entries, errors = _parse_roster(io.StringIO(roster_csv))
+
+        # One query for the whole section instead of one lookup per roster line
+        registrations = {
+            student_id: (registration_id, status)
+            for registration_id, student_id, status in db.query(
+                Registration.id, Registration.student_id, Registration.status
+            ).filter(
+                Registration.course_id == course.id,
+                Registration.status.in_([RegistrationStatus.ACTIVE, RegistrationStatus.COMPLETED])
+            )
+        }
+
+        updates = []
+        regraded = 0
+        for line, student_id, grade in entries:
+            registration = registrations.get(student_id)
+            if not registration:
+                errors.append({"line": line, "student_id": student_id, "reason": "no active registration in this course"})
+                continue
+            registration_id, status = registration
+            if status == RegistrationStatus.COMPLETED:
+                regraded += 1
+            updates.append((registration_id, student_id, grade))
+
+        errors.sort(key=lambda error: error["line"])
+        if errors and not allow_partial:
+            return {
+                "status": "error",
+                "message": f"Roster rejected: {len(errors)} invalid rows, no grades were posted",
+                "invalid_rows": len(errors),
+                "errors": errors[:MAX_REPORTED_ERRORS]
+            }
+
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        for start in range(0, len(updates), chunk_size):
+            chunk = updates[start:start + chunk_size]
+            ids = [registration_id for registration_id, _, _ in chunk]
+            grades = {registration_id: grade for registration_id, _, grade in chunk}
+            points = {registration_id: GRADE_POINTS[grade] for registration_id, _, grade in chunk}
+            db.execute(
+                update(Registration)
+                .where(Registration.id.in_(ids))
+                .values(
+                    grade=case(grades, value=Registration.id),
+                    grade_points=case(points, value=Registration.id),
+                    status=RegistrationStatus.COMPLETED,
+                    completion_date=func.coalesce(Registration.completion_date, now),
+                    updated_at=now
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.execute(insert(ActivityLog.__table__), [
+                {
+                    "student_id": student_id,
+                    "activity_type": ActivityType.SYSTEM_ACTION,
+                    "description": f"Grade {grade} posted for {course.course_code} - {course.course_name}",
+                    "timestamp": now
+                }
+                for _, student_id, grade in chunk
+            ])
+
+        records = refresh_academic_records(db, [student_id for _, student_id, _ in updates])
+        db.commit()
+
+        distribution: Dict[str, int] = {}
+        for _, _, grade in updates:
+            distribution[grade] = distribution.get(grade, 0) + 1
+
+        return {
+            "status": "success",
+            "message": f"Posted {len(updates)} grades for {course_code}",
+            "course_code": course_code,
+            "posted": len(updates),
+            "regraded": regraded,
+            "skipped_rows": len(errors),
+            "errors": errors[:MAX_REPORTED_ERRORS],
+            "grade_distribution": dict(sorted(distribution.items(), key=lambda item: -GRADE_POINTS[item[0]])),
+            "academic_records_updated": records["records"],
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Post final grades for a course from a CSV roster (student_id,grade)")
+    parser.add_argument("course_code")
+    parser.add_argument("file_path", help="roster file inside IMPORT_DIR")
+    parser.add_argument("--allow-partial", action="store_true", help="post the valid rows even if some rows are invalid")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(post_course_grades(args.course_code, file_path=args.file_path,
+                                        allow_partial=args.allow_partial, chunk_size=args.chunk_size), indent=2))
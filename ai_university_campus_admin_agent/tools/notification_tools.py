@@ -0,0 +1,236 @@
+# notification_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, delete, update, literal, or_
+import datetime
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import get_db, Student, Course, Registration, Notification, RegistrationStatus
+
+load_dotenv()
+
+VALID_PRIORITIES = ["low", "normal", "high", "urgent"]
+
+def _fan_out(db: Session, recipients, title: str, message: str, notification_type: str,
+             priority: str, expires_in_days: Optional[int]) -> int:
+    """Insert one notification per recipient student_id with a single INSERT ... SELECT"""
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    expires_at = now + datetime.timedelta(days=expires_in_days) if expires_in_days else None
+    source = recipients.add_columns(
+        literal(title),
+        literal(message),
+        literal(notification_type),
+        literal(False),
+        literal(priority),
+        literal(now, Notification.sent_at.type),
+        literal(expires_at, Notification.expires_at.type),
+        literal(now, Notification.created_at.type)
+    )
+    stmt = insert(Notification).from_select(
+        ["student_id", "title", "message", "notification_type", "is_read", "priority", "sent_at", "expires_at", "created_at"],
+        source
+    )
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+def _validate(priority: str, expires_in_days: Optional[int]) -> Optional[Dict[str, Any]]:
+    if priority not in VALID_PRIORITIES:
+        return {"status": "error", "message": f"Invalid priority. Valid priorities: {', '.join(VALID_PRIORITIES)}"}
+    if expires_in_days is not None and expires_in_days <= 0:
+        return {"status": "error", "message": "expires_in_days must be positive"}
+    return None
+
+def notify_course_students(course_code: str, title: str, message: str, notification_type: str = "academic",
+                           priority: str = "normal", expires_in_days: Optional[int] = None) -> Dict[str, Any]:
+    """Send a notification to every student actively enrolled in a course"""
+    try:
+        error = _validate(priority, expires_in_days)
+        if error:
+            return error
+
+        db: Session = next(get_db())
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        recipients = select(Registration.student_id).where(
+            Registration.course_id == course.id,
+            Registration.status == RegistrationStatus.ACTIVE
+        )
+        sent = _fan_out(db, recipients, title, message, notification_type, priority, expires_in_days)
+
+        return {
+            "status": "success",
+            "message": f"Notification sent to {sent} students enrolled in {course_code}",
+            "course_code": course_code,
+            "recipients": sent
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def notify_department_students(department: str, title: str, message: str, notification_type: str = "academic",
+                               priority: str = "normal", expires_in_days: Optional[int] = None) -> Dict[str, Any]:
+    """Send a notification to every active student in a department"""
+    try:
+        error = _validate(priority, expires_in_days)
+        if error:
+            return error
+
+        db: Session = next(get_db())
+        recipients = select(Student.student_id).where(
+            Student.department == department,
+            Student.is_active == True
+        )
+        sent = _fan_out(db, recipients, title, message, notification_type, priority, expires_in_days)
+
+        return {
+            "status": "success",
+            "message": f"Notification sent to {sent} students in {department}",
+            "department": department,
+            "recipients": sent
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def notify_all_students(title: str, message: str, notification_type: str = "system",
+                        priority: str = "normal", expires_in_days: Optional[int] = None) -> Dict[str, Any]:
+    """Send a notification to every active student"""
+    try:
+        error = _validate(priority, expires_in_days)
+        if error:
+            return error
+
+        db: Session = next(get_db())
+        recipients = select(Student.student_id).where(Student.is_active == True)
+        sent = _fan_out(db, recipients, title, message, notification_type, priority, expires_in_days)
+
+        return {
+            "status": "success",
+            "message": f"Notification sent to {sent} students",
+            "recipients": sent
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def _unexpired(now: datetime.datetime):
+    return or_(Notification.expires_at == None, Notification.expires_at > now)
+
+def get_unread_notification_count(student_id: str) -> Dict[str, Any]:
+    """Get the number of unread, unexpired notifications for a student"""
+    try:
+        db: Session = next(get_db())
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+
+        unread = db.query(Notification.id).filter(
+            Notification.student_id == student_id,
+            Notification.is_read == False,
+            _unexpired(now)
+        ).count()
+
+        return {"status": "success", "student_id": student_id, "unread_count": unread}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def get_student_notifications(student_id: str, unread_only: bool = True, page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+    """Get a page of a student's notifications, newest first"""
+    try:
+        if page < 1 or page_size < 1 or page_size > 100:
+            return {"status": "error", "message": "page must be >= 1 and page_size between 1 and 100"}
+
+        db: Session = next(get_db())
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+
+        query = db.query(Notification).filter(
+            Notification.student_id == student_id,
+            _unexpired(now)
+        )
+        if unread_only:
+            query = query.filter(Notification.is_read == False)
+
+        total = query.count()
+        notifications = query.order_by(
+            Notification.sent_at.desc(), Notification.id.desc()
+        ).offset((page - 1) * page_size).limit(page_size).all()
+
+        result = []
+        for notification in notifications:
+            result.append({
+                "id": notification.id,
+                "title": notification.title,
+                "message": notification.message,
+                "notification_type": notification.notification_type,
+                "priority": notification.priority,
+                "is_read": notification.is_read,
+                "sent_at": notification.sent_at.isoformat() if notification.sent_at else None,
+                "expires_at": notification.expires_at.isoformat() if notification.expires_at else None
+            })
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "notifications": result,
+            "page": page,
+            "page_size": page_size,
+            "total_notifications": total,
+            "has_more": page * page_size < total
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def mark_notifications_read(student_id: str, notification_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Mark some or all of a student's unread notifications as read"""
+    try:
+        db: Session = next(get_db())
+
+        stmt = update(Notification).where(
+            Notification.student_id == student_id,
+            Notification.is_read == False
+        )
+        if notification_ids:
+            stmt = stmt.where(Notification.id.in_(notification_ids))
+        result = db.execute(stmt.values(is_read=True))
+        db.commit()
+
+        return {"status": "success", "student_id": student_id, "marked_read": result.rowcount}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def purge_expired_notifications(chunk_size: int = 10000) -> Dict[str, Any]:
+    """Delete expired notifications in chunks so the purge never holds long locks"""
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+
+    db: Session = next(get_db())
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    deleted = 0
+    chunks = 0
+    try:
+        while True:
+            expired_ids = select(Notification.id).where(
+                Notification.expires_at != None,
+                Notification.expires_at <= now
+            ).limit(chunk_size).scalar_subquery()
+            result = db.execute(delete(Notification).where(Notification.id.in_(expired_ids)))
+            db.commit()
+            if not result.rowcount:
+                break
+            deleted += result.rowcount
+            chunks += 1
+
+        return {"status": "success", "deleted": deleted, "chunks": chunks}
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e), "deleted": deleted}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Purge expired notifications (run from cron)")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(purge_expired_notifications(args.chunk_size), indent=2))
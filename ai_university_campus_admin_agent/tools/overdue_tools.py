@@ -0,0 +1,294 @@
+# overdue_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import func, and_, or_, case, false, tuple_, insert, select, update, delete
+import datetime
+import os
+import time
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import (
+    get_db, dialect_insert, Course, FeeStructure, Registration, Payment, Notification,
+    FeeAssessment, JobCheckpoint, RegistrationStatus, PaymentStatus
+)
+
+load_dotenv()
+
+OVERDUE_SWEEP_JOB = "overdue_fee_sweep"
+# A running sweep whose checkpoint has not moved for this long is assumed to have died, and the next run resumes it
+OVERDUE_SWEEP_STALE_SECONDS = float(os.getenv("OVERDUE_SWEEP_STALE_SECONDS", "600"))
+
+def _start_checkpoint(db: Session, restart: bool) -> Optional[JobCheckpoint]:
+    """Claim the sweep checkpoint, starting a new pass unless an interrupted one can be resumed.
+
+    Returns None while another sweep is running: a second run would resume from the same
+    chunk, see no assessments yet and notify every overdue student twice. The claim is one
+    conditional UPDATE, so only one of two concurrent starts gets it. A run whose checkpoint
+    has not moved for OVERDUE_SWEEP_STALE_SECONDS is assumed to have died and is resumed.
+    """
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    db.execute(dialect_insert(JobCheckpoint).values(
+        job_name=OVERDUE_SWEEP_JOB, last_id=0, status="idle", updated_at=now
+    ).on_conflict_do_nothing(index_elements=["job_name"]))
+    resume = JobCheckpoint.status == "running"
+    if restart:
+        resume = false()
+    claimed = db.execute(
+        update(JobCheckpoint)
+        .where(
+            JobCheckpoint.job_name == OVERDUE_SWEEP_JOB,
+            or_(
+                JobCheckpoint.status != "running",
+                JobCheckpoint.updated_at < now - datetime.timedelta(seconds=OVERDUE_SWEEP_STALE_SECONDS)
+            )
+        )
+        .values(
+            last_id=case((resume, JobCheckpoint.last_id), else_=0),
+            started_at=case((resume, JobCheckpoint.started_at), else_=now),
+            completed_at=None,
+            status="running",
+            updated_at=now
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    return db.query(JobCheckpoint).filter(JobCheckpoint.job_name == OVERDUE_SWEEP_JOB).one()
+
+def _sweep_chunk(db: Session, last_id: int, upper_id: int, now: datetime.datetime, counts: Dict[str, int]) -> None:
+    """Assess every active registration with id in (last_id, upper_id] against its past-due fees"""
+    paid = func.coalesce(func.sum(Payment.amount_paid), 0.0)
+    rows = db.query(
+        Registration.id,
+        Registration.student_id,
+        FeeStructure.id,
+        FeeStructure.amount,
+        FeeStructure.due_date,
+        FeeStructure.fee_type,
+        Course.course_code,
+        paid.label("paid")
+    ).join(
+        FeeStructure, and_(
+            FeeStructure.course_id == Registration.course_id,
+            FeeStructure.is_active == True,
+            FeeStructure.due_date < now
+        )
+    ).join(
+        Course, Course.id == Registration.course_id
+    ).outerjoin(
+        Payment, and_(
+            Payment.student_id == Registration.student_id,
+            Payment.fee_structure_id == FeeStructure.id,
+            Payment.status != PaymentStatus.REFUNDED
+        )
+    ).filter(
+        Registration.id > last_id,
+        Registration.id <= upper_id,
+        Registration.status == RegistrationStatus.ACTIVE
+    ).group_by(
+        Registration.id, Registration.student_id, FeeStructure.id, FeeStructure.amount,
+        FeeStructure.due_date, FeeStructure.fee_type, Course.course_code
+    ).all()
+
+    if not rows:
+        return
+
+    previous = {
+        (student_id, fee_id): (status, amount_paid)
+        for student_id, fee_id, status, amount_paid in db.execute(
+            select(FeeAssessment.student_id, FeeAssessment.fee_structure_id, FeeAssessment.status, FeeAssessment.amount_paid).where(
+                FeeAssessment.registration_id > last_id,
+                FeeAssessment.registration_id <= upper_id
+            )
+        )
+    }
+
+    overdue_count = 0
+    overdue: List[Dict[str, Any]] = []
+    notifications: List[Dict[str, Any]] = []
+    settled = []
+    for registration_id, student_id, fee_id, amount, due_date, fee_type, course_code, amount_paid in rows:
+        previous_status, previous_paid = previous.get((student_id, fee_id), (None, None))
+        if amount_paid >= amount:
+            if previous_status == PaymentStatus.OVERDUE:
+                settled.append((student_id, fee_id))
+            continue
+
+        overdue_count += 1
+        if previous_status == PaymentStatus.OVERDUE and previous_paid == amount_paid:
+            continue  # already flagged and nothing changed since the last sweep
+        overdue.append({
+            "student_id": student_id,
+            "fee_structure_id": fee_id,
+            "registration_id": registration_id,
+            "amount_due": amount,
+            "amount_paid": amount_paid,
+            "status": PaymentStatus.OVERDUE,
+            "due_date": due_date,
+            "assessed_at": now,
+            "created_at": now,
+            "updated_at": now
+        })
+        if previous_status != PaymentStatus.OVERDUE:
+            balance = amount - amount_paid
+            notifications.append({
+                "student_id": student_id,
+                "title": f"Overdue fee: {course_code} {fee_type.value.replace('_', ' ')}",
+                "message": (f"Your {fee_type.value.replace('_', ' ')} for {course_code} was due on "
+                            f"{due_date.date().isoformat()}. Outstanding balance: ${balance:,.2f} USD."),
+                "notification_type": "financial",
+                "priority": "high",
+                "is_read": False,
+                "sent_at": now,
+                "created_at": now
+            })
+
+    if overdue:
+        # Core table statements skip the ORM bulk-persistence layer, which dominates at this row count
+        stmt = dialect_insert(FeeAssessment.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["student_id", "fee_structure_id"],
+            set_={
+                "registration_id": stmt.excluded.registration_id,
+                "amount_due": stmt.excluded.amount_due,
+                "amount_paid": stmt.excluded.amount_paid,
+                "status": stmt.excluded.status,
+                "assessed_at": stmt.excluded.assessed_at,
+                "updated_at": stmt.excluded.updated_at
+            }
+        )
+        db.execute(stmt, overdue)
+
+    if settled:
+        db.execute(
+            update(FeeAssessment)
+            .where(tuple_(FeeAssessment.student_id, FeeAssessment.fee_structure_id).in_(settled))
+            .values(status=PaymentStatus.PAID, amount_paid=FeeAssessment.amount_due, assessed_at=now, updated_at=now)
+        )
+
+    if notifications:
+        db.execute(insert(Notification.__table__), notifications)
+
+    counts["overdue"] += overdue_count
+    counts["newly_overdue"] += len(notifications)
+    counts["settled"] += len(settled)
+
+def _recheck_inactive_overdue(db: Session, now: datetime.datetime, chunk_size: int, counts: Dict[str, int]) -> None:
+    """Settle or clear overdue assessments whose registration is no longer active.
+
+    The chunks only visit active registrations, so an assessment flagged before the course was
+    completed or dropped would otherwise stay overdue even after the student pays in full.
+    Paid fees become PAID, fees of dropped or withdrawn registrations are cleared, and fees of
+    completed courses stay overdue with their paid amount refreshed.
+    """
+    paid = select(func.coalesce(func.sum(Payment.amount_paid), 0.0)).where(
+        Payment.student_id == FeeAssessment.student_id,
+        Payment.fee_structure_id == FeeAssessment.fee_structure_id,
+        Payment.status != PaymentStatus.REFUNDED
+    ).scalar_subquery()
+    rows = db.execute(
+        select(FeeAssessment.id, FeeAssessment.amount_due, FeeAssessment.amount_paid, Registration.status, paid)
+        .outerjoin(Registration, Registration.id == FeeAssessment.registration_id)
+        .where(
+            FeeAssessment.status == PaymentStatus.OVERDUE,
+            or_(Registration.id.is_(None), Registration.status != RegistrationStatus.ACTIVE)
+        )
+    ).all()
+
+    settled, cleared, refreshed = [], [], []
+    for assessment_id, amount_due, previous_paid, registration_status, amount_paid in rows:
+        if amount_paid >= amount_due:
+            settled.append(assessment_id)
+        elif registration_status in (None, RegistrationStatus.DROPPED, RegistrationStatus.WITHDRAWN):
+            cleared.append(assessment_id)
+        elif amount_paid != previous_paid:
+            refreshed.append({"id": assessment_id, "amount_paid": amount_paid, "assessed_at": now, "updated_at": now})
+
+    for start in range(0, max(len(settled), len(cleared)), chunk_size):
+        if settled[start:start + chunk_size]:
+            db.execute(
+                update(FeeAssessment)
+                .where(FeeAssessment.id.in_(settled[start:start + chunk_size]))
+                .values(status=PaymentStatus.PAID, amount_paid=FeeAssessment.amount_due, assessed_at=now, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+        if cleared[start:start + chunk_size]:
+            db.execute(
+                delete(FeeAssessment)
+                .where(FeeAssessment.id.in_(cleared[start:start + chunk_size]))
+                .execution_options(synchronize_session=False)
+            )
+    if refreshed:
+        # Bulk UPDATE by primary key
+        db.execute(update(FeeAssessment), refreshed)
+
+    counts["settled"] += len(settled)
+    counts["cleared"] += len(cleared)
+
+def run_overdue_fee_sweep(chunk_size: int = 5000, restart: bool = False) -> Dict[str, Any]:
+    """Mark unpaid or partially paid past-due fees as overdue for all registered students and notify them.
+
+    Registrations are processed in id order in chunks; each chunk commits together with the
+    checkpoint, so an interrupted sweep resumes from the last committed chunk on the next run.
+    Overdue fees of completed or dropped registrations are then settled or cleared.
+    """
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+
+    db: Session = next(get_db())
+    started = time.perf_counter()
+    counts = {"registrations_scanned": 0, "overdue": 0, "newly_overdue": 0, "settled": 0, "cleared": 0}
+    chunks = 0
+    try:
+        checkpoint = _start_checkpoint(db, restart)
+        if checkpoint is None:
+            return {"status": "error", "message": "Another overdue fee sweep is already running; try again after it finishes"}
+        resumed_from = checkpoint.last_id
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+
+        while True:
+            chunk_ids = db.query(Registration.id).filter(
+                Registration.id > checkpoint.last_id,
+                Registration.status == RegistrationStatus.ACTIVE
+            ).order_by(Registration.id).limit(chunk_size).subquery()
+            upper_id, scanned = db.query(func.max(chunk_ids.c.id), func.count(chunk_ids.c.id)).one()
+            if not scanned:
+                break
+
+            _sweep_chunk(db, checkpoint.last_id, upper_id, now, counts)
+            counts["registrations_scanned"] += scanned
+            checkpoint.last_id = upper_id
+            checkpoint.updated_at = datetime.datetime.now(ZoneInfo("UTC"))
+            db.commit()
+            chunks += 1
+
+        _recheck_inactive_overdue(db, now, chunk_size, counts)
+        checkpoint.status = "completed"
+        checkpoint.completed_at = datetime.datetime.now(ZoneInfo("UTC"))
+        db.commit()
+
+        return {
+            "status": "success",
+            "message": "Overdue fee sweep completed",
+            "resumed_from_registration_id": resumed_from,
+            "chunks": chunks,
+            "summary": counts,
+            "duration_seconds": round(time.perf_counter() - started, 3)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e), "chunks_committed": chunks, "summary": counts}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Mark past-due fees as overdue and notify students (run from cron)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--restart", action="store_true", help="ignore an interrupted run and start from the beginning")
+    args = parser.parse_args()
+    print(json.dumps(run_overdue_fee_sweep(args.chunk_size, args.restart), indent=2))
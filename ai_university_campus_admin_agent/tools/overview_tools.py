@@ -0,0 +1,161 @@
+# overview_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, List
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_
+import datetime
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import (
+    get_db, Student, Course, Registration, FeeStructure, FeeAssessment, Payment, Notification, RegistrationStatus
+)
+from ai_university_campus_admin_agent.tools.schedule_tools import parse_schedule, format_meeting
+
+load_dotenv()
+
+# Registrations that count as "what am I enrolled in"
+_CURRENT = [RegistrationStatus.ACTIVE, RegistrationStatus.PENDING]
+
+def get_student_overview(student_id: str, payments_limit: int = 5, notifications_limit: int = 5) -> Dict[str, Any]:
+    """Everything about a student in one call: profile, current registrations with schedule and per-course
+    fee balances, overall balance due, recent payments and unread notifications.
+
+    Use this for questions like "what am I enrolled in and what do I owe?" instead of calling
+    get_student, get_student_registrations and calculate_student_fees per course. Runs at most
+    five queries however many courses the student takes.
+    """
+    if payments_limit < 0 or notifications_limit < 0 or payments_limit > 50 or notifications_limit > 50:
+        return {"status": "error", "message": "payments_limit and notifications_limit must be between 0 and 50"}
+
+    db: Session = next(get_db())
+    try:
+        student = db.query(Student).filter(Student.student_id == student_id).first()
+        if not student:
+            return {"status": "error", "message": "Student not found"}
+
+        registrations = db.query(Registration, Course).join(
+            Course, Registration.course_id == Course.id
+        ).filter(
+            Registration.student_id == student_id,
+            Registration.status.in_(_CURRENT)
+        ).order_by(Course.course_code).all()
+
+        # Active fees of those courses with what this student paid against each, and the overdue sweep's status
+        fees_by_course: Dict[int, List[Dict[str, Any]]] = {}
+        course_ids = [course.id for _, course in registrations]
+        if course_ids:
+            paid = db.query(
+                Payment.fee_structure_id, func.sum(Payment.amount_paid).label("paid")
+            ).filter(Payment.student_id == student_id).group_by(Payment.fee_structure_id).subquery()
+            fees = db.query(FeeStructure, paid.c.paid, FeeAssessment.status).outerjoin(
+                paid, paid.c.fee_structure_id == FeeStructure.id
+            ).outerjoin(
+                FeeAssessment, (FeeAssessment.fee_structure_id == FeeStructure.id) & (FeeAssessment.student_id == student_id)
+            ).filter(
+                FeeStructure.course_id.in_(course_ids),
+                FeeStructure.is_active == True
+            ).all()
+            for fee, fee_paid, assessment_status in fees:
+                fee_paid = fee_paid or 0
+                fees_by_course.setdefault(fee.course_id, []).append({
+                    "fee_type": fee.fee_type.value,
+                    "amount": fee.amount,
+                    "paid": fee_paid,
+                    "balance": fee.amount - fee_paid,
+                    "due_date": fee.due_date.isoformat() if fee.due_date else None,
+                    "status": assessment_status.value if assessment_status else None
+                })
+
+        courses = []
+        total_fees = total_paid = 0
+        next_due = None
+        for registration, course in registrations:
+            breakdown = fees_by_course.get(course.id, [])
+            course_fees = sum(fee["amount"] for fee in breakdown)
+            course_paid = sum(fee["paid"] for fee in breakdown)
+            total_fees += course_fees
+            total_paid += course_paid
+            for fee in breakdown:
+                if fee["balance"] > 0 and fee["due_date"] and (next_due is None or fee["due_date"] < next_due):
+                    next_due = fee["due_date"]
+            meetings = parse_schedule(course.schedule)
+            courses.append({
+                "course_code": course.course_code,
+                "course_name": course.course_name,
+                "status": registration.status.value,
+                "credits": course.credits,
+                "instructor": course.instructor,
+                "term": f"{course.semester} {course.year}" if course.semester and course.year else None,
+                "schedule": [format_meeting(meeting) for meeting in meetings] if meetings else course.schedule,
+                "location": course.location,
+                "fees": {
+                    "total": course_fees,
+                    "paid": course_paid,
+                    "balance": course_fees - course_paid,
+                    "breakdown": breakdown
+                }
+            })
+
+        recent_payments = []
+        if payments_limit:
+            payments = db.query(Payment, FeeStructure, Course).join(
+                FeeStructure, Payment.fee_structure_id == FeeStructure.id, isouter=True
+            ).join(
+                Course, FeeStructure.course_id == Course.id, isouter=True
+            ).filter(Payment.student_id == student_id).order_by(Payment.payment_date.desc()).limit(payments_limit).all()
+            for payment, fee_structure, course in payments:
+                recent_payments.append({
+                    "transaction_id": payment.transaction_id,
+                    "amount": payment.amount_paid,
+                    "payment_method": payment.payment_method,
+                    "payment_date": payment.payment_date.isoformat(),
+                    "status": payment.status.value,
+                    "course_code": course.course_code if course else "General",
+                    "fee_type": fee_structure.fee_type.value if fee_structure else "General"
+                })
+
+        # The unread total rides along on each row as a window count, so the page and the count are one query
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        notifications = db.query(Notification, func.count(Notification.id).over().label("unread")).filter(
+            Notification.student_id == student_id,
+            Notification.is_read == False,
+            or_(Notification.expires_at == None, Notification.expires_at > now)
+        ).order_by(Notification.sent_at.desc(), Notification.id.desc()).limit(max(notifications_limit, 1)).all()
+        unread_count = notifications[0].unread if notifications else 0
+
+        return {
+            "status": "success",
+            "student": {
+                "name": student.name,
+                "student_id": student.student_id,
+                "department": student.department,
+                "email": student.email,
+                "phone": student.phone,
+                "enrollment_date": student.enrollment_date.isoformat() if student.enrollment_date else None,
+                "is_active": student.is_active
+            },
+            "courses": courses,
+            "total_credits": sum(course["credits"] or 0 for course in courses),
+            "balance": {
+                "total_fees": total_fees,
+                "total_paid": total_paid,
+                "balance_due": total_fees - total_paid,
+                "next_due_date": next_due,
+                "currency": "USD"
+            },
+            "recent_payments": recent_payments,
+            "notifications": {
+                "unread_count": unread_count,
+                "latest": [{
+                    "id": notification.id,
+                    "title": notification.title,
+                    "notification_type": notification.notification_type,
+                    "priority": notification.priority,
+                    "sent_at": notification.sent_at.isoformat() if notification.sent_at else None
+                } for notification, _ in notifications[:notifications_limit]]
+            }
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
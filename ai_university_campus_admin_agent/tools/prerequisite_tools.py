@@ -0,0 +1,260 @@
+# prerequisite_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Set, FrozenSet, Iterable
+from sqlalchemy.orm import Session
+from collections import deque
+import json
+import os
+import re
+import threading
+import time
+
+from ai_university_campus_admin_agent.config.database import get_db, Course, Registration, RegistrationStatus
+
+load_dotenv()
+
+# Other worker processes may edit the catalog, so the cached graph is rebuilt after this many seconds
+PREREQUISITE_GRAPH_TTL = int(os.getenv("PREREQUISITE_GRAPH_TTL", "300"))
+
+_EMPTY_VALUES = {"", "none", "null", "n/a", "na", "[]"}
+
+def parse_prerequisites(prerequisites: Optional[str]) -> List[str]:
+    """Parse Course.prerequisites, stored as a JSON list or comma-separated course codes"""
+    if not prerequisites or prerequisites.strip().lower() in _EMPTY_VALUES:
+        return []
+    text = prerequisites.strip()
+    if text.startswith("["):
+        try:
+            codes = json.loads(text)
+        except json.JSONDecodeError:
+            codes = re.split(r"[,;]", text.strip("[]"))
+    else:
+        codes = re.split(r"[,;]|\s+and\s+", text)
+    result = []
+    for code in codes:
+        code = str(code).strip().strip("\"'")
+        if code and code.lower() not in _EMPTY_VALUES and code not in result:
+            result.append(code)
+    return result
+
+class PrerequisiteGraph:
+    """In-memory prerequisite DAG with a precomputed transitive closure per course"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._direct: Dict[str, List[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._closure: Dict[str, FrozenSet[str]] = {}
+        self.cycles: List[List[str]] = []
+        self.loaded_at: Optional[float] = None
+
+    def load(self, db: Session) -> None:
+        """Rebuild the whole graph from the course catalog"""
+        rows = db.query(Course.course_code, Course.prerequisites).all()
+        with self._lock:
+            self._direct = {code: parse_prerequisites(prerequisites) for code, prerequisites in rows}
+            self._dependents = {}
+            for code, prerequisites in self._direct.items():
+                for prerequisite in prerequisites:
+                    self._dependents.setdefault(prerequisite, set()).add(code)
+            self._closure = {}
+            self.cycles = []
+            for code in self._direct:
+                self._compute_closure(code, [])
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > PREREQUISITE_GRAPH_TTL
+
+    def _compute_closure(self, code: str, path: List[str]) -> FrozenSet[str]:
+        if code in self._closure:
+            return self._closure[code]
+        if code in path:
+            # Existing data contains a cycle: record it and cut the back edge
+            self.cycles.append(path[path.index(code):] + [code])
+            return frozenset()
+        path.append(code)
+        closure = set()
+        for prerequisite in self._direct.get(code, []):
+            closure.add(prerequisite)
+            closure |= self._compute_closure(prerequisite, path)
+        path.pop()
+        self._closure[code] = frozenset(closure)
+        return self._closure[code]
+
+    def direct(self, code: str) -> List[str]:
+        with self._lock:
+            return list(self._direct.get(code, []))
+
+    def closure(self, code: str) -> FrozenSet[str]:
+        with self._lock:
+            return self._closure.get(code, frozenset())
+
+    def find_cycle(self, code: str, prerequisites: Iterable[str]) -> Optional[List[str]]:
+        """Return the cycle that giving `code` these prerequisites would create, if any"""
+        with self._lock:
+            for prerequisite in prerequisites:
+                if prerequisite == code:
+                    return [code, code]
+                if code in self._closure.get(prerequisite, frozenset()):
+                    return [code] + self._path(prerequisite, code)
+        return None
+
+    def _path(self, start: str, target: str) -> List[str]:
+        """Breadth-first prerequisite path from start down to target"""
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            if node == target:
+                break
+            for prerequisite in self._direct.get(node, []):
+                if prerequisite not in parents:
+                    parents[prerequisite] = node
+                    queue.append(prerequisite)
+        path = []
+        node = target
+        while node is not None:
+            path.append(node)
+            node = parents.get(node)
+        return list(reversed(path))
+
+    def set_prerequisites(self, code: str, prerequisites: List[str]) -> None:
+        """Replace a course's prerequisites and recompute only the closures that depend on it"""
+        with self._lock:
+            for old in self._direct.get(code, []):
+                self._dependents.get(old, set()).discard(code)
+            self._direct[code] = list(prerequisites)
+            for prerequisite in prerequisites:
+                self._dependents.setdefault(prerequisite, set()).add(code)
+
+            # Every course that (transitively) requires `code` has a stale closure
+            affected = {code}
+            queue = deque([code])
+            while queue:
+                for dependent in self._dependents.get(queue.popleft(), ()):
+                    if dependent not in affected:
+                        affected.add(dependent)
+                        queue.append(dependent)
+            for node in affected:
+                self._closure.pop(node, None)
+            for node in affected:
+                self._compute_closure(node, [])
+
+prerequisite_graph = PrerequisiteGraph()
+
+def get_prerequisite_graph(db: Session) -> PrerequisiteGraph:
+    """Return the shared prerequisite graph, rebuilding it when it has not been loaded recently"""
+    if prerequisite_graph.is_stale():
+        prerequisite_graph.load(db)
+    return prerequisite_graph
+
+def get_completed_course_codes(db: Session, student_id: str) -> Set[str]:
+    """Course codes the student has completed, fetched in one query"""
+    rows = db.query(Course.course_code).join(
+        Registration, Registration.course_id == Course.id
+    ).filter(
+        Registration.student_id == student_id,
+        Registration.status == RegistrationStatus.COMPLETED
+    )
+    return {code for (code,) in rows}
+
+def find_missing_prerequisites(db: Session, student_id: str, course_code: str) -> Dict[str, List[str]]:
+    """Direct prerequisites the student still lacks, plus every unfinished course in the prerequisite chain"""
+    graph = get_prerequisite_graph(db)
+    direct = graph.direct(course_code)
+    if not direct:
+        return {"missing": [], "remaining_chain": []}
+    completed = get_completed_course_codes(db, student_id)
+    return {
+        "missing": [code for code in direct if code not in completed],
+        "remaining_chain": sorted(graph.closure(course_code) - completed)
+    }
+
+def check_course_eligibility(student_id: str, course_code: str) -> Dict[str, Any]:
+    """Check whether a student has completed the prerequisites for a course"""
+    try:
+        db: Session = next(get_db())
+
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        graph = get_prerequisite_graph(db)
+        result = find_missing_prerequisites(db, student_id, course_code)
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "course_code": course_code,
+            "eligible": not result["missing"],
+            "prerequisites": graph.direct(course_code),
+            "missing_prerequisites": result["missing"],
+            "remaining_prerequisite_chain": result["remaining_chain"]
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def get_eligible_courses(student_id: str, department: Optional[str] = None, semester: Optional[str] = None) -> Dict[str, Any]:
+    """List the active courses a student can enroll in, checking the whole catalog in one pass"""
+    try:
+        db: Session = next(get_db())
+        graph = get_prerequisite_graph(db)
+
+        taken = db.query(Registration.course_id, Registration.status, Course.course_code).join(
+            Course, Registration.course_id == Course.id
+        ).filter(
+            Registration.student_id == student_id,
+            Registration.status.in_([RegistrationStatus.ACTIVE, RegistrationStatus.COMPLETED, RegistrationStatus.PENDING])
+        ).all()
+        completed = {code for _, status, code in taken if status == RegistrationStatus.COMPLETED}
+        registered = {course_id for course_id, _, _ in taken}
+
+        query = db.query(
+            Course.id, Course.course_code, Course.course_name, Course.department, Course.credits,
+            Course.semester, Course.max_capacity, Course.current_enrollment
+        ).filter(Course.is_active == True)
+        if department:
+            query = query.filter(Course.department == department)
+        if semester:
+            query = query.filter(Course.semester == semester)
+
+        eligible = []
+        for course in query:
+            if course.id in registered:
+                continue
+            if any(code not in completed for code in graph.direct(course.course_code)):
+                continue
+            eligible.append({
+                "course_code": course.course_code,
+                "course_name": course.course_name,
+                "department": course.department,
+                "credits": course.credits,
+                "semester": course.semester,
+                "available_seats": course.max_capacity - course.current_enrollment
+            })
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "eligible_courses": eligible,
+            "total_courses": len(eligible),
+            "completed_courses": sorted(completed)
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def detect_prerequisite_cycles() -> Dict[str, Any]:
+    """Rebuild the prerequisite graph from the catalog and report any circular prerequisites"""
+    try:
+        db: Session = next(get_db())
+        prerequisite_graph.load(db)
+        cycles = [" -> ".join(cycle) for cycle in prerequisite_graph.cycles]
+
+        return {
+            "status": "success",
+            "has_cycles": bool(cycles),
+            "cycles": cycles
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
@@ -0,0 +1,220 @@
+# reconciliation_tools.py
+from dotenv import load_dotenv
+from typing import Dict, Any, Iterator, List, Optional
+from sqlalchemy.orm import Session
+import csv
+import datetime
+import itertools
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import get_db, dialect_insert, Student, Course, FeeStructure, Payment, FeeType, PaymentStatus
+from ai_university_campus_admin_agent.tools.fee_tools import VALID_PAYMENT_METHODS
+from ai_university_campus_admin_agent.utils.paths import IMPORT_DIR, REPORT_DIR, confined_path
+
+load_dotenv()
+
+# Bank files are CSV with a header row: transaction_id, student_id, amount are required;
+# payment_date, payment_method, course_code, fee_type and notes are optional.
+REPORT_COLUMNS = ["line", "transaction_id", "student_id", "amount", "outcome", "detail"]
+
+def _read_chunks(reader: Iterator[Dict[str, str]], chunk_size: int) -> Iterator[List[tuple]]:
+    """Yield (line_number, row) pairs from the CSV reader in fixed-size chunks"""
+    numbered = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(itertools.islice(numbered, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _parse_row(row: Dict[str, str]) -> Dict[str, Any]:
+    """Validate a bank file row, raising ValueError with a readable reason"""
+    transaction_id = (row.get("transaction_id") or "").strip()
+    student_id = (row.get("student_id") or "").strip()
+    if not transaction_id:
+        raise ValueError("missing transaction_id")
+    if not student_id:
+        raise ValueError("missing student_id")
+
+    try:
+        amount = float(row.get("amount") or "")
+    except ValueError:
+        raise ValueError("invalid amount")
+    if amount <= 0:
+        raise ValueError("amount must be positive")
+
+    payment_method = (row.get("payment_method") or "bank_transfer").strip()
+    if payment_method not in VALID_PAYMENT_METHODS:
+        raise ValueError(f"invalid payment method {payment_method}")
+
+    payment_date = datetime.datetime.now(ZoneInfo("UTC"))
+    if row.get("payment_date"):
+        try:
+            payment_date = datetime.datetime.fromisoformat(row["payment_date"].strip().replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError("invalid payment_date")
+
+    course_code = (row.get("course_code") or "").strip() or None
+    fee_type = None
+    if row.get("fee_type"):
+        try:
+            fee_type = FeeType(row["fee_type"].strip().lower())
+        except ValueError:
+            raise ValueError(f"invalid fee type {row['fee_type']}")
+
+    return {
+        "transaction_id": transaction_id,
+        "student_id": student_id,
+        "amount": amount,
+        "payment_method": payment_method,
+        "payment_date": payment_date,
+        "course_code": course_code,
+        "fee_type": fee_type,
+        "notes": (row.get("notes") or "").strip() or None
+    }
+
+def _reconcile_chunk(db: Session, chunk: List[tuple], writer, counts: Dict[str, int]) -> None:
+    """Resolve, insert and report a single chunk of bank file rows"""
+    parsed = []
+    for line, row in chunk:
+        try:
+            parsed.append((line, _parse_row(row)))
+        except ValueError as e:
+            counts["unmatched"] += 1
+            writer.writerow([line, row.get("transaction_id"), row.get("student_id"), row.get("amount"), "unmatched", str(e)])
+
+    # Set-based lookups for the whole chunk
+    student_ids = {p["student_id"] for _, p in parsed}
+    known_students = set()
+    if student_ids:
+        known_students = {sid for (sid,) in db.query(Student.student_id).filter(Student.student_id.in_(student_ids))}
+
+    course_codes = {p["course_code"] for _, p in parsed if p["course_code"]}
+    fee_structures = {}
+    if course_codes:
+        fee_rows = db.query(FeeStructure.id, Course.course_code, FeeStructure.fee_type).join(
+            Course, FeeStructure.course_id == Course.id
+        ).filter(
+            Course.course_code.in_(course_codes),
+            FeeStructure.is_active == True
+        ).order_by(FeeStructure.id).all()
+        for fee_id, course_code, fee_type in fee_rows:
+            fee_structures.setdefault((course_code, fee_type), fee_id)
+
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    candidates = []
+    seen = set()
+    for line, p in parsed:
+        report_row = [line, p["transaction_id"], p["student_id"], p["amount"]]
+        if p["student_id"] not in known_students:
+            counts["unmatched"] += 1
+            writer.writerow(report_row + ["unmatched", "unknown student"])
+            continue
+
+        fee_structure_id = None
+        if p["course_code"] and p["fee_type"]:
+            fee_structure_id = fee_structures.get((p["course_code"], p["fee_type"]))
+            if fee_structure_id is None:
+                counts["unmatched"] += 1
+                writer.writerow(report_row + ["unmatched", f"no active fee structure for {p['fee_type'].value} in {p['course_code']}"])
+                continue
+
+        if p["transaction_id"] in seen:
+            counts["duplicate"] += 1
+            writer.writerow(report_row + ["duplicate", "repeated in bank file"])
+            continue
+        seen.add(p["transaction_id"])
+
+        candidates.append((report_row, {
+            "student_id": p["student_id"],
+            "fee_structure_id": fee_structure_id,
+            "amount_paid": p["amount"],
+            "payment_date": p["payment_date"],
+            "payment_method": p["payment_method"],
+            "transaction_id": p["transaction_id"],
+            "status": PaymentStatus.PAID,
+            "notes": p["notes"],
+            "created_at": now,
+            "updated_at": now
+        }))
+
+    if not candidates:
+        return
+
+    # Rely on the unique transaction_id index to skip payments that are already recorded
+    stmt = dialect_insert(Payment).on_conflict_do_nothing(
+        index_elements=["transaction_id"]
+    ).returning(Payment.transaction_id)
+    inserted = set(db.execute(stmt, [values for _, values in candidates]).scalars())
+
+    for report_row, values in candidates:
+        if values["transaction_id"] in inserted:
+            counts["matched"] += 1
+            writer.writerow(report_row + ["matched", ""])
+        else:
+            counts["duplicate"] += 1
+            writer.writerow(report_row + ["duplicate", "transaction already recorded"])
+
+def import_bank_reconciliation(file_path: str, report_path: Optional[str] = None, chunk_size: int = 1000) -> Dict[str, Any]:
+    """Import a bank settlement CSV file in chunks and write a reconciliation report of matched, duplicate and unmatched rows.
+
+    file_path is read from the import directory and report_path is written to the report directory;
+    both may be relative to them, and paths outside them are rejected.
+    """
+    try:
+        file_path = confined_path(IMPORT_DIR, file_path)
+        # The default report is named after the bank file
+        report_path = confined_path(REPORT_DIR, report_path or f"{file_path.stem}.reconciliation.csv")
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    if not file_path.is_file():
+        return {"status": "error", "message": f"Bank file not found: {file_path}"}
+    if chunk_size <= 0:
+        return {"status": "error", "message": "chunk_size must be positive"}
+
+    db: Session = next(get_db())
+    counts = {"matched": 0, "duplicate": 0, "unmatched": 0}
+    chunks = 0
+    try:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, newline='', encoding='utf-8') as bank_file, \
+                open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+            reader = csv.DictReader(bank_file)
+            missing = {"transaction_id", "student_id", "amount"} - set(reader.fieldnames or [])
+            if missing:
+                return {"status": "error", "message": f"Bank file is missing columns: {', '.join(sorted(missing))}"}
+
+            writer = csv.writer(report_file)
+            writer.writerow(REPORT_COLUMNS)
+            for chunk in _read_chunks(reader, chunk_size):
+                _reconcile_chunk(db, chunk, writer, counts)
+                db.commit()
+                chunks += 1
+
+        return {
+            "status": "success",
+            "message": "Bank file reconciled successfully",
+            "summary": {
+                "rows_processed": sum(counts.values()),
+                "matched": counts["matched"],
+                "duplicate": counts["duplicate"],
+                "unmatched": counts["unmatched"],
+                "chunks": chunks
+            },
+            "report_path": str(report_path)
+        }
+    except Exception as e:
+        db.rollback()
+        return {"status": "error", "message": str(e), "summary": counts, "chunks_committed": chunks}
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Reconcile a bank settlement file against recorded payments")
+    parser.add_argument("file_path", help="bank file inside IMPORT_DIR")
+    parser.add_argument("--report-path", help="report file inside REPORT_DIR")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(import_bank_reconciliation(args.file_path, args.report_path, args.chunk_size), indent=2))
@@ -13,10 +13,16 @@ from sqlalchemy.orm import Session
 import datetime
 from zoneinfo import ZoneInfo
 
-from ai_university_campus_admin_agent.config.database import get_db, Student, Registration, Course, ActivityLog, ActivityType, RegistrationStatus
+from ai_university_campus_admin_agent.config.database import get_db, Student, Registration, Course, ActivityLog, WaitlistEntry, ActivityType, RegistrationStatus
+from ai_university_campus_admin_agent.tools.schedule_tools import find_schedule_conflicts
+from ai_university_campus_admin_agent.tools.prerequisite_tools import find_missing_prerequisites
+from ai_university_campus_admin_agent.tools.waitlist_tools import claim_seat, waitlist_length
+from ai_university_campus_admin_agent.utils.admission import admission_controlled
+from ai_university_campus_admin_agent.utils.idempotency import idempotent
 
 load_dotenv()
 
+@idempotent
 def create_student(name: str, student_id: str, department: str, email: str, phone: Optional[str] = None, address: Optional[str] = None) -> Dict[str, Any]:
     """Create a new student record in the database"""
     try:
@@ -97,6 +103,7 @@ def get_student(student_id: str) -> Dict[str, Any]:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
 def update_student(student_id: str, name: Optional[str] = None, department: Optional[str] = None, 
                   email: Optional[str] = None, phone: Optional[str] = None, address: Optional[str] = None) -> Dict[str, Any]:
     """Update existing student information"""
@@ -154,6 +161,7 @@ def update_student(student_id: str, name: Optional[str] = None, department: Opti
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
 def delete_student(student_id: str) -> Dict[str, Any]:
     """Delete a student record from the database"""
     try:
@@ -182,11 +190,12 @@ def delete_student(student_id: str) -> Dict[str, Any]:
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@idempotent
+@admission_controlled
 def enroll_course(student_id: str, course_code: str) -> Dict[str, Any]:
     """Enroll a student in a specified course"""
+    db: Session = next(get_db())
     try:
-        db: Session = next(get_db())
-        
         # Check if student exists
         student = db.query(Student).filter(Student.student_id == student_id).first()
         if not student:
@@ -201,7 +210,11 @@ def enroll_course(student_id: str, course_code: str) -> Dict[str, Any]:
             return {"status": "error", "message": "Course is not active"}
         
         if course.current_enrollment >= course.max_capacity:
-            return {"status": "error", "message": "Course is full"}
+            return {
+                "status": "error",
+                "message": "Course is full. The student can join the waitlist and will be enrolled automatically when a seat opens",
+                "waitlist_length": waitlist_length(db, course.id)
+            }
         
         # Check if already enrolled
         existing_registration = db.query(Registration).filter(
@@ -212,6 +225,26 @@ def enroll_course(student_id: str, course_code: str) -> Dict[str, Any]:
         if existing_registration:
             return {"status": "error", "message": "Student is already enrolled in this course"}
         
+        # Check prerequisites against the student's completed courses
+        prerequisites = find_missing_prerequisites(db, student_id, course.course_code)
+        if prerequisites["missing"]:
+            return {
+                "status": "error",
+                "message": f"Missing prerequisites: {', '.join(prerequisites['missing'])}",
+                "missing_prerequisites": prerequisites["missing"],
+                "remaining_prerequisite_chain": prerequisites["remaining_chain"]
+            }
+        
+        # Check for time clashes with the student's other active courses
+        conflicts = find_schedule_conflicts(db, student_id, course)
+        if conflicts:
+            clashing = sorted({conflict["course_code"] for conflict in conflicts})
+            return {
+                "status": "error",
+                "message": f"Schedule conflict with {', '.join(clashing)}",
+                "conflicts": conflicts
+            }
+        
         # Create registration
         new_registration = Registration(
             student_id=student_id,
@@ -222,8 +255,18 @@ def enroll_course(student_id: str, course_code: str) -> Dict[str, Any]:
             updated_at=datetime.datetime.now(ZoneInfo("UTC"))
         )
         
-        # Update course enrollment count
-        course.current_enrollment += 1
+        # Take the seat atomically; another enrollment may have filled the course since it was read
+        if not claim_seat(db, course.id):
+            db.rollback()
+            return {
+                "status": "error",
+                "message": "Course is full. The student can join the waitlist and will be enrolled automatically when a seat opens",
+                "waitlist_length": waitlist_length(db, course.id)
+            }
+        db.query(WaitlistEntry).filter(
+            WaitlistEntry.course_id == course.id,
+            WaitlistEntry.student_id == student_id
+        ).delete(synchronize_session=False)
         
         db.add(new_registration)
         db.commit()
@@ -252,6 +295,8 @@ def enroll_course(student_id: str, course_code: str) -> Dict[str, Any]:
         }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
 
 def get_student_registrations(student_id: str) -> Dict[str, Any]:
     """Get all course registrations for a student"""
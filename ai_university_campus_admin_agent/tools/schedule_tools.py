@@ -0,0 +1,242 @@
+# schedule_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Iterable, NamedTuple, Tuple
+from sqlalchemy.orm import Session
+from bisect import bisect_left
+from functools import lru_cache
+import re
+
+from ai_university_campus_admin_agent.config.database import get_db, Course, Registration, RegistrationStatus
+
+load_dotenv()
+
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+_DAY_ALIASES = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tues": 1, "tue": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thurs": 3, "thur": 3, "thu": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6,
+}
+# Compact registrar notation: "MWF", "TTh", "TR", "SaSu"
+_COMPACT_DAYS = {"M": 0, "T": 1, "Tu": 1, "W": 2, "R": 3, "Th": 3, "F": 4, "S": 5, "Sa": 5, "U": 6, "Su": 6}
+_COMPACT_TOKEN = re.compile(r"Th|Tu|Sa|Su|M|T|W|R|F|S|U")
+_TIME_RANGE = re.compile(
+    r"(\d{1,2})(?::(\d{2}))?(?:\s*([ap])\.?m\.?)?\s*(?:-|–|to)\s*(\d{1,2})(?::(\d{2}))?(?:\s*([ap])\.?m\.?)?",
+    re.IGNORECASE
+)
+
+class Meeting(NamedTuple):
+    day: int  # 0 = Monday
+    start: int  # minutes after midnight
+    end: int
+
+def _parse_days(text: str) -> List[int]:
+    days = []
+    for word in re.findall(r"[A-Za-z]+", text):
+        if word.lower() in _DAY_ALIASES:
+            days.append(_DAY_ALIASES[word.lower()])
+        elif "".join(_COMPACT_TOKEN.findall(word)) == word:
+            days.extend(_COMPACT_DAYS[token] for token in _COMPACT_TOKEN.findall(word))
+    return sorted(set(days))
+
+def _to_minutes(hour: int, minute: int, meridiem: Optional[str]) -> int:
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    return hour * 60 + minute
+
+@lru_cache(maxsize=4096)
+def parse_schedule(schedule: Optional[str]) -> Tuple[Meeting, ...]:
+    """Parse a free-form schedule such as "MWF 9:00-10:00" or "Monday, Wednesday 9:00 AM - 10:00 AM".
+
+    Several day/time groups may be combined ("MW 9:00-10:15; F 13:00-15:00"). Schedules that
+    cannot be parsed ("TBD", "Online") yield no meetings.
+    """
+    if not schedule:
+        return ()
+
+    meetings = set()
+    days: List[int] = []
+    position = 0
+    for match in _TIME_RANGE.finditer(schedule):
+        # Days are written before their time range; a range without days reuses the previous ones
+        days = _parse_days(schedule[position:match.start()]) or days
+        position = match.end()
+        if not days:
+            continue
+
+        start_hour, start_minute, start_meridiem, end_hour, end_minute, end_meridiem = match.groups()
+        start_hour, start_minute = int(start_hour), int(start_minute or 0)
+        end = _to_minutes(int(end_hour), int(end_minute or 0), end_meridiem)
+        if start_meridiem:
+            start = _to_minutes(start_hour, start_minute, start_meridiem)
+        elif end_meridiem:
+            # "9:00-10:00 AM" shares the suffix, but "11:00-1:00 PM" starts in the morning
+            start = _to_minutes(start_hour, start_minute, end_meridiem)
+            if start >= end:
+                start = _to_minutes(start_hour, start_minute, None)
+        else:
+            start = _to_minutes(start_hour, start_minute, None)
+            if end <= start and int(end_hour) < 12:
+                end += 12 * 60  # "11-1" runs past noon
+        if not (0 <= start < end <= 24 * 60):
+            continue
+
+        meetings.update(Meeting(day, start, end) for day in days)
+
+    return tuple(sorted(meetings))
+
+def format_meeting(meeting: Meeting) -> str:
+    return f"{DAY_NAMES[meeting.day][:3]} {meeting.start // 60:02d}:{meeting.start % 60:02d}-{meeting.end // 60:02d}:{meeting.end % 60:02d}"
+
+class WeeklyIntervalIndex:
+    """Per-day interval index over weekly meetings.
+
+    Intervals are sorted by start time with a running maximum of end times, so deciding whether
+    a new meeting overlaps anything takes one binary search: O(log n) per meeting.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Meeting, Any]]):
+        by_day: Dict[int, List[Tuple[int, int, Any]]] = {}
+        for meeting, label in entries:
+            by_day.setdefault(meeting.day, []).append((meeting.start, meeting.end, label))
+
+        self._intervals = {}
+        self._starts = {}
+        self._max_end = {}
+        for day, intervals in by_day.items():
+            intervals.sort(key=lambda interval: (interval[0], interval[1]))
+            max_end = []
+            running = -1
+            for _, end, _ in intervals:
+                running = max(running, end)
+                max_end.append(running)
+            self._intervals[day] = intervals
+            self._starts[day] = [start for start, _, _ in intervals]
+            self._max_end[day] = max_end
+
+    def overlapping(self, meeting: Meeting) -> List[Any]:
+        """Return the labels of all indexed intervals that overlap the meeting"""
+        starts = self._starts.get(meeting.day)
+        if not starts:
+            return []
+        # Only intervals starting before the meeting ends can overlap it
+        i = bisect_left(starts, meeting.end) - 1
+        max_end = self._max_end[meeting.day]
+        if i < 0 or max_end[i] <= meeting.start:
+            return []
+
+        labels = []
+        intervals = self._intervals[meeting.day]
+        while i >= 0 and max_end[i] > meeting.start:
+            start, end, label = intervals[i]
+            if end > meeting.start:
+                labels.append(label)
+            i -= 1
+        return labels
+
+def _same_term(a: Course, b_semester: Optional[str], b_year: Optional[int]) -> bool:
+    """Courses only clash when they run in the same term; unknown terms are assumed to overlap"""
+    if a.semester and b_semester and a.semester.lower() != b_semester.lower():
+        return False
+    if a.year and b_year and a.year != b_year:
+        return False
+    return True
+
+def find_schedule_conflicts(db: Session, student_id: str, course: Course) -> List[Dict[str, Any]]:
+    """Find the student's active registrations whose meetings overlap the given course"""
+    new_meetings = parse_schedule(course.schedule)
+    if not new_meetings:
+        return []
+
+    registered = db.query(Course.course_code, Course.schedule, Course.semester, Course.year).join(
+        Registration, Registration.course_id == Course.id
+    ).filter(
+        Registration.student_id == student_id,
+        Registration.status == RegistrationStatus.ACTIVE,
+        Course.id != course.id
+    ).all()
+
+    index = WeeklyIntervalIndex(
+        (meeting, (course_code, meeting))
+        for course_code, schedule, semester, year in registered
+        if _same_term(course, semester, year)
+        for meeting in parse_schedule(schedule)
+    )
+
+    conflicts = []
+    for meeting in new_meetings:
+        for course_code, existing in index.overlapping(meeting):
+            conflicts.append({
+                "course_code": course_code,
+                "existing_meeting": format_meeting(existing),
+                "requested_meeting": format_meeting(meeting)
+            })
+    return conflicts
+
+def check_schedule_conflicts(student_id: str, course_code: str) -> Dict[str, Any]:
+    """Check whether a course's meeting times clash with a student's current courses"""
+    try:
+        db: Session = next(get_db())
+
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        conflicts = find_schedule_conflicts(db, student_id, course)
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "course_code": course_code,
+            "schedule": course.schedule,
+            "schedule_recognized": bool(parse_schedule(course.schedule)),
+            "has_conflicts": bool(conflicts),
+            "conflicts": conflicts
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+def get_student_timetable(student_id: str) -> Dict[str, Any]:
+    """Get a student's weekly timetable built from their active course registrations"""
+    try:
+        db: Session = next(get_db())
+
+        registered = db.query(Course).join(
+            Registration, Registration.course_id == Course.id
+        ).filter(
+            Registration.student_id == student_id,
+            Registration.status == RegistrationStatus.ACTIVE
+        ).all()
+
+        timetable = {day: [] for day in DAY_NAMES}
+        unscheduled = []
+        for course in registered:
+            meetings = parse_schedule(course.schedule)
+            if not meetings:
+                unscheduled.append({"course_code": course.course_code, "course_name": course.course_name, "schedule": course.schedule})
+                continue
+            for meeting in meetings:
+                timetable[DAY_NAMES[meeting.day]].append({
+                    "course_code": course.course_code,
+                    "course_name": course.course_name,
+                    "start": f"{meeting.start // 60:02d}:{meeting.start % 60:02d}",
+                    "end": f"{meeting.end // 60:02d}:{meeting.end % 60:02d}",
+                    "location": course.location
+                })
+
+        for entries in timetable.values():
+            entries.sort(key=lambda entry: entry["start"])
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "timetable": {day: entries for day, entries in timetable.items() if entries},
+            "unscheduled_courses": unscheduled,
+            "total_courses": len(registered)
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
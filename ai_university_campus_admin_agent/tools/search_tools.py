@@ -0,0 +1,331 @@
+# search_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional, Set
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+import math
+import os
+import re
+import threading
+import time
+
+from ai_university_campus_admin_agent.config.database import get_read_db, COURSE_SEARCH_VECTOR
+
+load_dotenv()
+
+MAX_PAGE_SIZE = 50
+MAX_STUDENT_MATCHES = 25
+
+# Other worker processes add students, so the cached name vocabulary is reloaded after this many seconds
+STUDENT_VOCABULARY_TTL = int(os.getenv("STUDENT_VOCABULARY_TTL", "300"))
+
+# Candidates fetched from the index per lookup before rescoring in Python
+_CANDIDATE_POOL = 200
+# Close spellings tried per query word, and how close they must be (pg_trgm's default threshold)
+_SIMILAR_WORDS = 5
+_WORD_SIMILARITY_THRESHOLD = 0.3
+
+# bm25 column weights for courses_fts(course_code, course_name, description, instructor)
+_FTS_WEIGHTS = "10.0, 8.0, 1.0, 4.0"
+
+def _search_terms(query: str) -> List[str]:
+    # Keep only word characters so user input can never inject FTS or tsquery syntax
+    return [term.lower() for term in re.findall(r"\w+", query)][:16]
+
+def _course_filters(department: Optional[str], semester: Optional[str], active_only: bool, params: Dict[str, Any]) -> str:
+    clauses = []
+    if department:
+        clauses.append("c.department = :department")
+        params["department"] = department
+    if semester:
+        clauses.append("c.semester = :semester")
+        params["semester"] = semester
+    if active_only:
+        clauses.append("c.is_active = :is_active")
+        params["is_active"] = True
+    return "".join(f" AND {clause}" for clause in clauses)
+
+def _search_sqlite(db: Session, terms: List[str], match_all: bool, filters: str, params: Dict[str, Any]):
+    # Prefix queries so "neur" finds "neural"; FTS5 implies AND between terms
+    params["match"] = (" " if match_all else " OR ").join(f'"{term}"*' for term in terms)
+    # Only join the catalog while matching when a filter needs it
+    join = "JOIN courses c ON c.id = courses_fts.rowid" if filters else ""
+    source = f"FROM courses_fts {join} WHERE courses_fts MATCH :match{filters}"
+    total = db.execute(text(f"SELECT count(*) {source}"), params).scalar()
+    # Rank first, then build excerpts and load course rows for the requested page only
+    rows = db.execute(text(f"""
+        WITH ranked AS (
+            SELECT courses_fts.rowid AS id, bm25(courses_fts, {_FTS_WEIGHTS}) AS rank
+            {source}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT c.course_code, c.course_name, c.department, c.semester, c.year, c.credits, c.instructor,
+               c.schedule, c.max_capacity, c.current_enrollment,
+               (SELECT snippet(courses_fts, 2, '[', ']', '...', 12) FROM courses_fts
+                WHERE courses_fts MATCH :match AND courses_fts.rowid = ranked.id) AS excerpt,
+               -ranked.rank AS score
+        FROM ranked JOIN courses c ON c.id = ranked.id
+        ORDER BY ranked.rank
+    """), params).all()
+    return total, rows
+
+def _search_postgresql(db: Session, terms: List[str], match_all: bool, filters: str, params: Dict[str, Any]):
+    params["match"] = (" & " if match_all else " | ").join(f"{term}:*" for term in terms)
+    # The vector expression matches the one ix_courses_search was built on, so the GIN index is used
+    source = f"""
+        FROM courses c, to_tsquery('english', :match) query
+        WHERE ({COURSE_SEARCH_VECTOR}) @@ query{filters}
+    """
+    total = db.execute(text(f"SELECT count(*) {source}"), params).scalar()
+    rows = db.execute(text(f"""
+        SELECT c.course_code, c.course_name, c.department, c.semester, c.year, c.credits, c.instructor,
+               c.schedule, c.max_capacity, c.current_enrollment,
+               ts_headline('english', coalesce(c.description, ''), query, 'MaxWords=20, MinWords=8') AS excerpt,
+               ts_rank_cd(({COURSE_SEARCH_VECTOR}), query) AS score
+        {source}
+        ORDER BY score DESC, c.course_code
+        LIMIT :limit OFFSET :offset
+    """), params).all()
+    return total, rows
+
+def search_courses(query: str, department: Optional[str] = None, semester: Optional[str] = None,
+                   active_only: bool = True, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+    """Search courses by topic, title, code or instructor, best matches first.
+
+    Use this instead of listing the whole catalog when the user describes what they are looking
+    for (e.g. "neural networks", "intro statistics", "Dr. Smith").
+    """
+    db: Session = next(get_read_db())
+    try:
+        if page < 1 or page_size < 1 or page_size > MAX_PAGE_SIZE:
+            return {"status": "error", "message": f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}"}
+        terms = _search_terms(query)
+        if not terms:
+            return {"status": "error", "message": "Search query must contain at least one word"}
+
+        search = _search_postgresql if db.get_bind().dialect.name == "postgresql" else _search_sqlite
+
+        params: Dict[str, Any] = {"limit": page_size, "offset": (page - 1) * page_size}
+        filters = _course_filters(department, semester, active_only, params)
+        total, rows = search(db, terms, True, filters, params)
+        matched_all_terms = True
+        if not total and len(terms) > 1:
+            # Nothing has every word; fall back to courses matching any of them
+            total, rows = search(db, terms, False, filters, params)
+            matched_all_terms = False
+
+        results = []
+        for row in rows:
+            results.append({
+                "course_code": row.course_code,
+                "course_name": row.course_name,
+                "department": row.department,
+                "semester": row.semester,
+                "year": row.year,
+                "credits": row.credits,
+                "instructor": row.instructor,
+                "schedule": row.schedule,
+                "available_seats": row.max_capacity - row.current_enrollment,
+                "excerpt": row.excerpt,
+                "score": round(float(row.score), 3)
+            })
+
+        return {
+            "status": "success",
+            "query": query,
+            "results": results,
+            "matched_all_terms": matched_all_terms,
+            "page": page,
+            "page_size": page_size,
+            "total_results": total,
+            "has_more": page * page_size < total
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def trigrams(value: str) -> Set[str]:
+    """Trigrams of a string the way pg_trgm builds them: per lowercased word, padded with blanks"""
+    grams = set()
+    for word in re.findall(r"[^\W_]+", value.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Shared trigrams over all trigrams, the same measure as pg_trgm's similarity()"""
+    left, right = trigrams(a), trigrams(b)
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+class NameVocabulary:
+    """Trigram index over the distinct words in student names, used to correct misspelled query words"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._grams: Dict[str, Set[str]] = {}
+        self._words_by_gram: Dict[str, List[str]] = {}
+        self.loaded_at: Optional[float] = None
+
+    def load(self, db: Session) -> None:
+        """Rebuild from the FTS vocabulary, which holds one row per distinct indexed word"""
+        grams: Dict[str, Set[str]] = {}
+        words_by_gram: Dict[str, List[str]] = {}
+        for word in db.execute(text("SELECT term FROM students_fts_vocab")).scalars():
+            grams[word] = trigrams(word)
+            for gram in grams[word]:
+                words_by_gram.setdefault(gram, []).append(word)
+        with self._lock:
+            self._grams = grams
+            self._words_by_gram = words_by_gram
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at > STUDENT_VOCABULARY_TTL
+
+    def similar_words(self, word: str, limit: int = _SIMILAR_WORDS) -> List[str]:
+        """Indexed words within trigram similarity of word, most similar first"""
+        query_grams = trigrams(word)
+        if not query_grams:
+            return []
+        with self._lock:
+            grams, words_by_gram = self._grams, self._words_by_gram
+        # A match must share at least this many trigrams, so it has to appear in one of the
+        # len - needed + 1 rarest ones; common trigrams like "  m" are never scanned
+        needed = max(1, math.ceil(_WORD_SIMILARITY_THRESHOLD * len(query_grams)))
+        rarest = sorted(query_grams, key=lambda gram: len(words_by_gram.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(query_grams) - needed + 1]:
+            candidates.update(words_by_gram.get(gram, ()))
+        scored = []
+        for candidate in candidates:
+            shared = len(query_grams & grams[candidate])
+            score = shared / (len(query_grams) + len(grams[candidate]) - shared)
+            if score >= _WORD_SIMILARITY_THRESHOLD and candidate != word:
+                scored.append((score, candidate))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [candidate for _, candidate in scored[:limit]]
+
+name_vocabulary = NameVocabulary()
+
+def get_name_vocabulary(db: Session) -> NameVocabulary:
+    """Return the shared name vocabulary, reloading it when it has not been loaded recently"""
+    if name_vocabulary.is_stale():
+        name_vocabulary.load(db)
+    return name_vocabulary
+
+def _name_candidates_sqlite(db: Session, terms: List[str], department: Optional[str], params: Dict[str, Any]) -> list:
+    department_filter = ""
+    if department:
+        department_filter = " AND lower(s.department) = :department"
+        params["department"] = department.lower()
+
+    # Whole words and prefixes first ("gonz" finds "Gonzalez"), then close spellings of each word,
+    # then students matching any word; each stage only runs while the pool is still short
+    exact = [f'"{term}"*' for term in terms]
+    vocabulary = get_name_vocabulary(db)
+    corrected = [
+        "(" + " OR ".join([f'"{term}"*'] + [f'"{word}"' for word in vocabulary.similar_words(term)]) + ")"
+        for term in terms
+    ]
+    stages = [" AND ".join(exact), " AND ".join(corrected)]
+    if len(terms) > 1:
+        stages.append(" OR ".join(corrected))
+
+    candidates = {}
+    for match in stages:
+        # No ORDER BY rank: FTS5 streams matches and stops at the pool size, rescoring happens in Python
+        rows = db.execute(text(f"""
+            SELECT s.id, s.student_id, s.name, s.email, s.department
+            FROM students_fts JOIN students s ON s.id = students_fts.rowid
+            WHERE students_fts MATCH :match{department_filter}
+            LIMIT :pool
+        """), {**params, "match": match}).all()
+        candidates.update((row.id, row) for row in rows)
+        if len(candidates) >= params["limit"]:
+            break
+    return list(candidates.values())
+
+def _name_candidates_postgresql(db: Session, terms: List[str], department: Optional[str], params: Dict[str, Any]) -> list:
+    params["name"] = " ".join(terms)
+    department_filter = ""
+    if department:
+        department_filter = " AND lower(department) = :department"
+        params["department"] = department.lower()
+    # Word similarity scores the query against the closest stretch of the name, so partial names
+    # ("gonz") match; <% and word_similarity() are served by the pg_trgm GIN index on lower(name)
+    return db.execute(text(f"""
+        SELECT id, student_id, name, email, department
+        FROM students
+        WHERE :name <% lower(name){department_filter}
+        ORDER BY word_similarity(:name, lower(name)) DESC
+        LIMIT :pool
+    """), params).all()
+
+def _email_candidates(db: Session, prefix: str, department: Optional[str], params: Dict[str, Any]) -> list:
+    department_filter = " AND lower(department) = :department" if department else ""
+    # A range on the lower(email) index rather than LIKE, which SQLite cannot serve from an index;
+    # prefix is lowercased, so mixed-case addresses match too
+    return db.execute(text(f"""
+        SELECT id, student_id, name, email, department
+        FROM students
+        WHERE lower(email) >= :prefix AND lower(email) < :upper{department_filter}
+        ORDER BY lower(email)
+        LIMIT :pool
+    """), {**params, "prefix": prefix, "upper": prefix + "\uffff", "department": (department or "").lower()}).all()
+
+def search_students(query: str, department: Optional[str] = None, limit: int = 10) -> Dict[str, Any]:
+    """Find students by approximate name or email prefix, optionally within a department.
+
+    Tolerates partial names and typos ("maria gonzales", "gonz", "m.gonzalez@"). Returns the
+    best candidates with a similarity score between 0 and 1; use the student_id from the top
+    result with the other student tools.
+    """
+    db: Session = next(get_read_db())
+    try:
+        if limit < 1 or limit > MAX_STUDENT_MATCHES:
+            return {"status": "error", "message": f"limit must be between 1 and {MAX_STUDENT_MATCHES}"}
+        query = query.strip()
+        terms = [term for term in _search_terms(query) if len(term) >= 2]
+        email_prefix = query.lower() if " " not in query and len(query) >= 3 else None
+        if not terms and not email_prefix:
+            return {"status": "error", "message": "Search query must contain a name or at least 3 characters of an email"}
+
+        params: Dict[str, Any] = {"limit": limit, "pool": _CANDIDATE_POOL}
+        candidates = {}
+        if email_prefix:
+            for row in _email_candidates(db, email_prefix, department, params):
+                local_part = row.email.split("@")[0]
+                candidates[row.id] = (row, min(1.0, 0.5 + 0.5 * len(email_prefix) / max(len(local_part), 1)), "email")
+        if terms and "@" not in query:
+            if db.get_bind().dialect.name == "postgresql":
+                rows = _name_candidates_postgresql(db, terms, department, params)
+            else:
+                rows = _name_candidates_sqlite(db, terms, department, params)
+            name_query = " ".join(terms)
+            for row in rows:
+                score = trigram_similarity(name_query, row.name)
+                if row.id not in candidates or score > candidates[row.id][1]:
+                    candidates[row.id] = (row, score, "name")
+
+        ranked = sorted(candidates.values(), key=lambda candidate: (-candidate[1], candidate[0].name, candidate[0].student_id))
+        results = [
+            {
+                "student_id": row.student_id,
+                "name": row.name,
+                "email": row.email,
+                "department": row.department,
+                "score": round(score, 3),
+                "matched_on": matched_on
+            }
+            for row, score, matched_on in ranked[:limit]
+        ]
+
+        return {"status": "success", "query": query, "results": results, "count": len(results)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
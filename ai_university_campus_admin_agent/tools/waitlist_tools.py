@@ -0,0 +1,260 @@
+# waitlist_tools.py
+from dotenv import load_dotenv
+from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy import update, delete, func
+from sqlalchemy.exc import IntegrityError
+import datetime
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import (
+    get_db, Student, Course, Registration, WaitlistEntry, ActivityLog, Notification,
+    ActivityType, RegistrationStatus
+)
+from ai_university_campus_admin_agent.tools.prerequisite_tools import find_missing_prerequisites
+from ai_university_campus_admin_agent.tools.schedule_tools import find_schedule_conflicts
+from ai_university_campus_admin_agent.utils.admission import admission_controlled
+
+load_dotenv()
+
+def claim_seat(db: Session, course_id: int) -> bool:
+    """Atomically take one seat; False when the course is already at capacity.
+
+    The capacity check and the increment happen in one UPDATE, so concurrent enrollments
+    can never oversubscribe a course or lose an increment.
+    """
+    result = db.execute(
+        update(Course)
+        .where(Course.id == course_id, Course.current_enrollment < Course.max_capacity)
+        .values(current_enrollment=Course.current_enrollment + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def release_seat(db: Session, course_id: int) -> None:
+    """Atomically give back one seat"""
+    db.execute(
+        update(Course)
+        .where(Course.id == course_id, Course.current_enrollment > 0)
+        .values(current_enrollment=Course.current_enrollment - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def waitlist_length(db: Session, course_id: int) -> int:
+    return db.query(func.count(WaitlistEntry.id)).filter(WaitlistEntry.course_id == course_id).scalar()
+
+def _promotion_blocker(db: Session, student_id: str, course: Course) -> Optional[str]:
+    """Why the student can no longer take a seat in the course, or None.
+
+    join_waitlist checks the same things, but the student may have enrolled in a clashing
+    course (or lost a completed prerequisite) while waiting.
+    """
+    prerequisites = find_missing_prerequisites(db, student_id, course.course_code)
+    if prerequisites["missing"]:
+        return f"missing prerequisites: {', '.join(prerequisites['missing'])}"
+    conflicts = find_schedule_conflicts(db, student_id, course)
+    if conflicts:
+        return f"schedule conflict with {', '.join(sorted({conflict['course_code'] for conflict in conflicts}))}"
+    return None
+
+def promote_from_waitlist(db: Session, course: Course) -> List[str]:
+    """Move students from the head of the course's waitlist into free seats.
+
+    Runs inside the caller's transaction and does not commit, so a drop and the promotion
+    into its freed seat become visible together. On PostgreSQL the head entry is locked
+    with SKIP LOCKED, so concurrent drops promote different students. Students who could
+    no longer enroll (prerequisites, timetable clash) are removed from the waitlist and
+    notified instead, and the seat goes to the next in line.
+    """
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    promoted = []
+    while True:
+        entry = db.query(WaitlistEntry).filter(
+            WaitlistEntry.course_id == course.id
+        ).order_by(WaitlistEntry.id).with_for_update(skip_locked=True).first()
+        if not entry:
+            break
+
+        registration = db.query(Registration).filter(
+            Registration.student_id == entry.student_id,
+            Registration.course_id == course.id
+        ).first()
+        if registration and registration.status == RegistrationStatus.ACTIVE:
+            db.delete(entry)  # enrolled by other means since joining
+            db.flush()
+            continue
+        blocker = _promotion_blocker(db, entry.student_id, course)
+        if blocker:
+            db.add(Notification(
+                student_id=entry.student_id,
+                title=f"Removed from the {course.course_code} waitlist",
+                message=f"A seat opened up in {course.course_code} - {course.course_name}, but you could not be enrolled "
+                        f"({blocker}), so you have been removed from its waitlist.",
+                notification_type="academic",
+                priority="high",
+                is_read=False,
+                sent_at=now,
+                created_at=now
+            ))
+            db.delete(entry)
+            db.flush()
+            continue
+        if not claim_seat(db, course.id):
+            break
+
+        if registration:
+            registration.status = RegistrationStatus.ACTIVE
+            registration.registration_date = now
+            registration.updated_at = now
+        else:
+            db.add(Registration(
+                student_id=entry.student_id,
+                course_id=course.id,
+                registration_date=now,
+                status=RegistrationStatus.ACTIVE,
+                created_at=now,
+                updated_at=now
+            ))
+        db.add(ActivityLog(
+            student_id=entry.student_id,
+            activity_type=ActivityType.COURSE_REGISTRATION,
+            description=f"Enrolled in course from waitlist: {course.course_code} - {course.course_name}",
+            timestamp=now
+        ))
+        db.add(Notification(
+            student_id=entry.student_id,
+            title=f"You're enrolled in {course.course_code}",
+            message=f"A seat opened up in {course.course_code} - {course.course_name} and you have been enrolled from the waitlist.",
+            notification_type="academic",
+            priority="high",
+            is_read=False,
+            sent_at=now,
+            created_at=now
+        ))
+        db.delete(entry)
+        db.flush()
+        promoted.append(entry.student_id)
+    return promoted
+
+@admission_controlled
+def join_waitlist(student_id: str, course_code: str) -> Dict[str, Any]:
+    """Add a student to the end of a full course's waitlist"""
+    db: Session = next(get_db())
+    try:
+        student = db.query(Student).filter(Student.student_id == student_id).first()
+        if not student:
+            return {"status": "error", "message": "Student not found"}
+
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        if not course.is_active:
+            return {"status": "error", "message": "Course is not active"}
+
+        registration = db.query(Registration).filter(
+            Registration.student_id == student_id,
+            Registration.course_id == course.id,
+            Registration.status.in_([RegistrationStatus.ACTIVE, RegistrationStatus.COMPLETED])
+        ).first()
+        if registration:
+            return {"status": "error", "message": f"Student registration status is {registration.status.value}, cannot join the waitlist"}
+
+        if course.current_enrollment < course.max_capacity and not waitlist_length(db, course.id):
+            return {"status": "error", "message": "Course has available seats, enroll directly instead"}
+
+        # Promotion is automatic, so only queue students who could actually take the seat
+        prerequisites = find_missing_prerequisites(db, student_id, course.course_code)
+        if prerequisites["missing"]:
+            return {"status": "error", "message": f"Missing prerequisites: {', '.join(prerequisites['missing'])}"}
+        conflicts = find_schedule_conflicts(db, student_id, course)
+        if conflicts:
+            clashing = sorted({conflict["course_code"] for conflict in conflicts})
+            return {"status": "error", "message": f"Schedule conflict with {', '.join(clashing)}", "conflicts": conflicts}
+
+        entry = WaitlistEntry(
+            course_id=course.id,
+            student_id=student_id,
+            joined_at=datetime.datetime.now(ZoneInfo("UTC"))
+        )
+        db.add(entry)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return {"status": "error", "message": "Student is already on the waitlist for this course"}
+
+        position = db.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.course_id == course.id,
+            WaitlistEntry.id <= entry.id
+        ).scalar()
+
+        return {
+            "status": "success",
+            "message": f"Added to the waitlist for {course_code} at position {position}",
+            "course_code": course_code,
+            "position": position
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+@admission_controlled
+def leave_waitlist(student_id: str, course_code: str) -> Dict[str, Any]:
+    """Remove a student from a course waitlist"""
+    db: Session = next(get_db())
+    try:
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        result = db.execute(
+            delete(WaitlistEntry).where(
+                WaitlistEntry.course_id == course.id,
+                WaitlistEntry.student_id == student_id
+            )
+        )
+        db.commit()
+        if not result.rowcount:
+            return {"status": "error", "message": "Student is not on the waitlist for this course"}
+
+        return {"status": "success", "message": f"Student {student_id} removed from the {course_code} waitlist"}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
+
+def get_waitlist_position(student_id: str, course_code: str) -> Dict[str, Any]:
+    """Get a student's position on a course waitlist"""
+    db: Session = next(get_db())
+    try:
+        course = db.query(Course).filter(Course.course_code == course_code).first()
+        if not course:
+            return {"status": "error", "message": "Course not found"}
+
+        entry = db.query(WaitlistEntry).filter(
+            WaitlistEntry.course_id == course.id,
+            WaitlistEntry.student_id == student_id
+        ).first()
+        if not entry:
+            return {"status": "error", "message": "Student is not on the waitlist for this course"}
+
+        # Entry ids grow in join order, so the position is the number of entries up to this one
+        position = db.query(func.count(WaitlistEntry.id)).filter(
+            WaitlistEntry.course_id == course.id,
+            WaitlistEntry.id <= entry.id
+        ).scalar()
+
+        return {
+            "status": "success",
+            "student_id": student_id,
+            "course_code": course_code,
+            "position": position,
+            "waitlist_length": waitlist_length(db, course.id),
+            "joined_at": entry.joined_at.isoformat() if entry.joined_at else None
+        }
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+    finally:
+        db.close()
@@ -0,0 +1,214 @@
+# admission.py
+from dotenv import load_dotenv
+from typing import Any, Awaitable, Callable, Dict, Optional
+from collections import OrderedDict
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import threading
+import time
+import weakref
+
+from ai_university_campus_admin_agent.config.database import DATABASE_URL, DATABASE_POOL_SIZE
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Write tools that may run at once in this process (each process has its own limit). SQLite has a single writer, so more only turns
+# into "database is locked"; on other databases the limit is the primary pool size
+WRITE_CONCURRENCY = int(os.getenv("WRITE_CONCURRENCY", "1" if DATABASE_URL.startswith("sqlite") else str(DATABASE_POOL_SIZE)))
+# Calls waiting for a slot; past this a call is turned away at once instead of queueing
+WRITE_QUEUE_SIZE = int(os.getenv("WRITE_QUEUE_SIZE", str(WRITE_CONCURRENCY * 8)))
+# Longest a call waits for a slot before it is turned away
+WRITE_QUEUE_TIMEOUT_MS = float(os.getenv("WRITE_QUEUE_TIMEOUT_MS", "2000"))
+# Per-student token bucket: WRITE_RATE_BURST writes at once, refilled at WRITE_RATE_PER_MINUTE
+WRITE_RATE_BURST = float(os.getenv("WRITE_RATE_BURST", "5"))
+WRITE_RATE_PER_MINUTE = float(os.getenv("WRITE_RATE_PER_MINUTE", "20"))
+# Students whose buckets are remembered; the least recently seen are forgotten (a full bucket again)
+WRITE_RATE_MAX_STUDENTS = 10000
+
+class Rejected(Exception):
+    """A write turned away before it reached the database"""
+
+    def __init__(self, code: str, message: str, retry_after: float):
+        super().__init__(message)
+        self.code = code
+        self.retry_after = retry_after
+
+    def response(self) -> Dict[str, Any]:
+        return {
+            "status": "error",
+            "error_code": self.code,
+            "retryable": True,
+            "retry_after_seconds": round(self.retry_after, 1),
+            "message": f"{self} Nothing was changed. Wait {self.retry_after:.1f} seconds before trying again."
+        }
+
+class _LoopSlots:
+    """The semaphore and queue counts of one event loop"""
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+
+class AdmissionController:
+    """At most `limit` calls at once; up to `queue_size` more wait, in arrival order, until their deadline.
+
+    Waiting happens on the event loop. An asyncio.Semaphore only works on the loop it first waited
+    on, so each running loop (the ADK server has one; tests and notebooks may start several) gets
+    its own, created on its first acquire. The limits hold within this process only; each worker
+    process has its own.
+    """
+
+    def __init__(self, limit: int = WRITE_CONCURRENCY, queue_size: int = WRITE_QUEUE_SIZE,
+                 timeout_ms: float = WRITE_QUEUE_TIMEOUT_MS):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.timeout = timeout_ms / 1000
+        self._lock = threading.Lock()
+        # Dropped with their loop, so a finished asyncio.run leaves nothing behind
+        self._loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopSlots]" = weakref.WeakKeyDictionary()
+        # Moving average of how long an admitted call holds its slot, for the retry hint
+        self._service_seconds = 0.05
+        self.admitted = 0
+        self.queue_full = 0
+        self.timed_out = 0
+        self.wait_seconds = 0.0
+
+    def _slots(self) -> _LoopSlots:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._loops.get(loop)
+            if slots is None:
+                slots = self._loops[loop] = _LoopSlots(self.limit)
+            return slots
+
+    def _retry_after(self, slots: _LoopSlots) -> float:
+        # Time for everyone ahead to get through
+        return max(0.2, self._service_seconds * (slots.waiting + slots.active) / self.limit)
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the seconds waited, or raise Rejected"""
+        slots = self._slots()
+        if slots.semaphore.locked() and slots.waiting >= self.queue_size:
+            with self._lock:
+                self.queue_full += 1
+            raise Rejected("overloaded", "The system is handling too many changes right now.", self._retry_after(slots))
+        started = time.monotonic()
+        slots.waiting += 1
+        try:
+            await asyncio.wait_for(slots.semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timed_out += 1
+            raise Rejected("overloaded", "The system is handling too many changes right now.", self._retry_after(slots))
+        finally:
+            slots.waiting -= 1
+        slots.active += 1
+        waited = time.monotonic() - started
+        with self._lock:
+            self.admitted += 1
+            self.wait_seconds += waited
+        return waited
+
+    def release(self, held_seconds: float) -> None:
+        """Give back a slot; called on the loop that acquired it"""
+        slots = self._slots()
+        slots.active -= 1
+        slots.semaphore.release()
+        with self._lock:
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * held_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            loops = list(self._loops.values())
+            return {
+                "limit": self.limit,
+                "loops": len(loops),
+                "active": sum(slots.active for slots in loops),
+                "waiting": sum(slots.waiting for slots in loops),
+                "admitted": self.admitted,
+                "rejected_queue_full": self.queue_full,
+                "rejected_timeout": self.timed_out,
+                "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+                "avg_service_ms": round(self._service_seconds * 1000, 2)
+            }
+
+class StudentRateLimiter:
+    """Token bucket per student, so one student's retries cannot crowd out everyone else's writes"""
+
+    def __init__(self, burst: float = WRITE_RATE_BURST, per_minute: float = WRITE_RATE_PER_MINUTE,
+                 max_students: int = WRITE_RATE_MAX_STUDENTS):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.max_students = max_students
+        self._lock = threading.Lock()
+        # student_id -> (tokens, last refill)
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self.limited = 0
+
+    def take(self, student_id: str) -> None:
+        """Spend one token for the student, or raise Rejected with the time until the next one"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(student_id, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[student_id] = (tokens, now)
+                self.limited += 1
+                raise Rejected("rate_limited", f"Too many changes for student {student_id} in a short time.", (1 - tokens) / self.rate)
+            self._buckets[student_id] = (tokens - 1, now)
+            while len(self._buckets) > self.max_students:
+                self._buckets.popitem(last=False)
+
+    def refund(self, student_id: str) -> None:
+        """Give back the token of a write that was turned away for another reason"""
+        with self._lock:
+            if student_id in self._buckets:
+                tokens, updated = self._buckets[student_id]
+                self._buckets[student_id] = (min(self.burst, tokens + 1), updated)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+write_admission = AdmissionController()
+student_rate_limiter = StudentRateLimiter()
+
+def admission_controlled(func: Callable[..., Dict[str, Any]]) -> Callable[..., Awaitable[Dict[str, Any]]]:
+    """Turn a write tool into an async tool run under the student's rate limit and the write concurrency limit.
+
+    ADK runs sync tools inline on its event loop, so a blocking database write would stall every other
+    session. The wrapper waits for a slot on the loop and runs the tool in a worker thread instead.
+    Rejected calls return a structured error with `error_code` ("rate_limited" or "overloaded") and
+    `retry_after_seconds`, without touching the database. Both limits are per process. `inspect.unwrap`
+    returns the undecorated sync tool.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Dict[str, Any]:
+        student_id: Optional[str] = signature.bind_partial(*args, **kwargs).arguments.get("student_id")
+        try:
+            if student_id:
+                student_rate_limiter.take(student_id)
+            try:
+                await write_admission.acquire()
+            except Rejected:
+                if student_id:
+                    student_rate_limiter.refund(student_id)
+                raise
+        except Rejected as rejected:
+            logger.info("%s rejected (%s) for %s; retry after %.1fs", func.__name__, rejected.code, student_id, rejected.retry_after)
+            return rejected.response()
+        started = time.monotonic()
+        write = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        # The slot is held until the write itself finishes, even if the caller stops waiting for it
+        write.add_done_callback(lambda _: write_admission.release(time.monotonic() - started))
+        return await asyncio.shield(write)
+
+    return wrapper
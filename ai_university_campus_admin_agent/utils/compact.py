@@ -0,0 +1,69 @@
+# compact.py
+from typing import List, Dict, Any, Iterable, Optional
+
+# Tools that return long lists accept format="compact" to get a table instead of a list of dicts
+RESULT_FORMATS = ("full", "compact")
+
+def check_format(format: str) -> Optional[str]:
+    """An error message for an unknown result format, or None"""
+    if format not in RESULT_FORMATS:
+        return f"format must be one of: {', '.join(RESULT_FORMATS)}"
+    return None
+
+def _abbreviations(values: Iterable[str]) -> Dict[str, str]:
+    """Short, unique codes for enum values: initials of each word, lengthened until unique"""
+    codes: Dict[str, str] = {}
+    for value in sorted(set(values)):
+        words = [word for word in str(value).replace("-", "_").split("_") if word] or [str(value)]
+        length = 1
+        code = "".join(word[:length] for word in words).lower()
+        while code in codes.values() and length < len(str(value)):
+            length += 1
+            code = "".join(word[:length] for word in words).lower()
+        codes[value] = code if code not in codes.values() else str(value)
+    return codes
+
+def compact_rows(rows: List[Dict[str, Any]], abbreviate: Iterable[str] = ()) -> Dict[str, Any]:
+    """Encode a list of uniform dicts as one header plus row arrays.
+
+    Keys are written once instead of on every row; columns that are null on every row are
+    dropped; columns with the same value on every row move to "same"; values of the columns
+    named in abbreviate are replaced by short codes explained in "legend".
+    """
+    if not rows:
+        return {"columns": [], "rows": []}
+
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(key for key in row if key not in columns)
+
+    same: Dict[str, Any] = {}
+    kept: List[str] = []
+    for column in columns:
+        values = [row.get(column) for row in rows]
+        if all(value is None for value in values):
+            continue
+        if len(rows) > 1 and all(value == values[0] for value in values):
+            same[column] = values[0]
+            continue
+        kept.append(column)
+
+    legend: Dict[str, Dict[str, str]] = {}
+    codes: Dict[str, Dict[str, str]] = {}
+    for column in abbreviate:
+        if column in kept:
+            codes[column] = _abbreviations(row[column] for row in rows if row.get(column) is not None)
+            legend[column] = {code: value for value, code in codes[column].items()}
+
+    table: Dict[str, Any] = {
+        "columns": kept,
+        "rows": [
+            [codes[column].get(row.get(column), row.get(column)) if column in codes else row.get(column) for column in kept]
+            for row in rows
+        ]
+    }
+    if same:
+        table["same"] = same
+    if legend:
+        table["legend"] = legend
+    return table
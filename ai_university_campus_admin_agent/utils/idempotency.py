@@ -0,0 +1,331 @@
+# idempotency.py
+from dotenv import load_dotenv
+from typing import Any, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+from sqlalchemy import delete, func, select, update
+import asyncio
+import datetime
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import threading
+from zoneinfo import ZoneInfo
+
+from ai_university_campus_admin_agent.config.database import SessionLocal, IdempotencyKey, dialect_insert
+from ai_university_campus_admin_agent.utils.admission import Rejected
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How long a completed call's result is replayed for its key
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+# A call still marked in progress after this long is assumed to have died; its key then reports an unknown outcome
+IDEMPOTENCY_PENDING_SECONDS = float(os.getenv("IDEMPOTENCY_PENDING_SECONDS", "60"))
+# Completed results also held in process memory, so a retry storm needs no query at all
+IDEMPOTENCY_MEMORY_ENTRIES = int(os.getenv("IDEMPOTENCY_MEMORY_ENTRIES", "1024"))
+
+# Delete expired keys every this many completed calls instead of on each one
+_PURGE_EVERY = 100
+
+IDEMPOTENCY_KEY_DOC = """
+
+idempotency_key: optional unique string for this change (e.g. a UUID). Send the same key again when
+retrying after a timeout or an unclear result: if the first call went through, its result is returned
+with idempotent_replay=true and nothing is changed twice."""
+
+# A key whose call may or may not have made its change; running it again could make the change twice
+OUTCOME_UNKNOWN = {
+    "status": "error",
+    "error_code": "outcome_unknown",
+    "retryable": False,
+    "message": "An earlier call with this idempotency key did not report its result, so its change may or may not "
+               "have been made. Nothing was changed now. Check the current records (e.g. the student's registrations "
+               "or payments) and use a new key if the change is still needed."
+}
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+def _utc(value: datetime.datetime) -> datetime.datetime:
+    return value if value.tzinfo else value.replace(tzinfo=ZoneInfo("UTC"))
+
+class IdempotencyStore:
+    """Results of completed write calls by (tool, key): an in-memory LRU over the idempotency_keys table"""
+
+    def __init__(self, memory_entries: int = IDEMPOTENCY_MEMORY_ENTRIES):
+        self.memory_entries = memory_entries
+        self._lock = threading.Lock()
+        # (tool_name, key_hash) -> (request_hash, response JSON, expires_at)
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[str, str, datetime.datetime]]" = OrderedDict()
+        self._completed_since_purge = 0
+        self.memory_replays = 0
+        self.store_replays = 0
+        self.in_progress = 0
+        self.outcome_unknown = 0
+        self.key_reused = 0
+        self.completed = 0
+
+    def _remember(self, key: Tuple[str, str], entry: Tuple[str, str, datetime.datetime]) -> None:
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _answer(self, request_hash: str, stored_hash: str, response: str) -> Dict[str, Any]:
+        if stored_hash != request_hash:
+            with self._lock:
+                self.key_reused += 1
+            return {
+                "status": "error",
+                "error_code": "idempotency_key_reused",
+                "retryable": False,
+                "message": "This idempotency key was already used for a different request. Nothing was changed. "
+                           "Use a new key for a new change."
+            }
+        return {**json.loads(response), "idempotent_replay": True}
+
+    def begin(self, tool_name: str, key_hash: str, request_hash: str) -> Optional[Dict[str, Any]]:
+        """Claim the key for a new call and return None, or return what the caller should get instead:
+        the stored result, or an error if the key belongs to another request, the first call is still running
+        or its outcome is unknown
+        """
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        key = (tool_name, key_hash)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[2] <= now:
+                del self._memory[key]
+                entry = None
+            if entry:
+                self._memory.move_to_end(key)
+                if entry[0] == request_hash:
+                    self.memory_replays += 1
+        if entry:
+            return self._answer(request_hash, entry[0], entry[1])
+
+        with SessionLocal() as db:
+            # Read first, so replays from other processes need no write. A second pass reads what a
+            # concurrent call claimed, or claims a key whose old row just expired
+            for _ in range(2):
+                row = db.execute(
+                    select(IdempotencyKey.id, IdempotencyKey.request_hash, IdempotencyKey.state, IdempotencyKey.response,
+                           IdempotencyKey.created_at, IdempotencyKey.expires_at)
+                    .where(IdempotencyKey.tool_name == tool_name, IdempotencyKey.key_hash == key_hash)
+                ).first()
+                if row is None:
+                    claimed = db.execute(dialect_insert(IdempotencyKey).values(
+                        tool_name=tool_name, key_hash=key_hash, request_hash=request_hash, state="pending",
+                        created_at=now, expires_at=now + datetime.timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+                    ).on_conflict_do_nothing(index_elements=["tool_name", "key_hash"])).rowcount
+                    db.commit()
+                    if claimed:
+                        return None
+                    continue
+                if _utc(row.expires_at) <= now:
+                    db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row.id))
+                    db.commit()
+                    continue
+                if row.state == "completed":
+                    if row.request_hash == request_hash:
+                        with self._lock:
+                            self.store_replays += 1
+                        self._remember(key, (row.request_hash, row.response, _utc(row.expires_at)))
+                    return self._answer(request_hash, row.request_hash, row.response)
+                if row.request_hash != request_hash:
+                    return self._answer(request_hash, row.request_hash, "")
+                if row.state == "unknown" or now - _utc(row.created_at) > datetime.timedelta(seconds=IDEMPOTENCY_PENDING_SECONDS):
+                    # The first call may have committed its change without recording the result; never run it again
+                    with self._lock:
+                        self.outcome_unknown += 1
+                    return dict(OUTCOME_UNKNOWN)
+                break
+        with self._lock:
+            self.in_progress += 1
+        return Rejected("in_progress", "The same request is still being processed.", 1.0).response()
+
+    def complete(self, tool_name: str, key_hash: str, request_hash: str, result: Dict[str, Any]) -> None:
+        """Store the result of a claimed call for replay until the key expires"""
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        expires_at = now + datetime.timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+        response = json.dumps(result, default=str)
+        with SessionLocal() as db:
+            db.execute(update(IdempotencyKey).where(
+                IdempotencyKey.tool_name == tool_name, IdempotencyKey.key_hash == key_hash
+            ).values(state="completed", response=response, expires_at=expires_at))
+            db.commit()
+        self._remember((tool_name, key_hash), (request_hash, response, expires_at))
+        with self._lock:
+            self.completed += 1
+            self._completed_since_purge += 1
+            purge = self._completed_since_purge >= _PURGE_EVERY
+            if purge:
+                self._completed_since_purge = 0
+        if purge:
+            self.purge()
+
+    def abandon(self, tool_name: str, key_hash: str) -> None:
+        """Mark a claimed call whose outcome is not known, so retries with its key are refused instead of run"""
+        with SessionLocal() as db:
+            db.execute(update(IdempotencyKey).where(
+                IdempotencyKey.tool_name == tool_name, IdempotencyKey.key_hash == key_hash,
+                IdempotencyKey.state == "pending"
+            ).values(state="unknown"))
+            db.commit()
+
+    def release(self, tool_name: str, key_hash: str) -> None:
+        """Free the key of a claimed call that changed nothing, so a retry runs it again"""
+        with SessionLocal() as db:
+            db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.tool_name == tool_name, IdempotencyKey.key_hash == key_hash,
+                IdempotencyKey.state == "pending"
+            ))
+            db.commit()
+
+    def purge(self) -> Dict[str, Any]:
+        """Delete expired keys"""
+        now = datetime.datetime.now(ZoneInfo("UTC"))
+        with SessionLocal() as db:
+            expired = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= now)).rowcount
+            db.commit()
+        with self._lock:
+            for key in [key for key, entry in self._memory.items() if entry[2] <= now]:
+                del self._memory[key]
+        return {"expired": expired}
+
+    def clear(self) -> None:
+        with SessionLocal() as db:
+            db.execute(delete(IdempotencyKey))
+            db.commit()
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Replays and conflicts in this process, and the size of the shared table"""
+        with SessionLocal() as db:
+            states = dict(db.execute(
+                select(IdempotencyKey.state, func.count(IdempotencyKey.id)).group_by(IdempotencyKey.state)
+            ).all())
+        with self._lock:
+            return {
+                "completed": self.completed,
+                "replays": self.memory_replays + self.store_replays,
+                "memory_replays": self.memory_replays,
+                "store_replays": self.store_replays,
+                "in_progress": self.in_progress,
+                "outcome_unknown": self.outcome_unknown,
+                "key_reused": self.key_reused,
+                "memory_entries": len(self._memory),
+                "table_entries": sum(states.values()),
+                "table_pending": states.get("pending", 0),
+                "table_unknown": states.get("unknown", 0)
+            }
+
+idempotency_store = IdempotencyStore()
+
+def _settle(tool_name: str, key_hash: str, request_hash: str, result: Optional[Dict[str, Any]]) -> None:
+    """Record how a claimed call ended; `result` is None when the tool raised"""
+    try:
+        if result is None:
+            idempotency_store.abandon(tool_name, key_hash)
+        elif result.get("status") == "success":
+            idempotency_store.complete(tool_name, key_hash, request_hash, result)
+        else:
+            idempotency_store.release(tool_name, key_hash)
+        return
+    except Exception:
+        logger.exception("%s: could not store the result for its idempotency key", tool_name)
+    # The change may be committed while its result is not, so the key must not be freed or run again
+    try:
+        idempotency_store.abandon(tool_name, key_hash)
+    except Exception:
+        # Still pending; retries get outcome_unknown once IDEMPOTENCY_PENDING_SECONDS have passed
+        logger.exception("%s: could not mark its idempotency key as unknown", tool_name)
+
+def idempotent(tool: Callable[..., Any]) -> Callable[..., Any]:
+    """Give a write tool an optional keyword-only `idempotency_key`.
+
+    The first call with a key runs the tool; a successful result is stored, and calls repeating the key
+    with the same arguments get it back (marked `idempotent_replay`) without running the tool again.
+    Failed calls changed nothing, so their key is freed for the retry. A call that raised, or whose result
+    could not be stored, leaves the key marked unknown: retries get `outcome_unknown` instead of running
+    the change again. Calls without a key run as before. Async tools get an async wrapper that keeps the
+    key bookkeeping off the event loop and records the result even if the caller stops waiting.
+    """
+    signature = inspect.signature(tool)
+    tool_name = tool.__name__
+
+    def hashes(args, kwargs, idempotency_key: str) -> Tuple[str, str]:
+        arguments = signature.bind_partial(*args, **kwargs)
+        arguments.apply_defaults()
+        return _hash(idempotency_key), _hash(json.dumps(arguments.arguments, sort_keys=True, default=str))
+
+    if inspect.iscoroutinefunction(tool):
+        @functools.wraps(tool)
+        async def wrapper(*args, idempotency_key: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+            if not idempotency_key:
+                return await tool(*args, **kwargs)
+            key_hash, request_hash = hashes(args, kwargs, idempotency_key)
+            try:
+                answer = await asyncio.to_thread(idempotency_store.begin, tool_name, key_hash, request_hash)
+            except Exception as e:
+                # Running without the key could repeat a change that already went through
+                return {"status": "error", "message": str(e)}
+            if answer is not None:
+                return answer
+
+            async def run() -> Dict[str, Any]:
+                result: Optional[Dict[str, Any]] = None
+                try:
+                    result = await tool(*args, **kwargs)
+                    return result
+                finally:
+                    await asyncio.to_thread(_settle, tool_name, key_hash, request_hash, result)
+
+            # The write goes on in its worker thread if the caller is cancelled; its result must still be recorded
+            return await asyncio.shield(asyncio.ensure_future(run()))
+    else:
+        @functools.wraps(tool)
+        def wrapper(*args, idempotency_key: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+            if not idempotency_key:
+                return tool(*args, **kwargs)
+            key_hash, request_hash = hashes(args, kwargs, idempotency_key)
+            try:
+                answer = idempotency_store.begin(tool_name, key_hash, request_hash)
+            except Exception as e:
+                # Running without the key could repeat a change that already went through
+                return {"status": "error", "message": str(e)}
+            if answer is not None:
+                return answer
+
+            result: Optional[Dict[str, Any]] = None
+            try:
+                result = tool(*args, **kwargs)
+                return result
+            finally:
+                _settle(tool_name, key_hash, request_hash, result)
+
+    wrapper.__signature__ = signature.replace(parameters=[
+        *signature.parameters.values(),
+        inspect.Parameter("idempotency_key", inspect.Parameter.KEYWORD_ONLY, default=None, annotation=Optional[str])
+    ])
+    wrapper.__doc__ = (tool.__doc__ or "") + IDEMPOTENCY_KEY_DOC
+    return wrapper
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect and maintain the write tool idempotency keys")
+    parser.add_argument("action", choices=["stats", "purge", "clear"])
+    args = parser.parse_args()
+    if args.action == "stats":
+        print(json.dumps(idempotency_store.stats(), indent=2))
+    elif args.action == "purge":
+        print(json.dumps(idempotency_store.purge(), indent=2))
+    else:
+        idempotency_store.clear()
+        print(json.dumps({"status": "success", "message": "Idempotency keys cleared"}))
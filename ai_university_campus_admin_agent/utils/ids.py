@@ -0,0 +1,64 @@
+# ids.py
+import os
+import secrets
+import threading
+import time
+
+# Crockford base32 alphabet used by ULIDs (no I, L, O, U)
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+
+def _encode(value: int) -> str:
+    """Encode a 128-bit integer as a 26-character Crockford base32 string"""
+    chars = []
+    for _ in range(26):
+        chars.append(_CROCKFORD[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+class MonotonicULID:
+    """Thread-safe ULID generator: 48-bit millisecond timestamp + 80 random bits.
+
+    IDs sort by creation time. Within the same millisecond the random part is
+    incremented instead of redrawn, so IDs from one process are strictly
+    increasing. Child processes reseed after fork, so workers never continue
+    the parent's sequence.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def reseed(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def new(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+            else:
+                # Same millisecond (or clock moved backwards): keep the last timestamp and count up
+                self._last_random += 1
+                if self._last_random >= 1 << _RANDOM_BITS:
+                    self._last_ms += 1
+                    self._last_random = secrets.randbits(_RANDOM_BITS)
+            value = (self._last_ms << _RANDOM_BITS) | self._last_random
+        return _encode(value)
+
+_generator = MonotonicULID()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_generator.reseed)
+
+def new_ulid() -> str:
+    """Return a new time-sortable, collision-free ULID string"""
+    return _generator.new()
+
+def new_transaction_id() -> str:
+    """Return a new payment transaction ID, e.g. TXN01J9Z3K5W8Q6V4N2M1B7C0D9EF"""
+    return f"TXN{new_ulid()}"
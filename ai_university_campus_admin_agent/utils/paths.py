@@ -0,0 +1,23 @@
+# paths.py
+from dotenv import load_dotenv
+from pathlib import Path
+import os
+
+load_dotenv()
+
+_DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+# Files that tools may read (bank settlement files, grade rosters); tool paths resolve inside it
+IMPORT_DIR = Path(os.getenv("IMPORT_DIR", str(_DATA_DIR / "imports"))).resolve()
+# Where tools write reports; tool paths resolve inside it
+REPORT_DIR = Path(os.getenv("REPORT_DIR", str(_DATA_DIR / "reports"))).resolve()
+
+def confined_path(base: Path, path: str) -> Path:
+    """Resolve a path given to a tool inside base, relative paths from base itself.
+
+    Raises ValueError for paths that resolve outside base, through `..` or symlinks.
+    """
+    resolved = (base / path).resolve()
+    if not resolved.is_relative_to(base):
+        raise ValueError(f"Path must be inside {base}: {path}")
+    return resolved
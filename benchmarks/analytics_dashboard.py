@@ -0,0 +1,99 @@
+"""Analytics dashboard: five reports one after another against one parallel call.
+
+Seeds students, registrations, payments and activity logs, then times the
+five analyst reports called sequentially (what the agent did with one tool
+round trip each), the dashboard computing every section concurrently, and
+the dashboard served from its section cache.
+
+Sections overlap only where the work is off the Python thread: on SQLite
+that needs spare cores; against a database server it is mostly waiting on
+the network. --query-latency-ms adds a fixed delay before every read query
+to stand in for that round trip.
+
+    python -m benchmarks.analytics_dashboard [--students 50000] [--rows 400000] [--repeat 5] [--query-latency-ms 0]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import os
+import random
+import statistics
+import time
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, event
+
+from ai_university_campus_admin_agent.config.database import (
+    SessionLocal, read_engine, Registration, Payment, ActivityLog, RegistrationStatus, PaymentStatus, ActivityType
+)
+from ai_university_campus_admin_agent.tools.dashboard_tools import DASHBOARD_SECTIONS, get_analytics_dashboard
+
+def seed(students: int, rows: int):
+    common.reset_database()
+    common.seed(students=students, courses=200, max_capacity=10 ** 6)
+    rng = random.Random(43)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    statuses = list(RegistrationStatus)
+    activity_types = list(ActivityType)
+    with SessionLocal() as db:
+        for start in range(0, rows, 100000):
+            count = min(100000, rows - start)
+            db.execute(insert(Registration), [
+                {"student_id": f"S{rng.randrange(students):07d}", "course_id": rng.randrange(1, 201),
+                 "status": rng.choice(statuses), "registration_date": now - datetime.timedelta(days=rng.randrange(365)),
+                 "grade": rng.choice([None, "A", "B", "C"])}
+                for _ in range(count)
+            ])
+            db.execute(insert(Payment), [
+                {"student_id": f"S{rng.randrange(students):07d}", "fee_structure_id": rng.randrange(1, 201),
+                 "amount_paid": round(rng.uniform(50, 1000), 2), "payment_method": rng.choice(["card", "bank_transfer"]),
+                 "payment_date": now - datetime.timedelta(days=rng.randrange(365)), "transaction_id": f"BENCH{start + index}",
+                 "status": PaymentStatus.PAID}
+                for index in range(count)
+            ])
+            db.execute(insert(ActivityLog), [
+                {"student_id": f"S{rng.randrange(students):07d}", "activity_type": rng.choice(activity_types),
+                 "description": "benchmark", "timestamp": now - datetime.timedelta(minutes=rng.randrange(60 * 24 * 60))}
+                for _ in range(count)
+            ])
+        db.commit()
+
+def median_ms(function, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with common.Timer() as timer:
+            function()
+        timings.append(timer.elapsed * 1000)
+    return statistics.median(timings)
+
+def main(students: int, rows: int, repeat: int, query_latency_ms: float):
+    with common.Timer() as timer:
+        seed(students, rows)
+    print(f"Seeded {students} students and {rows} registrations, payments and activity logs in {timer.elapsed:.1f}s")
+    if query_latency_ms:
+        event.listen(read_engine, "before_cursor_execute", lambda *args: time.sleep(query_latency_ms / 1000))
+    print(f"{len(os.sched_getaffinity(0))} CPUs, {query_latency_ms:g} ms added per read query")
+
+    def sequential():
+        for function, _ in DASHBOARD_SECTIONS.values():
+            assert function()["status"] == "success"
+
+    section_ms = {name: median_ms(function, repeat) for name, (function, _) in DASHBOARD_SECTIONS.items()}
+    for name, elapsed in section_ms.items():
+        print(f"  {name:<24} {elapsed:8.1f} ms")
+    print(f"  sequential reports       {median_ms(sequential, repeat):8.1f} ms p50")
+
+    result = get_analytics_dashboard(max_age_seconds=0)
+    assert result["status"] == "success" and not result["errors"], result
+    print(f"  dashboard, parallel      {median_ms(lambda: get_analytics_dashboard(max_age_seconds=0), repeat):8.1f} ms p50")
+    print(f"  dashboard, cached        {median_ms(get_analytics_dashboard, repeat):8.2f} ms p50")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50000)
+    parser.add_argument("--rows", type=int, default=400000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--query-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+    main(args.students, args.rows, args.repeat, args.query_latency_ms)
@@ -0,0 +1,115 @@
+"""Campus information answer cache: model calls and latency for repeat questions.
+
+Sends a stream of campus questions through the orchestrator and the campus
+information agent, both on a stub model that sleeps --llm-latency-ms per
+call. The questions are a dozen topics, each asked several ways, drawn
+with a Zipf-like skew. Reports model calls, hit rate and latency for
+misses and hits. Then it checks that personal questions answered by the
+agent are not stored. Last, it edits the campus information file and shows
+that the next questions miss again.
+
+    python -m benchmarks.answer_cache [--questions 2000] [--llm-latency-ms 300]
+"""
+import os
+import shutil
+import tempfile
+
+# Work on a copy of the campus information so the benchmark can edit it. This has to be set
+# before benchmarks.common, whose import loads the agents.
+_campus_copy = os.path.join(tempfile.mkdtemp(prefix="campus_bench_info_"), "university_information.json")
+shutil.copy(os.path.join(os.path.dirname(__file__), "..", "ai_university_campus_admin_agent", "data", "university_information.json"), _campus_copy)
+os.environ["CAMPUS_INFORMATION_PATH"] = _campus_copy
+
+from benchmarks import common
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ai_university_campus_admin_agent.agent import root_agent
+from ai_university_campus_admin_agent.agents import uni_information_agent
+from ai_university_campus_admin_agent.config.answer_cache import answer_cache
+from ai_university_campus_admin_agent.config.models import StubLlm, ModelStats
+from benchmarks.parallel_fanout import call
+
+TOPICS = [
+    ["Library hours?", "what are the library hours", "When is the library open?"],
+    ["Registrar email?", "registrar email please", "What is the registrar's email address?"],
+    ["Where is the gym?", "gym location", "Where is the gym"],
+    ["How do I get a parking permit?", "parking permit", "how do i get a parking permit"],
+    ["Is there a campus shuttle?", "campus shuttle schedule", "Is there a campus shuttle"],
+    ["Computer Science department contact", "computer science department contact", "CS department phone number?"],
+    ["Health center hours", "health center hours?", "When is the health center open?"],
+    ["What is the withdrawal policy?", "withdrawal policy", "Withdrawal policy?"],
+    ["Dining hall menu", "dining hall menu?", "Where can I eat on campus?"],
+    ["Financial aid office", "financial aid office location", "Financial aid office?"],
+    ["Housing application deadline", "housing application deadline?", "When is the housing deadline?"],
+    ["IT help desk", "it help desk contact", "How do I reach the IT help desk?"],
+]
+
+# Questions about the asker or a particular student or course; the answer differs per student
+PERSONAL_QUESTIONS = ["What do I owe?", "Enroll me in CS101", "Is S0000001 registered for Computer Science?", "my library fines"]
+
+def build_tree(latency: float, calls: ModelStats):
+    info = uni_information_agent.clone(update={"model": StubLlm(
+        model="stub", latency=latency, stats=calls, script={"": [types.Part.from_text(text="Here is the campus information you asked for.")]}
+    )})
+    root = StubLlm(model="stub", latency=latency, stats=calls, script={"": [call("transfer_to_agent", agent_name=info.name)]})
+    return root_agent.clone(update={"model": root, "sub_agents": [info], "tools": []})
+
+async def ask(runner: InMemoryRunner, question: str) -> float:
+    # A new session per question, as for separate students asking
+    session = await runner.session_service.create_session(app_name="answer_cache_bench", user_id="bench")
+    with common.Timer() as timer:
+        async for _ in runner.run_async(user_id="bench", session_id=session.id,
+                                        new_message=types.Content(role="user", parts=[types.Part.from_text(text=question)])):
+            pass
+    return timer.elapsed * 1000
+
+async def main(questions: int, latency_ms: float):
+    common.reset_database()
+    calls = ModelStats()
+    runner = InMemoryRunner(agent=build_tree(latency_ms / 1000, calls), app_name="answer_cache_bench")
+    rng = random.Random(46)
+    weights = [1 / (rank + 1) for rank in range(len(TOPICS))]
+
+    hit_ms, miss_ms = [], []
+    for _ in range(questions):
+        question = rng.choice(rng.choices(TOPICS, weights=weights)[0])
+        before = calls.count
+        elapsed = await ask(runner, question)
+        # Routing always takes one orchestrator call; a hit skips the information agent's
+        (miss_ms if calls.count - before > 1 else hit_ms).append(elapsed)
+    stats = answer_cache.stats()
+    print(f"{questions} questions, stub model {latency_ms:g} ms per call")
+    print(f"  model calls        {calls.count:6d}  (without the cache: {questions * 2})")
+    print(f"  hit rate           {stats['hit_rate']:6.1%}  ({stats['memory_hits']} from memory, {stats['store_hits']} from the table)")
+    print(f"  miss latency       {statistics.median(miss_ms):8.1f} ms p50")
+    print(f"  hit latency        {statistics.median(hit_ms):8.2f} ms p50")
+    print(f"  not cacheable      {stats['uncacheable_questions']:6d}  (topics the campus file does not cover, or about the asker)")
+
+    stored = answer_cache.stats()["table_entries"]
+    for question in PERSONAL_QUESTIONS:
+        await ask(runner, question)
+    print(f"  personal questions stored: {answer_cache.stats()['table_entries'] - stored} of {len(PERSONAL_QUESTIONS)}")
+
+    with open(_campus_copy) as file:
+        data = json.load(file)
+    data["_benchmark_edit"] = "library hours changed"
+    with open(_campus_copy, "w") as file:
+        json.dump(data, file)
+    before = calls.count
+    await ask(runner, TOPICS[0][0])
+    print(f"  after editing the campus file: {calls.count - before} model calls for a cached question (1 when served from the cache)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.questions, args.llm_latency_ms))
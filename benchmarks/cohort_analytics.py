@@ -0,0 +1,117 @@
+"""Cohort analytics latency on a million registrations.
+
+Seeds students enrolling over two years, courses across six terms,
+registrations with a realistic mix of active, completed, dropped and
+withdrawn, and paid tuition. Times the first call (which loads the NumPy
+arrays), then repeated calls answered from the cached arrays (each still
+checks the data version), then calls right after writes, which apply only
+the changed rows.
+
+    python -m benchmarks.cohort_analytics [--students 100000] [--registrations 1000000] [--repeat 20]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import random
+import statistics
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, update
+
+from ai_university_campus_admin_agent.config.database import (
+    SessionLocal, Course, Registration, Payment, RegistrationStatus, PaymentStatus
+)
+from ai_university_campus_admin_agent.tools.cohort_tools import (
+    get_cohort_retention, get_course_drop_rates, get_cohort_revenue, CohortData
+)
+
+TERMS = [("Fall", 2023), ("Spring", 2024), ("Fall", 2024), ("Spring", 2025), ("Fall", 2025), ("Spring", 2026)]
+STATUSES = [RegistrationStatus.COMPLETED] * 12 + [RegistrationStatus.ACTIVE] * 5 + [RegistrationStatus.DROPPED] * 2 + [RegistrationStatus.WITHDRAWN]
+
+def seed(students: int, registrations: int):
+    common.reset_database()
+    common.seed(students=students, courses=120)
+    rng = random.Random(41)
+    now = datetime.datetime.now()
+    yesterday = now - datetime.timedelta(days=1)
+    with SessionLocal() as db:
+        for index, course in enumerate(db.query(Course).all()):
+            course.semester, course.year = TERMS[index % len(TERMS)]
+        db.execute(update(Course).values(max_capacity=10 ** 6))
+        db.commit()
+
+        batch, payments = [], []
+        for index in range(registrations):
+            student = rng.randrange(students)
+            enrolled = now - datetime.timedelta(days=student % 720)  # as in common.seed
+            registered = min(enrolled + datetime.timedelta(days=int(rng.expovariate(1 / 200))), yesterday)
+            batch.append({"student_id": f"S{student:07d}", "course_id": rng.randrange(1, 121),
+                          "status": rng.choice(STATUSES), "registration_date": registered,
+                          "created_at": registered, "updated_at": registered})
+            if index % 3 == 0:
+                payments.append({"student_id": f"S{student:07d}", "fee_structure_id": batch[-1]["course_id"],
+                                 "amount_paid": 1000.0, "payment_date": registered + datetime.timedelta(days=rng.randrange(60)),
+                                 "payment_method": "bank_transfer", "transaction_id": f"BENCH{index}",
+                                 "status": PaymentStatus.PAID, "created_at": registered, "updated_at": registered})
+            if len(batch) == 100000:
+                db.execute(insert(Registration), batch)
+                db.execute(insert(Payment), payments)
+                batch, payments = [], []
+        if batch:
+            db.execute(insert(Registration), batch)
+            db.execute(insert(Payment), payments)
+        db.commit()
+
+def main(students: int, registrations: int, repeat: int):
+    with common.Timer() as timer:
+        seed(students, registrations)
+    print(f"Seeded {students} students and {registrations} registrations in {timer.elapsed:.1f}s")
+
+    calls = [
+        ("retention", get_cohort_retention, {"months": 24}),
+        ("retention dept", get_cohort_retention, {"months": 12, "department": "Biology", "since": "2024-01"}),
+        ("drop rates", get_course_drop_rates, {}),
+        ("drop rates term", get_course_drop_rates, {"term": "Fall 2024"}),
+        ("revenue", get_cohort_revenue, {"months": 24}),
+    ]
+    with common.Timer() as timer:
+        result = get_cohort_retention()
+    assert result["status"] == "success", result
+    print(f"  first call (loads arrays)  {timer.elapsed * 1000:8.1f} ms")
+
+    with SessionLocal() as db:
+        timings = []
+        for _ in range(repeat):
+            with common.Timer() as timer:
+                CohortData.data_version(db)
+            timings.append(timer.elapsed * 1000)
+    print(f"  data version check         {statistics.median(timings):8.2f} ms p50")
+
+    for label, tool, kwargs in calls:
+        timings = []
+        for _ in range(repeat):
+            with common.Timer() as timer:
+                result = tool(**kwargs)
+            timings.append(timer.elapsed * 1000)
+        assert result["status"] == "success", result
+        timings.sort()
+        print(f"  {label:<26} {statistics.median(timings):8.2f} ms p50  {timings[-1]:8.2f} ms max")
+
+    for label, changes in (("after 1 drop", 1), ("after 1000 drops", 1000)):
+        with SessionLocal() as db:
+            db.execute(update(Registration).where(Registration.id <= changes).values(
+                status=RegistrationStatus.DROPPED, updated_at=datetime.datetime.now(ZoneInfo("UTC"))))
+            db.commit()
+        with common.Timer() as timer:
+            result = get_course_drop_rates()
+        assert result["status"] == "success", result
+        print(f"  {label:<26} {timer.elapsed * 1000:8.2f} ms (refresh + drop rates)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=100000)
+    parser.add_argument("--registrations", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.students, args.registrations, args.repeat)
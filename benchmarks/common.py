@@ -0,0 +1,170 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks never touch the configured application database: importing this
+module points DATABASE_URL at BENCH_DATABASE_URL, or at a scratch SQLite file
+when that is not set. Import it before anything from the application package.
+"""
+import os
+import tempfile
+
+_scratch_dir = tempfile.mkdtemp(prefix="campus_bench_")
+os.environ["DATABASE_URL"] = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{_scratch_dir}/bench.db"
+
+import datetime
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.agent_tool import AgentTool
+from sqlalchemy import event, insert
+from sqlalchemy.engine import Engine
+
+from ai_university_campus_admin_agent.config.database import (
+    Base, engine, SessionLocal, Student, Course, FeeStructure, FeeType
+)
+from ai_university_campus_admin_agent.config.models import ModelStats, model_stats
+
+# agent.py configures DEBUG logging for the whole process; keep benchmark output readable
+logging.getLogger().setLevel(logging.WARNING)
+
+DEPARTMENTS = ["Computer Science", "Data Science", "Mathematics", "Biology", "Marketing", "Physics"]
+
+def reset_database():
+    """Drop and recreate every table in the benchmark database"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def seed(students: int = 1000, courses: int = 50, max_capacity: int = 100, fees: bool = True):
+    """Bulk-insert synthetic students, courses and tuition fee structures"""
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    with SessionLocal() as db:
+        db.execute(insert(Student), [
+            {
+                "student_id": f"S{i:07d}",
+                "name": f"Student {i}",
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "email": f"student{i}@example.edu",
+                "enrollment_date": now - datetime.timedelta(days=i % 720),
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now
+            }
+            for i in range(students)
+        ])
+        db.execute(insert(Course), [
+            {
+                "course_code": f"C{i:04d}",
+                "course_name": f"Course {i}",
+                "credits": 3,
+                "department": DEPARTMENTS[i % len(DEPARTMENTS)],
+                "semester": "Fall",
+                "year": 2025,
+                "max_capacity": max_capacity,
+                "current_enrollment": 0,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now
+            }
+            for i in range(courses)
+        ])
+        if fees:
+            db.execute(insert(FeeStructure), [
+                {
+                    "course_id": i + 1,
+                    "fee_type": FeeType.TUITION,
+                    "amount": 1000.0,
+                    "due_date": now - datetime.timedelta(days=30),
+                    "is_active": True,
+                    "created_at": now,
+                    "updated_at": now
+                }
+                for i in range(courses)
+            ])
+        db.commit()
+
+class Timer:
+    """Context manager recording elapsed wall-clock seconds"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+class ConversationProfile(BasePlugin):
+    """Runner plugin splitting conversation time into model, tool code and database.
+
+    Model time comes from the model backends' ModelStats (config/models.py), tool time is measured
+    around every function tool (consult tools are skipped, since the agent they run is measured
+    directly) and database time around every statement on any engine. Database time spent inside
+    tools is reported as database, not tool code. Pass it to the runner with `plugins=[profile]`.
+    """
+
+    def __init__(self, stats: ModelStats = model_stats):
+        super().__init__(name="conversation_profile")
+        self.stats = stats
+        self._lock = threading.Lock()
+        self._tool_started: Dict[str, tuple] = {}
+        self.reset()
+        event.listen(Engine, "before_cursor_execute", self._before_execute)
+        event.listen(Engine, "after_cursor_execute", self._after_execute)
+
+    def reset(self) -> None:
+        self.stats.reset()
+        with self._lock:
+            self.tool_calls: Dict[str, int] = {}
+            self.tool_seconds = 0.0
+            self.tool_db_seconds = 0.0
+            self.queries = 0
+            self.db_seconds = 0.0
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profile_started"].pop()
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += elapsed
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[dict]:
+        if not isinstance(tool, AgentTool):
+            self._tool_started[tool_context.function_call_id] = (time.perf_counter(), self.db_seconds)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> Optional[dict]:
+        self._finish_tool(tool, tool_context)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> Optional[dict]:
+        self._finish_tool(tool, tool_context)
+        return None
+
+    def _finish_tool(self, tool, tool_context) -> None:
+        started = self._tool_started.pop(tool_context.function_call_id, None)
+        if started is None:
+            return
+        with self._lock:
+            self.tool_calls[tool.name] = self.tool_calls.get(tool.name, 0) + 1
+            self.tool_seconds += time.perf_counter() - started[0]
+            self.tool_db_seconds += self.db_seconds - started[1]
+
+    def breakdown(self, wall_seconds: float) -> Dict[str, Any]:
+        """Milliseconds by where they went; framework is the wall time left over (sessions, callbacks, ADK itself)"""
+        model_seconds = self.stats.seconds
+        with self._lock:
+            tool_code = self.tool_seconds - self.tool_db_seconds
+            return {
+                "wall_ms": wall_seconds * 1000,
+                "model_ms": model_seconds * 1000,
+                "tool_ms": tool_code * 1000,
+                "db_ms": self.db_seconds * 1000,
+                "framework_ms": (wall_seconds - model_seconds - tool_code - self.db_seconds) * 1000,
+                "model_calls": self.stats.count,
+                "tool_calls": dict(self.tool_calls),
+                "queries": self.queries
+            }
@@ -0,0 +1,93 @@
+"""Serialized size of list-heavy tool results, full vs compact.
+
+Seeds a realistic catalogue (courses across departments, a large class, a
+student with a long payment history), then calls get_all_courses,
+get_course_enrollments and get_payment_history with format="full" and
+format="compact" and compares the JSON the agent would receive: bytes and an
+estimated token count. Tokens are counted with tiktoken's cl100k_base encoding
+when it is installed, otherwise estimated at four characters per token.
+
+    python -m benchmarks.compact_results [--courses 120] [--class-size 300] [--payments 200]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import json
+import random
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert
+
+from ai_university_campus_admin_agent.config.database import (
+    SessionLocal, Course, Registration, Payment, FeeStructure, RegistrationStatus, PaymentStatus
+)
+from ai_university_campus_admin_agent.tools.course_tools import get_all_courses, get_course_enrollments
+from ai_university_campus_admin_agent.tools.fee_tools import get_payment_history
+
+PAYMENT_METHODS = ["credit_card", "bank_transfer", "debit_card", "cash", "scholarship"]
+STATUSES = [PaymentStatus.PAID] * 8 + [PaymentStatus.PENDING, PaymentStatus.PARTIAL]
+
+def _token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return "cl100k_base", lambda text: len(encoding.encode(text))
+    except Exception:
+        return "chars/4", lambda text: (len(text) + 3) // 4
+
+def seed(courses: int, class_size: int, payments: int):
+    common.reset_database()
+    common.seed(students=max(class_size, 1000), courses=courses, max_capacity=class_size)
+    rng = random.Random(3)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    with SessionLocal() as db:
+        for index, course in enumerate(db.query(Course).all()):
+            course.course_name = f"{course.department} {rng.choice(['Foundations', 'Methods', 'Seminar', 'Lab'])} {100 + index}"
+            course.instructor = f"Dr. {rng.choice(['Ahmed', 'Chen', 'Garcia', 'Okafor', 'Novak'])}"
+            course.description = f"An introduction to {course.department.lower()} for second-year students."
+        db.execute(insert(Registration), [
+            {"student_id": f"S{i:07d}", "course_id": 1, "status": RegistrationStatus.ACTIVE,
+             "registration_date": now - datetime.timedelta(days=rng.randrange(60), seconds=rng.randrange(86400)),
+             "created_at": now, "updated_at": now}
+            for i in range(class_size)
+        ])
+        fee_ids = [fee_id for fee_id, in db.query(FeeStructure.id).all()]
+        db.execute(insert(Payment), [
+            {"student_id": "S0000000", "fee_structure_id": rng.choice(fee_ids) if rng.random() < 0.8 else None,
+             "amount_paid": round(rng.uniform(50, 1000), 2), "payment_method": rng.choice(PAYMENT_METHODS),
+             "payment_date": now - datetime.timedelta(days=i), "transaction_id": f"TXN{now:%Y%m%d}{i:06d}",
+             "status": rng.choice(STATUSES), "notes": "Installment" if rng.random() < 0.1 else None,
+             "created_at": now, "updated_at": now}
+            for i in range(payments)
+        ])
+        db.commit()
+
+def main(courses: int, class_size: int, payments: int):
+    seed(courses, class_size, payments)
+    counter_name, count_tokens = _token_counter()
+    calls = [
+        (f"get_all_courses ({courses})", get_all_courses, {"active_only": True}),
+        (f"get_course_enrollments ({class_size})", get_course_enrollments, {"course_code": "C0000"}),
+        (f"get_payment_history ({payments})", get_payment_history, {"student_id": "S0000000"}),
+    ]
+    print(f"tokens counted with {counter_name}")
+    for label, tool, kwargs in calls:
+        full = tool(**kwargs, format="full")
+        compact = tool(**kwargs, format="compact")
+        assert full["status"] == compact["status"] == "success", (full, compact)
+        sizes = {}
+        for name, result in (("full", full), ("compact", compact)):
+            text = json.dumps(result)
+            sizes[name] = (len(text.encode()), count_tokens(text))
+        (full_bytes, full_tokens), (compact_bytes, compact_tokens) = sizes["full"], sizes["compact"]
+        print(f"  {label:<32} full {full_bytes:>8} B {full_tokens:>7} tok   compact {compact_bytes:>8} B "
+              f"{compact_tokens:>7} tok   saved {1 - compact_tokens / full_tokens:6.1%} of tokens")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=120)
+    parser.add_argument("--class-size", type=int, default=300)
+    parser.add_argument("--payments", type=int, default=200)
+    args = parser.parse_args()
+    main(args.courses, args.class_size, args.payments)
@@ -0,0 +1,141 @@
+"""End-to-end request latency through the real agent tree, without the network.
+
+Sends a fixed set of student requests through root_agent, each in a new
+session, so every request takes the full path: orchestrator, sub-agent,
+tool, database. The time for each request is split into model, tool
+code, database and framework (sessions, callbacks, ADK itself).
+
+The models come from MODEL_BACKEND (config/models.py):
+
+  unset / gemini  scripted stub models that call the same tools a real model
+                  would, after --llm-latency-ms each; no credentials needed
+  replay          the responses in MODEL_RECORDING, after their recorded latency
+                  (or MODEL_REPLAY_LATENCY_MS)
+  record          the real models, recording to MODEL_RECORDING for later replay
+
+--record PATH records whatever models run (stub or real) to PATH, so a
+stub run can be replayed through the unmodified agents.
+
+    python -m benchmarks.conversation [--repeat 5] [--llm-latency-ms 500] [--record PATH]
+    MODEL_BACKEND=replay MODEL_RECORDING=PATH python -m benchmarks.conversation
+"""
+from benchmarks import common
+
+import argparse
+import asyncio
+import logging
+import statistics
+from typing import Dict, List
+
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from ai_university_campus_admin_agent.agent import root_agent
+from ai_university_campus_admin_agent.config.answer_cache import answer_cache
+from ai_university_campus_admin_agent.config.models import (
+    MODEL_BACKEND, MODEL_RECORDING, StubLlm, RecordingLlm, load_recording
+)
+
+from benchmarks.parallel_fanout import call
+
+logging.getLogger("google_adk").setLevel(logging.ERROR)
+
+def text(value: str) -> List[types.Part]:
+    return [types.Part.from_text(text=value)]
+
+# name -> (message, agent it is routed to or None for the orchestrator, tool call the agent makes or None)
+REQUESTS = {
+    "overview": ("I'm S0000001. What am I enrolled in and what do I owe?", None, call("get_student_overview", student_id="S0000001")),
+    "enroll": ("Register S0000001 for C0002", "RegistrationAgent", call("enroll_course", student_id="S0000001", course_code="C0002")),
+    "fees": ("What are the fees for S0000001 in C0002?", "FeeAgent", call("calculate_student_fees", student_id="S0000001", course_code="C0002")),
+    "courses": ("Which Computer Science courses are offered?", "CourseAgent", call("get_all_courses", department="Computer Science")),
+    "report": ("Show enrollment statistics for Computer Science", "AnalystAgent", call("get_enrollment_statistics", department="Computer Science")),
+    "campus": ("What are the library hours?", "campus_information_agent", None),
+}
+
+def stub_tree(request: str, latency: float):
+    """root_agent with every model replaced by a stub scripted for this request"""
+    _, target, tool_call = REQUESTS[request]
+
+    def script(agent, fresh: List[types.Part]) -> StubLlm:
+        responses = {"": fresh}
+        if tool_call is not None:
+            responses[tool_call.function_call.name] = text(f"Here is what I found for your {request} request.")
+        return StubLlm(model=agent.model if isinstance(agent.model, str) else agent.model.model, latency=latency, script=responses)
+
+    if target is None:
+        root_script = [tool_call]
+    else:
+        root_script = [call("transfer_to_agent", agent_name=target)]
+    sub_agents = []
+    for agent in root_agent.sub_agents:
+        fresh = [tool_call] if tool_call is not None else text(f"Here is what I found for your {request} request.")
+        sub_agents.append(agent.clone(update={"model": script(agent, fresh if agent.name == target else text("Done."))}))
+    return root_agent.clone(update={"model": script(root_agent, root_script), "sub_agents": sub_agents})
+
+def recorded(agent, path: str):
+    """A copy of the agent tree whose models also append their requests and responses to path"""
+    if isinstance(agent.model, str):
+        model = RecordingLlm(model=agent.model, recording=path)
+    else:
+        model = RecordingLlm(model=agent.model.model, inner=agent.model, recording=path)
+    update = {"model": model}
+    if agent.sub_agents:
+        update["sub_agents"] = [recorded(sub_agent, path) for sub_agent in agent.sub_agents]
+    update["tools"] = [
+        AgentTool(agent=recorded(tool.agent, path), skip_summarization=tool.skip_summarization) if isinstance(tool, AgentTool) else tool
+        for tool in agent.tools
+    ]
+    return agent.clone(update=update)
+
+async def run_request(agent, profile: common.ConversationProfile, message: str) -> Dict:
+    runner = InMemoryRunner(agent=agent, app_name="conversation_bench", plugins=[profile])
+    session = await runner.session_service.create_session(app_name="conversation_bench", user_id="bench")
+    profile.reset()
+    with common.Timer() as timer:
+        async for _ in runner.run_async(user_id="bench", session_id=session.id,
+                                        new_message=types.Content(role="user", parts=text(message))):
+            pass
+    return profile.breakdown(timer.elapsed)
+
+async def main(repeat: int, latency_ms: float, record: str):
+    common.reset_database()
+    common.seed(students=1000, courses=50)
+    profile = common.ConversationProfile()
+    stubbed = MODEL_BACKEND == "gemini"
+    print(f"models: {'stub, %g ms per call' % latency_ms if stubbed else MODEL_BACKEND + ' ' + MODEL_RECORDING}")
+    print(f"{'request':10} {'wall':>8} {'model':>8} {'tool':>8} {'db':>8} {'framework':>9}  calls  queries  (ms, p50 of {repeat})")
+    totals = {key: 0.0 for key in ("wall_ms", "model_ms", "tool_ms", "db_ms", "framework_ms")}
+    samples: Dict[str, List[Dict]] = {request: [] for request in REQUESTS}
+    for index in range(repeat):
+        # Every sample answers the campus question from the model, not the answer cache
+        answer_cache.clear()
+        if MODEL_BACKEND == "replay":
+            load_recording(MODEL_RECORDING).rewind()
+        # Enrolling again would only report the existing registration
+        common.reset_database()
+        common.seed(students=1000, courses=50)
+        for request, (message, _, _) in REQUESTS.items():
+            agent = stub_tree(request, latency_ms / 1000) if stubbed else root_agent
+            if record and index == 0:
+                agent = recorded(agent, record)
+            samples[request].append(await run_request(agent, profile, message))
+
+    for request, runs in samples.items():
+        row = {key: statistics.median(run[key] for run in runs) for key in totals}
+        for key in totals:
+            totals[key] += row[key]
+        print(f"{request:10} {row['wall_ms']:8.1f} {row['model_ms']:8.1f} {row['tool_ms']:8.1f} {row['db_ms']:8.1f} "
+              f"{row['framework_ms']:9.1f}  {runs[0]['model_calls']:5d}  {runs[0]['queries']:7d}  {', '.join(runs[0]['tool_calls'])}")
+    print(f"{'total':10} {totals['wall_ms']:8.1f} {totals['model_ms']:8.1f} {totals['tool_ms']:8.1f} {totals['db_ms']:8.1f} {totals['framework_ms']:9.1f}")
+    if record:
+        print(f"recorded to {record}; replay with MODEL_BACKEND=replay MODEL_RECORDING={record}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--record", help="also record every model request and response to this JSONL file")
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat, args.llm_latency_ms, args.record))
@@ -0,0 +1,99 @@
+"""Course search latency on a large catalog.
+
+Seeds a synthetic catalog with generated titles and descriptions (the full-text
+index is filled by the same triggers that keep it in sync in production), then
+times search_courses for a mix of single-term, multi-term, prefix and filtered
+queries and checks that course edits are searchable immediately. The synthetic
+vocabulary is small, so topic words match roughly a tenth of the catalog; that
+is far denser than a real catalog and bounds the cost of ranking.
+
+    python -m benchmarks.course_search [--courses 50000] [--repeat 20]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import random
+import statistics
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert
+
+from ai_university_campus_admin_agent.config.database import SessionLocal, Course
+from ai_university_campus_admin_agent.tools.search_tools import search_courses
+from ai_university_campus_admin_agent.tools.course_tools import update_course
+
+TOPICS = [
+    "neural networks", "machine learning", "linear algebra", "organic chemistry", "marketing strategy",
+    "quantum mechanics", "data structures", "statistics", "genetics", "microeconomics", "databases",
+    "computer vision", "thermodynamics", "cell biology", "operating systems", "calculus", "ethics",
+    "distributed systems", "consumer behavior", "astrophysics", "cryptography", "ecology"
+]
+LEVELS = ["Introduction to", "Foundations of", "Advanced", "Applied", "Topics in", "Seminar in"]
+FILLER = ("students explore core concepts through lectures projects and labs with emphasis on "
+          "problem solving communication research methods and real world case studies").split()
+INSTRUCTORS = ["Dr. Smith", "Dr. Garcia", "Prof. Chen", "Dr. Okafor", "Prof. Novak", "Dr. Haddad"]
+
+QUERIES = [
+    ("course code", {"query": "C01234"}),
+    ("single term", {"query": "cryptography"}),
+    ("two terms", {"query": "neural networks"}),
+    ("prefix", {"query": "thermo"}),
+    ("instructor", {"query": "Okafor"}),
+    ("filtered", {"query": "machine learning", "department": "Computer Science"}),
+    ("no full match", {"query": "quantum genetics ethics"}),
+    ("deep page", {"query": "statistics", "page": 20}),
+]
+
+def seed_catalog(courses: int):
+    rng = random.Random(7)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    rows = []
+    for i in range(courses):
+        topic, other = rng.sample(TOPICS, 2)
+        rows.append({
+            "course_code": f"C{i:05d}",
+            "course_name": f"{rng.choice(LEVELS)} {topic.title()}",
+            "description": f"Covers {topic} and its connections to {other}. " + " ".join(rng.choices(FILLER, k=25)),
+            "credits": 3,
+            "department": common.DEPARTMENTS[i % len(common.DEPARTMENTS)],
+            "semester": "Fall",
+            "year": 2025,
+            "max_capacity": 40,
+            "current_enrollment": 0,
+            "instructor": rng.choice(INSTRUCTORS),
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now
+        })
+    with SessionLocal() as db:
+        db.execute(insert(Course), rows)
+        db.commit()
+
+def main(courses: int, repeat: int):
+    common.reset_database()
+    with common.Timer() as timer:
+        seed_catalog(courses)
+    print(f"Seeded {courses} courses (with index maintenance) in {timer.elapsed:.2f}s")
+
+    for label, kwargs in QUERIES:
+        timings = []
+        for _ in range(repeat):
+            with common.Timer() as timer:
+                result = search_courses(**kwargs)
+            timings.append(timer.elapsed * 1000)
+        assert result["status"] == "success", result
+        top = result["results"][0]["course_name"] if result["results"] else "-"
+        print(f"  {label:<14} {kwargs['query']!r:<28} p50 {statistics.median(timings):7.2f} ms  "
+              f"max {max(timings):7.2f} ms  hits {result['total_results']:>6}  top: {top}")
+
+    update_course("C00042", course_name="Applied Zymurgy", description="Brewing science")
+    found = search_courses("zymurgy")["results"]
+    print(f"  update visible to search immediately: {bool(found) and found[0]['course_code'] == 'C00042'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.courses, args.repeat)
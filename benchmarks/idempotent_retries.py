@@ -0,0 +1,111 @@
+"""Retried write calls, with and without idempotency keys.
+
+A model that times out waiting for a write calls it again. For --students
+students, each enroll_course and record_payment (no transaction_id) call
+is sent once and then repeated --retries times, as sequential retries and
+then as a storm of all --retries + 1 identical calls at once. Without a key every
+repeat does the database work again: enrollment retries report "already
+enrolled" and payment retries record a new payment each time. With a key
+the repeats return the first result.
+
+Reports what the repeats got back, payments recorded and the mean time of
+a first call and of a repeat.
+
+    python -m benchmarks.idempotent_retries [--students 200] [--retries 4]
+"""
+import os
+
+# Repeating one student's writes is the point here; keep the per-student write rate limit out of the way
+os.environ.setdefault("WRITE_RATE_BURST", "1000")
+
+from benchmarks import common
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from ai_university_campus_admin_agent.config.database import SessionLocal, Payment
+from ai_university_campus_admin_agent.tools.registration_tools import enroll_course
+from ai_university_campus_admin_agent.tools.fee_tools import record_payment
+from ai_university_campus_admin_agent.utils.admission import student_rate_limiter
+from ai_university_campus_admin_agent.utils.idempotency import idempotency_store
+
+COURSES = 20
+
+def outcome(result: Dict) -> str:
+    if result.get("idempotent_replay"):
+        return "replayed"
+    if result["status"] == "success":
+        return "ran"
+    return result.get("error_code") or result["message"]
+
+async def timed(call: Callable[[], Awaitable[Dict]]) -> tuple:
+    started = time.perf_counter()
+    result = await call()
+    return (time.perf_counter() - started) * 1000, result
+
+async def run(students: int, retries: int, keyed: bool, storm: bool) -> Dict:
+    common.reset_database()
+    common.seed(students=students, courses=COURSES, max_capacity=students)
+    idempotency_store.clear()
+    student_rate_limiter.reset()
+    first_ms: List[float] = []
+    repeat_ms: List[float] = []
+    outcomes: Counter = Counter()
+
+    def calls(index: int):
+        student = f"S{index:07d}"
+        course = f"C{index % COURSES:04d}"
+        return (
+            (lambda key: enroll_course(student, course, idempotency_key=key)),
+            (lambda key: record_payment(student, 100.0, "online", idempotency_key=key)),
+        )
+
+    for index in range(students):
+        for call in calls(index):
+            key: Optional[str] = str(uuid.uuid4()) if keyed else None
+            if storm:
+                # Every copy is in flight at once, so the first call has not finished for most of them
+                results = await asyncio.gather(*(timed(lambda: call(key)) for _ in range(retries + 1)))
+                for elapsed, result in results:
+                    repeat_ms.append(elapsed)
+                outcomes.update(outcome(result) for _, result in results)
+                continue
+            elapsed, result = await timed(lambda: call(key))
+            first_ms.append(elapsed)
+            for _ in range(retries):
+                elapsed, result = await timed(lambda: call(key))
+                repeat_ms.append(elapsed)
+                outcomes[outcome(result)] += 1
+    with SessionLocal() as db:
+        payments = db.execute(select(func.count(Payment.id))).scalar()
+    return {
+        "first_ms": statistics.mean(first_ms) if first_ms else None,
+        "repeat_ms": statistics.mean(repeat_ms),
+        "payments": payments,
+        "outcomes": outcomes
+    }
+
+async def main(students: int, retries: int):
+    print(f"{students} students, one enrollment and one payment each, {retries} retries per call")
+    for storm in (False, True):
+        print("concurrent storm, all copies at once:" if storm else "sequential retries:")
+        for keyed in (False, True):
+            result = await run(students, retries, keyed, storm)
+            first = "" if result["first_ms"] is None else f"first {result['first_ms']:6.2f} ms  "
+            print(f"  {'with key' if keyed else 'no key':9} {first}{'call' if storm else 'repeat'} {result['repeat_ms']:6.2f} ms  "
+                  f"payments {result['payments']:5d} (want {students})")
+            print(f"            {', '.join(f'{name}: {count}' for name, count in result['outcomes'].most_common())}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--retries", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.students, args.retries))
@@ -0,0 +1,100 @@
+"""Multi-part request latency: sequential transfers against parallel fan-out.
+
+Runs the real agent tree and tools against a stub model that sleeps
+--llm-latency-ms per call and replays a fixed script, so only the shape of
+the conversation is measured. For a request touching 1 to 3 domains (fees,
+course details, timetable):
+
+  sequential  the orchestrator transfers to the first agent, which calls its
+              tool, answers and transfers to the next, and so on
+  parallel    the orchestrator calls every ask_* consult tool in one turn;
+              ADK runs them concurrently, and it merges the answers
+
+    python -m benchmarks.parallel_fanout [--llm-latency-ms 500] [--repeat 3]
+"""
+from benchmarks import common
+
+import argparse
+import asyncio
+import logging
+import statistics
+from typing import List
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from ai_university_campus_admin_agent.agent import root_agent
+from ai_university_campus_admin_agent.agents import registration_agent, course_agent, fee_agent
+from ai_university_campus_admin_agent.agents.parallel_consult import CONSULTANTS, consult_tool
+from ai_university_campus_admin_agent.config.models import StubLlm, ModelStats
+
+# domain -> (agent, the tool it calls, its arguments)
+DOMAINS = {
+    "fees": (fee_agent, "calculate_student_fees", {"student_id": "S0000001", "course_code": "C0001"}),
+    "course": (course_agent, "get_course", {"course_code": "C0001"}),
+    "timetable": (registration_agent, "get_student_timetable", {"student_id": "S0000001"}),
+}
+
+# Tool schemas with default values log a warning per declaration on every model call
+logging.getLogger("google_adk").setLevel(logging.ERROR)
+
+def call(name: str, **args) -> types.Part:
+    return types.Part.from_function_call(name=name, args=args)
+
+def sequential_tree(domains: List[str], latency: float, calls: ModelStats):
+    agents = []
+    for index, domain in enumerate(domains):
+        agent, tool, args = DOMAINS[domain]
+        answer = [types.Part.from_text(text=f"Here is the {domain} information.")]
+        if index + 1 < len(domains):
+            answer.append(call("transfer_to_agent", agent_name=DOMAINS[domains[index + 1]][0].name))
+        model = StubLlm(model="stub", latency=latency, stats=calls, script={"": [call(tool, **args)], tool: answer})
+        agents.append(agent.clone(update={"model": model}))
+    model = StubLlm(model="stub", latency=latency, stats=calls,
+                        script={"": [call("transfer_to_agent", agent_name=agents[0].name)]})
+    return root_agent.clone(update={"model": model, "sub_agents": agents, "tools": []})
+
+def parallel_tree(domains: List[str], latency: float, calls: ModelStats):
+    names = {agent.name: (name, description) for agent, name, description in CONSULTANTS}
+    tools, requests = [], []
+    for domain in domains:
+        agent, tool, args = DOMAINS[domain]
+        model = StubLlm(model="stub", latency=latency, stats=calls, script={
+            "": [call(tool, **args)], tool: [types.Part.from_text(text=f"Here is the {domain} information.")]
+        })
+        name, description = names[agent.name]
+        tools.append(consult_tool(agent.clone(update={"model": model}), name, description))
+        requests.append(call(name, request=f"{domain} for student S0000001, course C0001"))
+    model = StubLlm(model="stub", latency=latency, stats=calls, script={
+        "": requests, **{tool.name: [types.Part.from_text(text="Here is everything you asked for.")] for tool in tools}
+    })
+    return root_agent.clone(update={"model": model, "sub_agents": [], "tools": tools})
+
+async def run_once(agent) -> float:
+    runner = InMemoryRunner(agent=agent, app_name="fanout_bench")
+    session = await runner.session_service.create_session(app_name="fanout_bench", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part.from_text(text="What do I owe, what is C0001 about and what is my timetable?")])
+    with common.Timer() as timer:
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+    return timer.elapsed
+
+async def main(latency_ms: float, repeat: int):
+    common.reset_database()
+    common.seed(students=100, courses=10)
+    print(f"stub model: {latency_ms:g} ms per call")
+    for count in range(1, len(DOMAINS) + 1):
+        domains = list(DOMAINS)[:count]
+        line = f"  {count} domain{'s' if count > 1 else ' '}"
+        for label, build in (("sequential", sequential_tree), ("parallel", parallel_tree)):
+            calls = ModelStats()
+            timings = [await run_once(build(domains, latency_ms / 1000, calls)) for _ in range(repeat)]
+            line += f"   {label} {statistics.median(timings) * 1000:7.0f} ms ({calls.count // repeat} LLM calls)"
+        print(line)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.llm_latency_ms, args.repeat))
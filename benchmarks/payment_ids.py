@@ -0,0 +1,73 @@
+"""Concurrent payment transaction ID benchmark.
+
+Generates IDs from several worker processes and threads at once and checks
+that none collide, then records payments concurrently through record_payment
+and checks that no payment was rejected as a duplicate transaction. Payment
+throughput is bounded by the database's commit rate; point BENCH_DATABASE_URL
+at Postgres to measure the production path.
+
+    python -m benchmarks.payment_ids [--processes 4] [--threads 8] [--ids 50000] [--payments 5000]
+"""
+from benchmarks import common
+
+import argparse
+import inspect
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_university_campus_admin_agent.utils.ids import new_transaction_id
+from ai_university_campus_admin_agent.tools.fee_tools import record_payment
+
+# Many payments per student on purpose; the per-student write rate limit would turn most away
+record_payment = inspect.unwrap(record_payment)
+
+def _generate(count: int, threads: int):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda n: [new_transaction_id() for _ in range(n)], [count // threads] * threads))
+
+def bench_generation(processes: int, threads: int, ids_per_process: int):
+    # Warm up the generator in the parent so forked workers inherit its state
+    new_transaction_id()
+    ctx = multiprocessing.get_context("fork")
+    with common.Timer() as timer, ctx.Pool(processes) as pool:
+        results = pool.starmap(_generate, [(ids_per_process, threads)] * processes)
+    batches = [batch for process_batches in results for batch in process_batches]
+    ids = [txn for batch in batches for txn in batch]
+    collisions = len(ids) - len(set(ids))
+    print(f"ID generation: {len(ids)} ids from {processes} processes x {threads} threads "
+          f"in {timer.elapsed:.2f}s ({len(ids) / timer.elapsed:,.0f} ids/s), collisions: {collisions}")
+    ordered = all(batch == sorted(batch) for batch in batches)
+    print(f"  per-thread ids monotonic: {ordered}")
+
+def bench_payments(threads: int, payments: int, students: int = 20):
+    common.reset_database()
+    common.seed(students=students, courses=1)
+    student_ids = [f"S{i:07d}" for i in range(students)]
+
+    def pay(i):
+        return record_payment(student_ids[i % students], 10.0, "online")
+
+    with common.Timer() as timer, ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(pay, range(payments)))
+
+    duplicates = sum(1 for r in results if r.get("message") == "Transaction ID already exists")
+    errors = sum(1 for r in results if r["status"] != "success")
+    succeeded = [r["payment"] for r in results if r["status"] == "success"]
+    txns = [p["transaction_id"] for p in succeeded]
+    # What the old TXN{YYYYmmddHHMMSS}{student_id[-4:]} scheme would have produced for the same payments
+    legacy = [f"TXN{p['payment_date'][:19]}{p['student_id'][-4:]}" for p in succeeded]
+    print(f"record_payment: {payments} payments for {students} students on {threads} threads "
+          f"in {timer.elapsed:.2f}s ({payments / timer.elapsed:,.0f} payments/s)")
+    print(f"  duplicate transaction IDs: {duplicates}, other errors: {errors - duplicates}, "
+          f"distinct ids: {len(set(txns))}/{len(txns)}")
+    print(f"  collisions the per-second legacy format would have had: {len(legacy) - len(set(legacy))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ids", type=int, default=50000, help="IDs generated per process")
+    parser.add_argument("--payments", type=int, default=5000)
+    args = parser.parse_args()
+    bench_generation(args.processes, args.threads, args.ids)
+    bench_payments(args.threads, args.payments)
@@ -0,0 +1,180 @@
+"""Write throughput while analytics reports run.
+
+Each phase runs in a fresh process against its own scratch database: writer
+threads enroll students as fast as they can while report worker processes loop
+over the analyst tools. Phases:
+
+  writes only         baseline, no reports
+  cpu load only       control: the report workers burn CPU without touching
+                      the database, which is what writers lose on a machine
+                      with fewer cores than processes
+  shared engine       the previous setup: rollback journal and reports on the
+                      primary engine, so every report holds a shared lock that
+                      stalls commits
+  read engine         reports on the read-only engine with WAL (the default)
+
+Reports run in separate processes at the lowest CPU priority, as if on other
+workers or a replica host, so the comparison measures database contention
+rather than the GIL. Compare the read engine against the cpu load control:
+matching it means reports cost writers nothing beyond CPU time. With
+BENCH_DATABASE_URL pointing at Postgres, set DATABASE_READ_URL to a replica
+to compare pools and servers instead.
+
+    python -m benchmarks.read_routing [--seconds 10] [--writers 4] [--reporters 2]
+"""
+import argparse
+import inspect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PHASES = [
+    ("writes only", 0, {}),
+    ("cpu load only", None, {"BENCH_REPORTS_CPU_ONLY": "1"}),
+    ("shared engine", None, {"SQLITE_JOURNAL_MODE": "DELETE", "BENCH_REPORTS_ON_PRIMARY": "1"}),
+    ("read engine", None, {}),
+]
+
+STUDENTS = 20000
+COURSES = 200
+REGISTRATIONS = 150000
+
+def _seed():
+    import datetime
+    import random
+    from zoneinfo import ZoneInfo
+    from sqlalchemy import insert
+    from benchmarks import common
+    from ai_university_campus_admin_agent.config.database import SessionLocal, Registration, Payment, RegistrationStatus, PaymentStatus
+
+    common.reset_database()
+    common.seed(students=STUDENTS, courses=COURSES, max_capacity=10 ** 6)
+    rng = random.Random(5)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    pairs = set()
+    while len(pairs) < REGISTRATIONS:
+        pairs.add((rng.randrange(STUDENTS), rng.randrange(1, COURSES + 1)))
+    with SessionLocal() as db:
+        db.execute(insert(Registration), [
+            {"student_id": f"S{student:07d}", "course_id": course_id, "status": RegistrationStatus.ACTIVE,
+             "registration_date": now, "created_at": now, "updated_at": now}
+            for student, course_id in pairs
+        ])
+        db.execute(insert(Payment), [
+            {"student_id": f"S{student:07d}", "amount_paid": 500.0, "payment_date": now - datetime.timedelta(days=student % 90),
+             "payment_method": "bank_transfer", "transaction_id": f"BENCH{index}", "status": PaymentStatus.PAID,
+             "created_at": now, "updated_at": now}
+            for index, (student, _) in enumerate(pairs) if index % 3 == 0
+        ])
+        db.commit()
+
+def report_worker(seconds: float):
+    """Loop over the analyst reports until the deadline; print how many completed"""
+    import contextlib
+    import time
+    from benchmarks import common
+    from ai_university_campus_admin_agent.config.database import read_your_writes
+    from ai_university_campus_admin_agent.tools.analyst_tools import (
+        get_enrollment_statistics, get_financial_reports, get_course_performance, get_student_demographics
+    )
+
+    os.nice(19)
+    reports = [get_enrollment_statistics, get_financial_reports, get_course_performance, get_student_demographics]
+    routing = read_your_writes() if os.getenv("BENCH_REPORTS_ON_PRIMARY") else contextlib.nullcontext()
+    completed = 0
+    deadline = time.monotonic() + seconds
+    with routing:
+        while os.getenv("BENCH_REPORTS_CPU_ONLY") and time.monotonic() < deadline:
+            pass
+        while time.monotonic() < deadline:
+            result = reports[completed % len(reports)]()
+            assert result["status"] == "success", result
+            completed += 1
+    print(json.dumps({"reports": completed}))
+
+def run_phase(seconds: float, writers: int, reporters: int):
+    import statistics
+    import threading
+    import time
+    from benchmarks import common
+    from ai_university_campus_admin_agent.tools.registration_tools import enroll_course
+    # Write latency under report load, without admission control queueing the writers
+    enroll_course = inspect.unwrap(enroll_course)
+
+    _seed()
+    workers = [
+        subprocess.Popen([sys.executable, "-m", "benchmarks.read_routing", "--report-worker", "--seconds", str(seconds)],
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(reporters)
+    ]
+    time.sleep(1.0)  # let the report workers import and start querying
+
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds - 1.0
+
+    def write_loop(offset: int):
+        student = offset
+        while time.monotonic() < deadline:
+            with common.Timer() as timer:
+                result = enroll_course(f"S{student % STUDENTS:07d}", f"C{(student // STUDENTS + offset) % COURSES:04d}")
+            with lock:
+                if result["status"] == "success" or "already" in result.get("message", ""):
+                    latencies.append(timer.elapsed * 1000)
+                else:
+                    failures.append(result["message"])
+            student += writers
+
+    threads = [threading.Thread(target=write_loop, args=(offset,)) for offset in range(writers)]
+    with common.Timer() as timer:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    reports = sum(json.loads(worker.communicate()[0].strip().splitlines()[-1])["reports"] for worker in workers)
+
+    latencies.sort()
+    print(json.dumps({
+        "writes_per_second": round(len(latencies) / timer.elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)], 2) if latencies else None,
+        "failed_writes": len(failures),
+        "first_failure": failures[0] if failures else None,
+        "reports": reports
+    }))
+
+def main(seconds: float, writers: int, reporters: int):
+    print(f"{writers} writer threads, {reporters} report processes, {seconds:.0f}s per phase")
+    for label, phase_reporters, env in PHASES:
+        scratch = tempfile.mkdtemp(prefix="campus_bench_")
+        phase_env = {**os.environ, **env}
+        phase_env.setdefault("BENCH_DATABASE_URL", f"sqlite:///{scratch}/bench.db")
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.read_routing", "--run-phase", "--seconds", str(seconds),
+             "--writers", str(writers), "--reporters", str(reporters if phase_reporters is None else phase_reporters)],
+            env=phase_env, capture_output=True, text=True
+        )
+        if output.returncode:
+            print(output.stderr[-2000:])
+            raise SystemExit(f"phase {label!r} failed")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"  {label:<14} {result['writes_per_second']:8.1f} writes/s  p50 {result['p50_ms']:7.2f} ms  "
+              f"p99 {result['p99_ms']:8.2f} ms  failed {result['failed_writes']:>4}  reports {result['reports']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--reporters", type=int, default=2)
+    parser.add_argument("--run-phase", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--report-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.report_worker:
+        report_worker(args.seconds)
+    elif args.run_phase:
+        run_phase(args.seconds, args.writers, args.reporters)
+    else:
+        main(args.seconds, args.writers, args.reporters)
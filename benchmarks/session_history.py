@@ -0,0 +1,87 @@
+"""Session load time over a long-running chat.
+
+Replays a conversation of many turns (user message, tool call, tool response,
+agent reply) through the plain DatabaseSessionService and through the
+compacting session store, each on its own scratch database that also holds
+other users' sessions. Prints the get_session time at intervals: the plain
+service reloads every event and scans the events table, so each turn is
+slower than the last; the compacting store stays flat. Then expires idle
+sessions in chunks.
+
+    python -m benchmarks.session_history [--turns 400] [--other-sessions 200]
+"""
+from benchmarks import common
+
+import argparse
+import asyncio
+import datetime
+
+from google.adk.events.event import Event
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.database_session_service import StorageSession
+from google.genai import types
+from sqlalchemy import update
+
+from ai_university_campus_admin_agent.config.session_store import CompactingSessionService, session_metrics
+
+APP = "campus_admin"
+
+def _turn_events(turn: int):
+    call = types.FunctionCall(id=f"call-{turn}", name="get_student", args={"student_id": f"S{turn:07d}"})
+    response = types.FunctionResponse(id=f"call-{turn}", name="get_student",
+                                      response={"status": "success", "student": {"student_id": f"S{turn:07d}", "name": "Maria Gonzalez"}})
+    return [
+        Event(invocation_id=f"inv-{turn}", author="user",
+              content=types.Content(role="user", parts=[types.Part(text=f"Can you look up student S{turn:07d} for me?")])),
+        Event(invocation_id=f"inv-{turn}", author="RegistrationAgent",
+              content=types.Content(role="model", parts=[types.Part(function_call=call)])),
+        Event(invocation_id=f"inv-{turn}", author="RegistrationAgent",
+              content=types.Content(role="user", parts=[types.Part(function_response=response)])),
+        Event(invocation_id=f"inv-{turn}", author="RegistrationAgent",
+              content=types.Content(role="model", parts=[types.Part(text=f"Student S{turn:07d} is Maria Gonzalez, enrolled in Data Science.")])),
+    ]
+
+async def _chat(service, user_id: str, turns: int, report_every: int = 0):
+    session = await service.create_session(app_name=APP, user_id=user_id)
+    timings = {}
+    for turn in range(turns):
+        with common.Timer() as timer:
+            session = await service.get_session(app_name=APP, user_id=user_id, session_id=session.id)
+        if report_every and (turn + 1) % report_every == 0:
+            timings[turn + 1] = (timer.elapsed * 1000, len(session.events))
+        for event in _turn_events(turn):
+            await service.append_event(session, event)
+    return session, timings
+
+async def _run(label: str, service, turns: int, other_sessions: int, other_turns: int):
+    for index in range(other_sessions):
+        await _chat(service, f"user{index}", other_turns)
+    _, timings = await _chat(service, "long_chat_user", turns, report_every=max(turns // 8, 1))
+    print(f"  {label}")
+    for turn, (elapsed_ms, events) in timings.items():
+        print(f"    turn {turn:>4}: load {elapsed_ms:7.2f} ms, {events:>4} events in context")
+
+async def main(turns: int, other_sessions: int, other_turns: int):
+    print(f"{turns} turns in one chat, alongside {other_sessions} other sessions of {other_turns} turns")
+    plain_url = f"sqlite:///{common._scratch_dir}/plain_sessions.db"
+    compact_url = f"sqlite:///{common._scratch_dir}/compact_sessions.db"
+    await _run("DatabaseSessionService", DatabaseSessionService(plain_url), turns, other_sessions, other_turns)
+    service = CompactingSessionService(compact_url)
+    await _run(f"CompactingSessionService (max {service.max_events}, keep {service.keep_events})",
+               service, turns, other_sessions, other_turns)
+    print(f"  metrics: {session_metrics.snapshot()}")
+
+    # Age half of the sessions past the TTL, then expire them in small chunks
+    with service.database_session_factory() as sql_session:
+        stale = [key for key, in sql_session.query(StorageSession.id).filter(StorageSession.user_id.like("user%")).all()][::2]
+        sql_session.execute(update(StorageSession).where(StorageSession.id.in_(stale)).values(update_time=datetime.datetime(2000, 1, 1)))
+        sql_session.commit()
+    print(f"  expiry: {service.expire_idle_sessions(idle_hours=24, chunk_size=25)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=400)
+    parser.add_argument("--other-sessions", type=int, default=200)
+    parser.add_argument("--other-turns", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.other_sessions, args.other_turns))
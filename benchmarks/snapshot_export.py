@@ -0,0 +1,97 @@
+"""Snapshot export throughput and memory as tables grow.
+
+Each size runs in a fresh process against its own scratch database: seeds
+payments spread over two years, runs a full export, updates a slice of the
+rows and runs an incremental export. Prints rows per second and the peak
+resident memory of the process: memory should stay roughly flat as the table
+grows, since rows are streamed chunk by chunk and written straight to the
+partition files. The incremental run should export only the changed rows.
+
+    python -m benchmarks.snapshot_export [--sizes 100000 400000 1600000] [--format parquet]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+def run_size(rows: int, format: str):
+    import datetime
+    import random
+    import resource
+    from zoneinfo import ZoneInfo
+    from sqlalchemy import insert, update
+    from benchmarks import common
+    from ai_university_campus_admin_agent.config.database import SessionLocal, Payment, PaymentStatus
+    from ai_university_campus_admin_agent.tools.export_tools import export_snapshot
+
+    common.reset_database()
+    common.seed(students=5000, courses=50)
+    rng = random.Random(7)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    with SessionLocal() as db:
+        for start in range(0, rows, 100000):
+            db.execute(insert(Payment), [
+                {"student_id": f"S{rng.randrange(5000):07d}", "fee_structure_id": rng.randrange(1, 51),
+                 "amount_paid": round(rng.uniform(50, 1000), 2), "payment_method": "bank_transfer",
+                 "payment_date": now - datetime.timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)),
+                 "transaction_id": f"BENCH{index}", "status": PaymentStatus.PAID, "notes": None,
+                 "created_at": now, "updated_at": now}
+                for index in range(start, min(start + 100000, rows))
+            ])
+        db.commit()
+    seeded_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    output_dir = tempfile.mkdtemp(prefix="campus_export_")
+    with common.Timer() as full_timer:
+        full = export_snapshot(output_dir, tables=["payments"], format=format)
+    assert full["status"] == "success", full
+
+    changed = rows // 100
+    with SessionLocal() as db:
+        db.execute(update(Payment).where(Payment.id <= changed)
+                   .values(status=PaymentStatus.REFUNDED, updated_at=now + datetime.timedelta(minutes=1)))
+        db.commit()
+    with common.Timer() as incremental_timer:
+        incremental = export_snapshot(output_dir, tables=["payments"], incremental=True, format=format)
+    assert incremental["status"] == "success", incremental
+
+    print(json.dumps({
+        "full_rows_per_second": round(full["tables"]["payments"]["rows"] / full_timer.elapsed),
+        "files": len(full["tables"]["payments"]["files"]),
+        "incremental_rows": incremental["tables"]["payments"]["rows"],
+        "incremental_seconds": round(incremental_timer.elapsed, 2),
+        # ru_maxrss is in kilobytes on Linux; the export's peak is what it adds on top of seeding
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "seeded_rss_mb": round(seeded_rss / 1024, 1)
+    }))
+
+def main(sizes, format: str):
+    print(f"payments export, {format}")
+    for rows in sizes:
+        scratch = tempfile.mkdtemp(prefix="campus_bench_")
+        env = {**os.environ}
+        env.setdefault("BENCH_DATABASE_URL", f"sqlite:///{scratch}/bench.db")
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.snapshot_export", "--run-size", str(rows), "--format", format],
+            env=env, capture_output=True, text=True
+        )
+        if output.returncode:
+            print(output.stderr[-2000:])
+            raise SystemExit(f"size {rows} failed")
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        print(f"  {rows:>9} rows: full {result['full_rows_per_second']:>8} rows/s in {result['files']:>3} files  "
+              f"incremental {result['incremental_rows']:>7} rows in {result['incremental_seconds']:5.2f}s  "
+              f"peak rss {result['peak_rss_mb']:7.1f} MB (after seeding {result['seeded_rss_mb']:.1f} MB)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 400000, 1600000])
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    parser.add_argument("--run-size", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_size:
+        run_size(args.run_size, args.format)
+    else:
+        main(args.sizes, args.format)
@@ -0,0 +1,124 @@
+"""Fuzzy student lookup latency on a large student body.
+
+Seeds students with realistic first/last name combinations (the name index is
+filled by the same triggers that keep it in sync in production), loads the name
+vocabulary used for typo correction, then times search_students for exact,
+partial, misspelled, email-prefix and department filtered lookups, and confirms
+with EXPLAIN that no lookup scans the students table. Each full name is shared by roughly a dozen students at the default size,
+so common-name lookups are the worst case for the candidate pool.
+
+    python -m benchmarks.student_lookup [--students 1000000] [--repeat 20]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import random
+import statistics
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, text
+
+from ai_university_campus_admin_agent.config.database import SessionLocal, Student
+from ai_university_campus_admin_agent.tools.search_tools import search_students, name_vocabulary
+
+FIRST_NAMES = """James Mary Robert Patricia John Jennifer Michael Linda David Elizabeth William Barbara Richard
+Susan Joseph Jessica Thomas Sarah Charles Karen Christopher Lisa Daniel Nancy Matthew Betty Anthony Margaret Mark
+Sandra Donald Ashley Steven Kimberly Paul Emily Andrew Donna Joshua Michelle Kenneth Carol Kevin Amanda Brian
+Dorothy George Melissa Timothy Deborah Ronald Stephanie Edward Rebecca Jason Sharon Jeffrey Laura Ryan Cynthia Jacob
+Kathleen Gary Amy Nicholas Angela Eric Shirley Jonathan Anna Stephen Brenda Larry Pamela Justin Emma Scott Nicole
+Brandon Helen Benjamin Samantha Samuel Katherine Gregory Christine Alexander Debra Frank Rachel Patrick Carolyn
+Raymond Janet Jack Catherine Dennis Maria Jerry Heather Tyler Diane Aaron Ruth Jose Julie Adam Olivia Nathan Joyce
+Henry Virginia Douglas Victoria Zachary Kelly Peter Lauren Kyle Christina Ahmed Fatima Wei Mei Hiroshi Yuki Olga Ivan
+Priya Arjun Aisha Omar Chen Sofia Mateo Lucia Diego Amara Kwame Ngozi Lars Ingrid Pierre Amelie""".split()
+LAST_NAMES = """Smith Johnson Williams Brown Jones Garcia Miller Davis Rodriguez Martinez Hernandez Lopez Gonzalez
+Wilson Anderson Thomas Taylor Moore Jackson Martin Lee Perez Thompson White Harris Sanchez Clark Ramirez Lewis
+Robinson Walker Young Allen King Wright Scott Torres Nguyen Hill Flores Green Adams Nelson Baker Hall Rivera Campbell
+Mitchell Carter Roberts Gomez Phillips Evans Turner Diaz Parker Cruz Edwards Collins Reyes Stewart Morris Morales
+Murphy Cook Rogers Gutierrez Ortiz Morgan Cooper Peterson Bailey Reed Kelly Howard Ramos Kim Cox Ward Richardson
+Watson Brooks Chavez Wood James Bennett Gray Mendoza Ruiz Hughes Price Alvarez Castillo Sanders Patel Myers Long Ross
+Foster Jimenez Khan Haddad Okafor Novak Tanaka Suzuki Kowalski Ivanov Petrov Schmidt Muller Rossi Russo Silva Santos
+Oliveira Pereira Costa Nakamura Yamamoto Sato Chowdhury Rahman Hossain Mensah Okoye Adeyemi Andersson Johansson
+Nielsen Larsen Dubois Lefebvre Moreau Fischer Weber Becker Hoffmann Bianchi Romano Ferrari Esposito Horvath""".split()
+
+LOOKUPS = [
+    ("exact name", {"query": "Maria Gonzalez"}),
+    ("last name", {"query": "Okafor"}),
+    ("partial", {"query": "gonz"}),
+    ("one typo", {"query": "Maria Gonzales"}),
+    ("transposed", {"query": "Mraia Gonzalez"}),
+    ("two typos", {"query": "Jenifer Wiliams"}),
+    ("department", {"query": "Priya Patel", "department": "Data Science"}),
+    ("common first", {"query": "James"}),
+]
+
+def seed_students(students: int):
+    rng = random.Random(11)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    batch = []
+    with SessionLocal() as db:
+        for i in range(students):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            batch.append({
+                "student_id": f"S{i:07d}",
+                "name": f"{first} {last}",
+                "department": common.DEPARTMENTS[i % len(common.DEPARTMENTS)],
+                "email": f"{first.lower()}.{last.lower()}{i}@example.edu",
+                "enrollment_date": now,
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now
+            })
+            if len(batch) == 50000:
+                db.execute(insert(Student), batch)
+                batch = []
+        if batch:
+            db.execute(insert(Student), batch)
+        db.commit()
+
+def explain(sql: str, params: dict) -> list:
+    with SessionLocal() as db:
+        return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+
+def main(students: int, repeat: int):
+    common.reset_database()
+    with common.Timer() as timer:
+        seed_students(students)
+    print(f"Seeded {students} students (with index maintenance) in {timer.elapsed:.2f}s")
+
+    with SessionLocal() as db, common.Timer() as timer:
+        name_vocabulary.load(db)
+    print(f"Loaded the name vocabulary in {timer.elapsed * 1000:.1f} ms (once per STUDENT_VOCABULARY_TTL)")
+
+    with SessionLocal() as db:
+        email = db.query(Student.email).filter(Student.student_id == f"S{students // 2:07d}").scalar()
+    lookups = LOOKUPS + [("email prefix", {"query": email[:len(email.split("@")[0]) - 2]}), ("full email", {"query": email})]
+
+    for label, kwargs in lookups:
+        timings = []
+        for _ in range(repeat):
+            with common.Timer() as timer:
+                result = search_students(**kwargs)
+            timings.append(timer.elapsed * 1000)
+        assert result["status"] == "success", result
+        top = result["results"][0] if result["results"] else None
+        summary = f"{top['name']} <{top['email']}> {top['score']}" if top else "-"
+        print(f"  {label:<13} {kwargs['query']!r:<30} p50 {statistics.median(timings):6.2f} ms  "
+              f"max {max(timings):6.2f} ms  top: {summary}")
+
+    if common.engine.dialect.name == "sqlite":
+        plans = explain("SELECT s.id FROM students_fts JOIN students s ON s.id = students_fts.rowid "
+                        "WHERE students_fts MATCH :match AND lower(s.department) = :department LIMIT 200",
+                        {"match": '"gonz"*', "department": "biology"})
+        plans += explain("SELECT id FROM students WHERE email >= :prefix AND email < :upper ORDER BY email LIMIT 200",
+                         {"prefix": "maria", "upper": "maria￿"})
+        scans = [plan for plan in plans if plan.startswith("SCAN students") and "VIRTUAL" not in plan]
+        print(f"  query plans: {'; '.join(plans)}")
+        print(f"  full table scans: {len(scans)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.students, args.repeat)
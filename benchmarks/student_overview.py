@@ -0,0 +1,113 @@
+"""Student overview against the tool chain it replaces.
+
+Seeds students with several current courses each, tuition and lab fees,
+payments and unread notifications. For a sample of students, answers "what
+am I enrolled in and what do I owe?" two ways: the previous path
+(get_student, get_student_registrations, then calculate_student_fees per
+course, get_payment_history and get_unread_notification_count across the
+registration and fee agents) and one get_student_overview call. Reports
+tool calls, SQL statements and database time, and an estimate of LLM turns
+and end-to-end latency: one turn per tool call and per agent transfer plus
+the final reply, each costing --llm-turn-ms.
+
+    python -m benchmarks.student_overview [--students 20000] [--courses-per-student 6] [--sample 200] [--llm-turn-ms 800]
+"""
+from benchmarks import common
+
+import argparse
+import datetime
+import gc
+import random
+import statistics
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, event
+
+from ai_university_campus_admin_agent.config.database import (
+    SessionLocal, engine, FeeStructure, FeeType, Registration, Payment, Notification, RegistrationStatus, PaymentStatus
+)
+from ai_university_campus_admin_agent.tools.registration_tools import get_student, get_student_registrations
+from ai_university_campus_admin_agent.tools.fee_tools import calculate_student_fees, get_payment_history
+from ai_university_campus_admin_agent.tools.notification_tools import get_unread_notification_count
+from ai_university_campus_admin_agent.tools.overview_tools import get_student_overview
+
+COURSES = 300
+
+def seed(students: int, courses_per_student: int):
+    common.reset_database()
+    common.seed(students=students, courses=COURSES, max_capacity=10 ** 6)
+    rng = random.Random(44)
+    now = datetime.datetime.now(ZoneInfo("UTC"))
+    with SessionLocal() as db:
+        db.execute(insert(FeeStructure), [
+            {"course_id": course, "fee_type": FeeType.LAB_FEE, "amount": 150.0, "due_date": now + datetime.timedelta(days=20),
+             "is_active": True, "created_at": now, "updated_at": now}
+            for course in range(1, COURSES + 1, 3)
+        ])
+        registrations, payments, notifications = [], [], []
+        for student in range(students):
+            student_id = f"S{student:07d}"
+            for course in rng.sample(range(1, COURSES + 1), courses_per_student):
+                registrations.append({"student_id": student_id, "course_id": course, "status": RegistrationStatus.ACTIVE,
+                                      "registration_date": now - datetime.timedelta(days=rng.randrange(90))})
+                if rng.random() < 0.6:
+                    payments.append({"student_id": student_id, "fee_structure_id": course, "amount_paid": rng.choice([500.0, 1000.0]),
+                                     "payment_method": "card", "payment_date": now - datetime.timedelta(days=rng.randrange(60)),
+                                     "transaction_id": f"BENCH{len(payments)}", "status": PaymentStatus.PAID})
+            for index in range(rng.randrange(8)):
+                notifications.append({"student_id": student_id, "title": f"Notice {index}", "message": "benchmark",
+                                      "notification_type": "academic", "is_read": rng.random() < 0.3,
+                                      "sent_at": now - datetime.timedelta(hours=rng.randrange(500))})
+        db.execute(insert(Registration), registrations)
+        db.execute(insert(Payment), payments)
+        db.execute(insert(Notification), notifications)
+        db.commit()
+
+def previous_path(student_id: str) -> int:
+    """The tool calls the agents made before the overview existed; returns how many"""
+    calls = [get_student(student_id), get_student_registrations(student_id)]
+    for registration in calls[1]["registrations"]:
+        if registration["status"] == "active":
+            calls.append(calculate_student_fees(student_id, registration["course_code"]))
+    calls.append(get_payment_history(student_id))
+    calls.append(get_unread_notification_count(student_id))
+    assert all(call["status"] == "success" for call in calls), [call for call in calls if call["status"] != "success"]
+    return len(calls)
+
+def overview_path(student_id: str) -> int:
+    assert get_student_overview(student_id)["status"] == "success"
+    return 1
+
+def main(students: int, courses_per_student: int, sample: int, llm_turn_ms: float):
+    with common.Timer() as timer:
+        seed(students, courses_per_student)
+    print(f"Seeded {students} students with {courses_per_student} courses each in {timer.elapsed:.1f}s")
+
+    statements = [0]
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.__setitem__(0, statements[0] + 1))
+    sample_ids = [f"S{index:07d}" for index in random.Random(1).sample(range(students), sample)]
+
+    # previous: orchestrator -> registration agent -> fee agent, so two transfers; overview: answered by the orchestrator
+    for label, path, transfers in (("previous tool chain", previous_path, 2), ("get_student_overview", overview_path, 0)):
+        timings, tool_calls, queries = [], [], []
+        for student_id in sample_ids:
+            statements[0] = 0
+            with common.Timer() as timer:
+                tool_calls.append(path(student_id))
+            timings.append(timer.elapsed * 1000)
+            queries.append(statements[0])
+            # The older tools leave their sessions, and the pooled connections they hold, to the cyclic garbage collector
+            gc.collect()
+        turns = statistics.mean(tool_calls) + transfers + 1
+        database_ms = statistics.median(timings)
+        print(f"  {label:<22} {statistics.mean(tool_calls):5.1f} tool calls  {statistics.mean(queries):5.1f} queries  "
+              f"{database_ms:7.2f} ms database p50  ~{turns:4.1f} LLM turns  ~{turns * llm_turn_ms / 1000 + database_ms / 1000:5.1f} s end to end")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=20000)
+    parser.add_argument("--courses-per-student", type=int, default=6)
+    parser.add_argument("--sample", type=int, default=200)
+    parser.add_argument("--llm-turn-ms", type=float, default=800)
+    args = parser.parse_args()
+    main(args.students, args.courses_per_student, args.sample, args.llm_turn_ms)
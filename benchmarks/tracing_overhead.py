@@ -0,0 +1,66 @@
+"""Request tracing: cost per request, and what each sampling setting keeps.
+
+Runs the benchmarks.conversation requests on zero-latency stub models, so
+only the agent, tool and database work is timed:
+
+  off        no tracing
+  dropped    spans recorded, TRACE_SAMPLE_RATE 0 (every trace discarded at the end)
+  sampled    TRACE_SAMPLE_RATE 0.25, plus traces slower than the untraced p90
+  all        TRACE_SAMPLE_RATE 1, every trace written as OTLP JSON
+
+then prints the report for the slowest traces written.
+
+    python -m benchmarks.tracing_overhead [--repeat 20]
+"""
+from benchmarks import common
+
+import argparse
+import asyncio
+import os
+import statistics
+from typing import List
+
+from ai_university_campus_admin_agent.config.answer_cache import answer_cache
+from ai_university_campus_admin_agent.config.tracing import setup_tracing, slowest_traces_report, load_traces
+from benchmarks.conversation import REQUESTS, stub_tree, run_request
+
+async def run_all(profile: common.ConversationProfile, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        answer_cache.clear()
+        for request, (message, _, _) in REQUESTS.items():
+            # Enrolling again only reports the existing registration, which is fine for timing
+            timings.append((await run_request(stub_tree(request, 0), profile, message))["wall_ms"])
+    return timings
+
+async def main(repeat: int):
+    common.reset_database()
+    common.seed(students=1000, courses=50)
+    profile = common.ConversationProfile()
+    path = os.path.join(common._scratch_dir, "traces.jsonl")
+    await run_all(profile, 1)  # warm up
+
+    off = await run_all(profile, repeat)
+    p50 = statistics.median(off)
+    p90 = statistics.quantiles(off, n=10)[-1]
+    processor = setup_tracing(path, sample_rate=0.0, slow_ms=0)
+    print(f"{repeat * len(REQUESTS)} requests per setting, stub models at 0 ms")
+    print(f"  {'off':8} {p50:7.2f} ms p50")
+    for label, sample_rate, slow_ms in (("dropped", 0.0, 0), ("sampled", 0.25, p90), ("all", 1.0, 0)):
+        processor.sample_rate, processor.slow_ms = sample_rate, slow_ms
+        kept_before = processor.kept
+        timings = await run_all(profile, repeat)
+        processor.force_flush()
+        kept = processor.kept - kept_before
+        print(f"  {label:8} {statistics.median(timings):7.2f} ms p50  ({statistics.median(timings) - p50:+.2f} ms)"
+              f"  {kept} of {len(timings)} traces written")
+    spans = sum(len(spans) for spans in load_traces(path).values())
+    print(f"  {spans / processor.kept:.0f} spans per trace, {os.path.getsize(path) / processor.kept / 1024:.1f} KiB per trace in {path}")
+    print()
+    print(slowest_traces_report(path, top=1))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.repeat))
@@ -0,0 +1,156 @@
+"""Concurrent enrollment, drop and waitlist stress test.
+
+Phase 1 races many enroll_course calls for a handful of seats and checks that
+the course is never oversubscribed. Phase 2 fills a course, queues students on
+its waitlist, then runs drops, leave_waitlist calls and further enrollment
+attempts concurrently. It checks that every freed seat went to the head of the
+queue (FIFO), that the enrollment counter matches the active registrations and
+that nobody is both enrolled and waitlisted. Phase 3 has a waitlisted student
+enroll in a course that clashes with the one they are waiting for, then frees
+a seat: the seat must go to the next student in line, never into the clash.
+Point BENCH_DATABASE_URL at
+Postgres to exercise row locking; SQLite serializes writers.
+
+    python -m benchmarks.waitlist_stress [--threads 16] [--capacity 50] [--waitlisted 200]
+"""
+from benchmarks import common
+
+import argparse
+import inspect
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import update
+
+from ai_university_campus_admin_agent.config.database import (
+    SessionLocal, Course, Registration, WaitlistEntry, Notification, RegistrationStatus
+)
+from ai_university_campus_admin_agent.tools.registration_tools import enroll_course
+from ai_university_campus_admin_agent.tools.course_tools import drop_course
+from ai_university_campus_admin_agent.tools.waitlist_tools import join_waitlist, leave_waitlist
+
+# Race the tools themselves; admission control in front of them would serialize the writes being tested
+enroll_course, drop_course, join_waitlist, leave_waitlist = (
+    inspect.unwrap(tool) for tool in (enroll_course, drop_course, join_waitlist, leave_waitlist)
+)
+
+def _course_state(course_code: str):
+    with SessionLocal() as db:
+        course = db.query(Course).filter(Course.course_code == course_code).one()
+        active = {
+            student_id for (student_id,) in db.query(Registration.student_id).filter(
+                Registration.course_id == course.id,
+                Registration.status == RegistrationStatus.ACTIVE
+            )
+        }
+        waitlist = dict(db.query(WaitlistEntry.student_id, WaitlistEntry.id).filter(WaitlistEntry.course_id == course.id))
+        return course.current_enrollment, course.max_capacity, active, waitlist
+
+def _run(threads: int, calls):
+    with common.Timer() as timer, ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda call: call[0](*call[1:]), calls))
+    return results, timer.elapsed
+
+def stress_enroll(threads: int, seats: int, contenders: int) -> bool:
+    common.reset_database()
+    common.seed(students=contenders, courses=1, max_capacity=seats, fees=False)
+    calls = [(enroll_course, f"S{i:07d}", "C0000") for i in range(contenders)]
+    results, elapsed = _run(threads, calls)
+
+    enrolled = sum(1 for r in results if r["status"] == "success")
+    counter, capacity, active, _ = _course_state("C0000")
+    ok = enrolled == len(active) == counter <= capacity
+    print(f"Enrollment race: {contenders} students for {seats} seats on {threads} threads in {elapsed:.2f}s")
+    print(f"  enrolled: {enrolled}, active registrations: {len(active)}, counter: {counter}/{capacity} -> {'OK' if ok else 'FAIL'}")
+    return ok
+
+def stress_waitlist(threads: int, capacity: int, waitlisted: int) -> bool:
+    common.reset_database()
+    extra = waitlisted // 2
+    common.seed(students=capacity + waitlisted + extra, courses=1, max_capacity=capacity, fees=False)
+    students = [f"S{i:07d}" for i in range(capacity + waitlisted + extra)]
+    enrolled, queued, latecomers = students[:capacity], students[capacity:capacity + waitlisted], students[capacity + waitlisted:]
+
+    for student_id in enrolled:
+        assert enroll_course(student_id, "C0000")["status"] == "success"
+    for student_id in queued:
+        assert join_waitlist(student_id, "C0000")["status"] == "success"
+    _, _, _, initial_waitlist = _course_state("C0000")
+
+    rng = random.Random(42)
+    drops = rng.sample(enrolled, capacity // 2)
+    leavers = rng.sample(queued, waitlisted // 10)
+    calls = (
+        [(drop_course, student_id, "C0000") for student_id in drops]
+        + [(leave_waitlist, student_id, "C0000") for student_id in leavers]
+        + [(enroll_course, student_id, "C0000") for student_id in latecomers]
+    )
+    rng.shuffle(calls)
+    results, elapsed = _run(threads, calls)
+
+    failed_drops = [r for call, r in zip(calls, results) if call[0] is drop_course and r["status"] != "success"]
+    promoted = [student_id for r in results if r["status"] == "success" and "details" in r
+                for student_id in r["details"]["promoted_from_waitlist"]]
+    late_enrolled = sum(1 for call, r in zip(calls, results) if call[0] is enroll_course and r["status"] == "success")
+    counter, max_capacity, active, waitlist = _course_state("C0000")
+
+    checks = {
+        "counter matches active registrations": counter == len(active),
+        "capacity respected": counter <= max_capacity,
+        "every dropped seat refilled": len(active) == max_capacity,
+        "no student both enrolled and waitlisted": not (active & set(waitlist)),
+        "promoted students left the waitlist": not (set(promoted) & set(waitlist)),
+        "promotions are FIFO": not promoted or not waitlist
+            or max(initial_waitlist[s] for s in promoted) < min(waitlist.values()),
+        "no student promoted twice": len(promoted) == len(set(promoted)),
+    }
+    print(f"Waitlist: {len(drops)} drops, {len(leavers)} leaves, {len(latecomers)} enroll attempts "
+          f"on {threads} threads in {elapsed:.2f}s")
+    print(f"  promoted: {len(promoted)}, failed drops: {len(failed_drops)}, latecomers enrolled: {late_enrolled}, "
+          f"waitlist remaining: {len(waitlist)}")
+    for name, ok in checks.items():
+        print(f"  {name}: {'OK' if ok else 'FAIL'}")
+    if failed_drops:
+        print(f"  first drop error: {failed_drops[0]['message']}")
+    return all(checks.values())
+
+def stress_clash() -> bool:
+    common.reset_database()
+    common.seed(students=3, courses=2, max_capacity=1, fees=False)
+    with SessionLocal() as db:
+        db.execute(update(Course).values(schedule="Mon Wed 09:00-10:30"))
+        db.commit()
+
+    assert enroll_course("S0000000", "C0000")["status"] == "success"
+    assert join_waitlist("S0000001", "C0000")["status"] == "success"
+    assert join_waitlist("S0000002", "C0000")["status"] == "success"
+    # Allowed: the clash check only sees active registrations, not waitlist entries
+    assert enroll_course("S0000001", "C0001")["status"] == "success"
+    promoted = drop_course("S0000000", "C0000")["details"]["promoted_from_waitlist"]
+    _, _, active, waitlist = _course_state("C0000")
+    with SessionLocal() as db:
+        removed_notice = db.query(Notification).filter(
+            Notification.student_id == "S0000001", Notification.title.like("Removed from%")
+        ).count()
+
+    checks = {
+        "clashing student not promoted": "S0000001" not in active,
+        "next in line promoted instead": promoted == ["S0000002"] and active == {"S0000002"},
+        "clashing student removed and notified": not waitlist and removed_notice == 1,
+    }
+    print("Clash while waitlisted: S0000001 waits for C0000, then enrolls in clashing C0001; S0000000 drops C0000")
+    for name, ok in checks.items():
+        print(f"  {name}: {'OK' if ok else 'FAIL'}")
+    return all(checks.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--waitlisted", type=int, default=200)
+    args = parser.parse_args()
+    ok = stress_enroll(args.threads, seats=10, contenders=200)
+    ok = stress_waitlist(args.threads, args.capacity, args.waitlisted) and ok
+    ok = stress_clash() and ok
+    sys.exit(0 if ok else 1)
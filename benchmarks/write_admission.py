@@ -0,0 +1,207 @@
+"""Write throughput past saturation, with and without admission control.
+
+Closed-loop clients send "enroll me, then drop me" requests through an
+ADK Runner, each in a new session, as fast as they can, for --seconds at
+each concurrency level. The stub model takes --llm-latency-ms per call
+and calls enroll_course, then drop_course. A failed write is called
+again up to 5 times: straight away without admission control (what an
+LLM does with "database is locked"), after retry_after_seconds with it.
+--hot-clients more sessions ask for a payment for one student every
+--hot-interval-ms and never back off, like a model stuck retrying.
+
+Without admission control the tools are the plain sync functions, which
+ADK runs inline on its event loop; with it they are async tools whose
+writes run in worker threads.
+
+Reports goodput (completed enroll/drop writes per second, hot clients
+excluded), failed writes after retries, p50/p99 latency of completed
+writes, p99 event loop lag (how late a 10 ms timer fires, i.e. how long
+tools kept every other session waiting) and what admission control
+turned away.
+
+    python -m benchmarks.write_admission [--levels 1,8,32,96] [--seconds 4] [--hot-clients 2] [--hot-interval-ms 20] [--llm-latency-ms 20]
+"""
+from benchmarks import common
+
+import argparse
+import asyncio
+import inspect
+import logging
+import random
+import statistics
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import FunctionTool
+from google.genai import types
+from pydantic import Field
+
+from ai_university_campus_admin_agent.agents import registration_agent
+from ai_university_campus_admin_agent.tools.registration_tools import enroll_course
+from ai_university_campus_admin_agent.tools.course_tools import drop_course
+from ai_university_campus_admin_agent.tools.fee_tools import record_payment
+from ai_university_campus_admin_agent.utils.admission import write_admission, student_rate_limiter
+
+from benchmarks.parallel_fanout import call
+
+logging.getLogger("google_adk").setLevel(logging.ERROR)
+
+STUDENTS = 4000
+COURSES = 50
+RETRIES = 5
+LAG_INTERVAL = 0.01
+
+def _completed(result: Dict) -> bool:
+    # Business outcomes (already enrolled, not enrolled) still took their round trip to the database
+    return result.get("status") == "success" or "enrolled" in result.get("message", "")
+
+class Tally:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.failed = 0
+        self.rejected = {"overloaded": 0, "rate_limited": 0}
+        self.hot_writes = 0
+        self._started: Dict[str, float] = {}
+
+class ClientLlm(BaseLlm):
+    """Calls the planned tools in turn, calling a failed one again up to `retries` times
+    (after retry_after_seconds when the tool gives one); writes given up on count in `tally`"""
+
+    plan: List[types.Part] = Field(default_factory=list)
+    retries: int = RETRIES
+    latency: float = 0.0
+    tally: Optional[Tally] = None
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency)
+        step, tries, wait = 0, 0, 0.0
+        responses = [part.function_response.response for content in llm_request.contents
+                     for part in content.parts or [] if part.function_response]
+        for index, result in enumerate(responses):
+            if _completed(result):
+                step, tries, wait = step + 1, 0, 0.0
+            elif tries < self.retries:
+                tries, wait = tries + 1, result.get("retry_after_seconds", 0.0)
+            else:
+                step, tries, wait = step + 1, 0, 0.0
+                if index == len(responses) - 1 and self.tally is not None:
+                    self.tally.failed += 1
+        await asyncio.sleep(wait)
+        parts = [self.plan[step]] if step < len(self.plan) else [types.Part.from_text(text="Done.")]
+        yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+class WriteTally(BasePlugin):
+    """Times every write tool call and counts what it returned"""
+
+    def __init__(self, tally: Tally):
+        super().__init__(name="write_tally")
+        self.tally = tally
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> Optional[dict]:
+        self.tally._started[tool_context.function_call_id] = time.perf_counter()
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> Optional[dict]:
+        elapsed = time.perf_counter() - self.tally._started.pop(tool_context.function_call_id)
+        code = result.get("error_code")
+        if code:
+            self.tally.rejected[code] += 1
+        elif tool.name == "record_payment":
+            self.tally.hot_writes += result["status"] == "success"
+        elif _completed(result):
+            self.tally.latencies.append(elapsed * 1000)
+        return None
+
+async def request(runner: InMemoryRunner, message: str) -> None:
+    session = await runner.session_service.create_session(app_name="write_bench", user_id="bench")
+    content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+    async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=content):
+        pass
+
+async def run(clients: int, hot_clients: int, hot_interval: float, seconds: float, latency: float, admitted: bool) -> Dict:
+    common.reset_database()
+    common.seed(students=STUDENTS, courses=COURSES, max_capacity=1000)
+    student_rate_limiter.reset()
+    before = write_admission.stats()
+    funcs = (enroll_course, drop_course, record_payment)
+    tools = [FunctionTool(func=func if admitted else inspect.unwrap(func)) for func in funcs]
+    tally = Tally()
+    plugin = WriteTally(tally)
+    lags: List[float] = []
+    deadline = time.monotonic() + seconds
+
+    def runner(model: ClientLlm) -> InMemoryRunner:
+        agent = registration_agent.clone(update={"model": model, "tools": tools, "sub_agents": []})
+        return InMemoryRunner(agent=agent, app_name="write_bench", plugins=[plugin])
+
+    async def client(index: int):
+        rng = random.Random(index)
+        model = ClientLlm(model="stub", latency=latency, tally=tally)
+        client_runner = runner(model)
+        while time.monotonic() < deadline:
+            # S0000000 belongs to the hot clients
+            student = f"S{rng.randrange(1, STUDENTS):07d}"
+            course = f"C{rng.randrange(COURSES):04d}"
+            model.plan = [call("enroll_course", student_id=student, course_code=course),
+                          call("drop_course", student_id=student, course_code=course)]
+            await request(client_runner, f"Enroll {student} in {course}, then drop it again")
+
+    async def hot_client():
+        model = ClientLlm(model="stub", latency=latency, retries=0,
+                          plan=[call("record_payment", student_id="S0000000", amount=10.0, payment_method="online")])
+        hot_runner = runner(model)
+        while time.monotonic() < deadline:
+            await request(hot_runner, "Record a 10.00 online payment for S0000000")
+            await asyncio.sleep(hot_interval)
+
+    async def loop_lag():
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL)
+            lags.append((time.perf_counter() - started - LAG_INTERVAL) * 1000)
+
+    with common.Timer() as timer:
+        await asyncio.gather(loop_lag(), *(client(index) for index in range(clients)),
+                             *(hot_client() for _ in range(hot_clients)))
+    after = write_admission.stats()
+    latencies = tally.latencies
+    return {
+        "goodput": len(latencies) / timer.elapsed,
+        "failed": tally.failed,
+        "p50": statistics.median(latencies) if latencies else 0.0,
+        "p99": statistics.quantiles(latencies, n=100)[-1] if len(latencies) > 1 else 0.0,
+        "lag_p99": statistics.quantiles(lags, n=100)[-1] if len(lags) > 1 else 0.0,
+        "overloaded": tally.rejected["overloaded"],
+        "rate_limited": tally.rejected["rate_limited"],
+        "hot_writes": tally.hot_writes,
+        "avg_wait_ms": after["avg_wait_ms"] if admitted else 0.0,
+        "timeouts": after["rejected_timeout"] - before["rejected_timeout"]
+    }
+
+async def main(levels: List[int], seconds: float, hot_clients: int, hot_interval_ms: float, latency_ms: float):
+    print(f"{seconds:g} s per run, {hot_clients} hot clients, stub model {latency_ms:g} ms per call; write concurrency "
+          f"limit {write_admission.limit}, queue {write_admission.queue_size}, deadline {write_admission.timeout * 1000:.0f} ms")
+    print(f"{'clients':>7}  {'mode':9} {'goodput/s':>9} {'failed':>6} {'p50 ms':>8} {'p99 ms':>8} {'lag p99':>8} "
+          f"{'overloaded':>10} {'rate_limited':>12} {'hot writes':>10}")
+    for clients in levels:
+        for admitted in (False, True):
+            result = await run(clients, hot_clients, hot_interval_ms / 1000, seconds, latency_ms / 1000, admitted)
+            print(f"{clients:7d}  {'admitted' if admitted else 'raw':9} {result['goodput']:9.1f} {result['failed']:6d} "
+                  f"{result['p50']:8.1f} {result['p99']:8.1f} {result['lag_p99']:8.1f} {result['overloaded']:10d} "
+                  f"{result['rate_limited']:12d} {result['hot_writes']:10d}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,8,32,96", help="comma-separated client counts")
+    parser.add_argument("--seconds", type=float, default=4)
+    parser.add_argument("--hot-clients", type=int, default=2)
+    parser.add_argument("--hot-interval-ms", type=float, default=20)
+    parser.add_argument("--llm-latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    asyncio.run(main([int(level) for level in args.levels.split(",")], args.seconds, args.hot_clients,
+                     args.hot_interval_ms, args.llm_latency_ms))